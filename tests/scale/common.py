@@ -1,11 +1,54 @@
+import array
+import os
+import re
+import threading
 import time
 import traceback
 
 from dcos.mesos import DCOSClient
 from dcos import mesos
+from events import DeploymentWatcher, EventStream
+from launcher import AppLauncher, post_group, post_pod
+from reads import ReadLoad
+from results import ResultsStore, new_run_id, result_of, write_csv
+from sampler import LaunchSampler, TeardownSampler
+from stats import percentile
+from teardown import Teardown
 from shakedown import *
 from utils import *
 
+# number of `add_app` requests in flight for the `count` style
+LAUNCH_CONCURRENCY = int(os.environ.get('LAUNCH_CONCURRENCY', 8))
+# deployments in marathon at which the launcher stops posting new apps
+LAUNCH_MAX_DEPLOYMENTS = int(os.environ.get('LAUNCH_MAX_DEPLOYMENTS', 30))
+# response time in seconds at which the launcher halves the requests in flight
+LAUNCH_MAX_LATENCY = float(os.environ.get('LAUNCH_MAX_LATENCY', 10))
+# apps per group of the `batch` style if the test name has no batch size
+BATCH_SIZE = int(os.environ.get('BATCH_SIZE', 100))
+# number of group requests in flight for the `batch` style
+BATCH_CONCURRENCY = int(os.environ.get('BATCH_CONCURRENCY', 4))
+# seconds between samples of the launch progress
+SAMPLE_INTERVAL = float(os.environ.get('SAMPLE_INTERVAL', 0.5))
+# seconds without new running tasks which are reported as a stall
+STALL_THRESHOLD = float(os.environ.get('STALL_THRESHOLD', 10))
+# number of delete requests in flight while tearing down
+TEARDOWN_CONCURRENCY = int(os.environ.get('TEARDOWN_CONCURRENCY', 8))
+# root group apps above which a teardown removes the root group with one request
+TEARDOWN_ROOT_GROUP_APPS = int(os.environ.get('TEARDOWN_ROOT_GROUP_APPS', 1000))
+# seconds the summarized cluster resources are reused
+RESOURCE_CACHE_TTL = float(os.environ.get('RESOURCE_CACHE_TTL', 5))
+# reader threads reading the marathon api during scale tests, 0 is off
+READ_LOAD_READERS = int(os.environ.get('READ_LOAD_READERS', 0))
+# seconds each reader waits between reads
+READ_LOAD_THINK_TIME = float(os.environ.get('READ_LOAD_THINK_TIME', 0))
+# comma separated endpoints read by the readers, all of reads.READ_ENDPOINTS by default
+READ_LOAD_ENDPOINTS = [e for e in os.environ.get('READ_LOAD_ENDPOINTS', '').split(',') if e]
+# containers of the pods of the pod scale tests, pod-2 or pod-4
+POD_CONTAINERS = int(os.environ.get('POD_CONTAINERS', 4))
+# resources marathon adds to each pod instance for the executor
+POD_EXECUTOR_CPU = 0.1
+POD_EXECUTOR_MEM = 32
+
 
 def app(id=1, instances=1):
     app_json = {
@@ -38,6 +81,22 @@ def group(gcount=1, instances=1):
     return group
 
 
+def pod(id=1, instances=1, containers=4):
+    """ Pod with `containers` containers from pod-<containers>-containers.json """
+    return load_fixture("pod-{}-containers.json".format(containers), id=id, instances=instances)
+
+
+def batch_groups(count=1, instances=1, batch_size=100):
+    """ Splits `count` apps into groups of `batch_size` apps """
+    for batch, first in enumerate(range(1, count + 1, batch_size), start=1):
+        id = "/batch/{}".format(batch)
+        last = min(first + batch_size, count + 1)
+        yield {
+            "id": id,
+            "apps": [app(id + "/" + str(num), instances) for num in range(first, last)]
+        }
+
+
 def constraints(name, operator, value=None):
     constraints = [name, operator]
     if value is not None:
@@ -49,14 +108,65 @@ def unique_host_constraint():
     return constraints('hostname', 'UNIQUE')
 
 
-def delete_all_apps():
-    client = marathon.create_client()
-    client.remove_group("/", True)
+def delete_all_apps(test_obj=None):
+    """ Removes all groups, pods and apps concurrently """
+    resource_cache.invalidate()
+    return Teardown(test_obj, TEARDOWN_CONCURRENCY, LAUNCH_MAX_DEPLOYMENTS, LAUNCH_MAX_LATENCY,
+                    root_group_apps=TEARDOWN_ROOT_GROUP_APPS).run()
+
+
+def event_deployment_wait(test_obj=None, timeout=None, url=None):
+    """ Waits for all current deployments of marathon to finish by following the
+    marathon event stream.  `url` selects the marathon, by default the marathon
+    the dcos client points to.
+
+    :return: (time the last deployment finished, ids of the failed deployments),
+        the time is None if the event stream could not be used, in which case
+        the caller should fall back to polling
+    """
+    try:
+        stream = EventStream(url or marathon_url()).start()
+    except Exception as e:
+        if test_obj is not None:
+            test_obj.add_event('event stream not available: {}'.format(str(e)))
+        return None, set()
+
+    watcher = DeploymentWatcher(stream)
+    error = None
+    try:
+        watcher.track(marathon_client(url).get_deployments())
+        end = watcher.wait(timeout)
+    except Exception as e:
+        end = None
+        error = e
+    finally:
+        stream.stop()
+
+    if test_obj is not None:
+        if end is None:
+            error = error or stream.error
+            if error is not None:
+                test_obj.add_event('event stream failed: {}, polling deployments'.format(str(error)))
+            else:
+                test_obj.add_event('event stream dropped, polling deployments')
+        for deployment_id in watcher.failed:
+            test_obj.add_event('deployment failed: {}'.format(deployment_id))
+        test_obj.add_event('status updates: {}'.format(watcher.task_states))
+    return end, watcher.failed
+
+
+def failed_deployments(failed):
+    """ Reason of a test whose deployments `failed` """
+    return 'deployments failed: {}'.format(', '.join(sorted(failed)))
 
 
 def time_deployment(test=""):
-    client = marathon.create_client()
     start = time.time()
+    end, failed = event_deployment_wait()
+    if end is not None:
+        return elapse_time(start, end)
+
+    client = marathon_client()
     deployment_count = 1
     while deployment_count > 0:
         # need protection when tearing down
@@ -75,7 +185,7 @@ def time_deployment(test=""):
 
 
 def delete_group(group="/2deep/group"):
-    client = marathon.create_client()
+    client = marathon_client()
     client.remove_group(group, True)
 
 
@@ -85,12 +195,12 @@ def delete_group_and_wait(group="test"):
 
 
 def deployment_less_than_predicate(count=10):
-    client = marathon.create_client()
+    client = marathon_client()
     return len(client.get_deployments()) < count
 
 
 def launch_apps(count=1, instances=1):
-    client = marathon.create_client()
+    client = marathon_client()
     for num in range(1, count + 1):
         # after 400 and every 50 check to see if we need to wait
         if num > 400 and num % 50 == 0:
@@ -103,33 +213,123 @@ def launch_apps(count=1, instances=1):
 
 
 def launch_group(count=1, instances=1):
-    client = marathon.create_client()
+    client = marathon_client()
     client.create_group(group(count, instances))
 
 
 def delete_all_apps_wait():
     delete_all_apps()
     time_deployment("undeploy")
+    resource_cache.invalidate()
 
 
 def scale_test_apps(test_obj):
-    if 'instance' in test_obj.style:
-        instance_test_app(test_obj)
-    if 'count' in test_obj.style:
-        count_test_app(test_obj)
-    if 'group' in test_obj.style:
-        group_test_app(test_obj)
+    test_obj.start_readers()
+    try:
+        if 'instance' in test_obj.style:
+            instance_test_app(test_obj)
+        if 'count' in test_obj.style:
+            count_test_app(test_obj)
+        if 'group' in test_obj.style:
+            group_test_app(test_obj)
+        if 'batch' in test_obj.style:
+            batch_test_app(test_obj)
+    finally:
+        test_obj.stop_readers()
+        resource_cache.invalidate()
+
+
+ACTIVE_TASK_STATES = ['TASK_STAGING', 'TASK_STARTING', 'TASK_RUNNING', 'TASK_KILLING']
 
 
-def get_current_tasks():
+def count_tasks_mesos():
+    """ Counts the active tasks of all frameworks from the full mesos task list """
+    tasks = timed_call('GET /mesos/tasks', get_tasks)
+    return len([task for task in tasks if task.get('state') in ACTIVE_TASK_STATES])
 
+
+def count_tasks_summary():
+    """ Counts the active tasks of all frameworks from the task counters of
+    the frameworks in the mesos state summary.
+    """
+    summary = mesos_state_summary()
+    count = 0
+    for framework in summary.get('frameworks', []):
+        for state in ACTIVE_TASK_STATES:
+            count += framework.get(state, 0)
+    return count
+
+
+def count_tasks_marathon():
+    """ Counts the running and staged tasks of the marathon under test from
+    the app counts of `/v2/apps`.  Tasks of other frameworks and of pods are
+    not counted.
+    """
+    count = 0
+    for app in marathon_client().get_apps():
+        count += app.get('tasksRunning', 0) + app.get('tasksStaged', 0)
+    return count
+
+
+TASK_COUNTERS = {
+    'mesos': count_tasks_mesos,
+    'summary': count_tasks_summary,
+    'marathon': count_tasks_marathon
+}
+
+# the tasks each of TASK_COUNTERS counts
+TASK_COUNT_SCOPES = {
+    'mesos': 'active tasks of all frameworks',
+    'summary': 'active tasks of all frameworks',
+    'marathon': 'running and staged app tasks of the marathon under test'
+}
+
+# one of TASK_COUNTERS
+TASK_COUNT_BACKEND = os.environ.get('TASK_COUNT_BACKEND', 'summary')
+
+
+def get_current_tasks(backend=None):
+    if backend is None:
+        backend = TASK_COUNT_BACKEND
     try:
-        return len(get_tasks())
+        return TASK_COUNTERS[backend]()
     except Exception as e:
         print(e)
         return 0
 
 
+def benchmark_task_counters(repeat=10):
+    """ Times each task count backend `repeat` times.  Backends of the same
+    scope must agree on the count, `marathon` only counts a part of the tasks
+    of the others.  The cluster must not change while the backends are timed.
+
+    :return: dict of backend to the scope, the count and the mean, p90 and max seconds per call
+    """
+    results = {}
+    for backend, counter in TASK_COUNTERS.items():
+        times = []
+        count = None
+        for _ in range(repeat):
+            start = time.time()
+            count = counter()
+            times.append(time.time() - start)
+        results[backend] = {
+            'scope': TASK_COUNT_SCOPES[backend],
+            'count': count,
+            'mean': round(sum(times) / len(times), 3),
+            'p90': percentile(times, 90),
+            'max': percentile(times, 100)
+        }
+
+    assert results['mesos']['count'] == results['summary']['count'], \
+        'mesos task list and state summary disagree: {} != {}'.format(
+            results['mesos']['count'], results['summary']['count'])
+    assert results['marathon']['count'] <= results['summary']['count'], \
+        'marathon counts tasks mesos does not know: {} > {}'.format(
+            results['marathon']['count'], results['summary']['count'])
+    return results
+
+
 def get_current_app_tasks(starting_tasks):
     return get_current_tasks() - starting_tasks
 
@@ -149,6 +349,8 @@ def count_test_app(test_obj):
 
     test_obj.start = time.time()
     starting_tasks = get_current_tasks()
+    test_obj.start_sampler()
+    test_obj.enter_phase('launch')
 
     # launch and
     launch_complete = True
@@ -177,24 +379,23 @@ def count_test_app(test_obj):
 
 
 def launch_apps2(test_obj):
-    client = marathon.create_client()
+    """ Launches `test_obj.count` apps with `test_obj.instance` instances each.
+    The requests are made concurrently by an `AppLauncher` which throttles on
+    the marathon deployment queue and on the `add_app` response latency.
+    """
     count = test_obj.count
     instances = test_obj.instance
-    for num in range(1, count + 1):
-        # after 400 and every 50 check to see if we need to wait
-        if num > 400 and num % 50 == 0:
-            deployments = len(client.get_deployments())
-            if deployments > 30:
-                # wait for deployment count to be less than a sec
-                wait_for(deployment_less_than_predicate)
-                time.sleep(1)
-        try:
-            client.add_app(app(num, instances))
-        except Exception as e:
-            time.sleep(1)
-            test_obj.add_event('launch exception: {}'.format(str(e)))
-            # either service not available or timeout of 10s
-            wait_for_marathon_up(test_obj)
+    launcher = AppLauncher(test_obj,
+                           concurrency=LAUNCH_CONCURRENCY,
+                           max_deployments=LAUNCH_MAX_DEPLOYMENTS,
+                           max_latency=LAUNCH_MAX_LATENCY)
+    test_obj.launcher = launcher
+
+    def on_error(e):
+        # either service not available or timeout of 10s
+        wait_for_marathon_up(test_obj)
+
+    launcher.launch((app(num, instances) for num in range(1, count + 1)), on_error)
 
 
 def instance_test_app(test_obj):
@@ -213,6 +414,8 @@ def instance_test_app(test_obj):
 
     test_obj.start = time.time()
     starting_tasks = get_current_tasks()
+    test_obj.start_sampler()
+    test_obj.enter_phase('launch')
     # launch apps
     launch_complete = True
     try:
@@ -257,6 +460,8 @@ def group_test_app(test_obj):
 
     test_obj.start = time.time()
     starting_tasks = get_current_tasks()
+    test_obj.start_sampler()
+    test_obj.enter_phase('launch')
     count = test_obj.count
     instances = test_obj.instance
 
@@ -286,10 +491,162 @@ def group_test_app(test_obj):
     assert launch_complete
 
 
+def batch_test_app(test_obj):
+    """
+    Runs the `batch` scale test for apps in marathon.   This is for apps and not pods.
+    The batch test is defined as X number of apps with Y number of instances split into groups of Z apps.
+    The groups are submitted concurrently, throttled like the apps of the `count` test.
+    The details of how many apps, instances and the batch size are defined in the test_obj.
+    This test will make X / Z HTTP requests against Marathon.
+
+    :param test_obj: Is of type ScaleTest and defines the criteria for the test and logs the results and events of the test.
+    """
+    # make sure no apps currently
+    delete_all_apps_wait2()
+
+    test_obj.start = time.time()
+    starting_tasks = get_current_tasks()
+    test_obj.start_sampler()
+    test_obj.enter_phase('launch')
+
+    # launch and
+    launch_complete = True
+    try:
+        launch_batches(test_obj)
+    except:
+        test_obj.add_event('Failure to fully launch')
+        launch_complete = False
+        wait_for_marathon_up(test_obj)
+        pass
+
+    # time to finish launch
+    try:
+        time_deployment2(test_obj, starting_tasks)
+        launch_complete = True
+    except Exception as e:
+        assert False
+
+    current_tasks = get_current_app_tasks(starting_tasks)
+    test_obj.add_event('undeploying {} tasks'.format(current_tasks))
+
+    # delete apps
+    delete_all_apps_wait2(test_obj)
+
+    assert launch_complete
+
+
+def launch_batches(test_obj):
+    """ Launches `test_obj.count` apps as groups of `test_obj.batch_size` apps.
+    The groups are posted concurrently by an `AppLauncher`.
+    """
+    launcher = AppLauncher(test_obj,
+                           concurrency=BATCH_CONCURRENCY,
+                           max_deployments=LAUNCH_MAX_DEPLOYMENTS,
+                           max_latency=LAUNCH_MAX_LATENCY)
+    test_obj.launcher = launcher
+
+    def on_error(e):
+        wait_for_marathon_up(test_obj)
+
+    groups = batch_groups(test_obj.count, test_obj.instance, test_obj.batch_size)
+    launcher.launch(groups, on_error, post_group)
+
+
+def scale_test_pods(test_obj):
+    test_obj.start_readers()
+    try:
+        if 'instance' in test_obj.style:
+            run_pod_test(test_obj, launch_pod_instances)
+        if 'count' in test_obj.style:
+            run_pod_test(test_obj, launch_pods)
+        if 'group' in test_obj.style:
+            run_pod_test(test_obj, launch_pod_group)
+    finally:
+        test_obj.stop_readers()
+        resource_cache.invalidate()
+
+
+def run_pod_test(test_obj, launch):
+    """
+    Runs a scale test for pods in marathon.  The styles match the app tests:
+    `instance` is 1 pod with X instances, `count` is X pods with Y instances and
+    `group` is X pods with Y instances in one group.  Each instance has a task
+    per container.
+
+    :param test_obj: Is of type ScaleTest and defines the criteria for the test and logs the results and events of the test.
+    :param launch: function launching the pods of the test
+    """
+    # make sure no pods currently
+    delete_all_apps_wait2()
+
+    test_obj.start = time.time()
+    starting_tasks = get_current_tasks()
+    test_obj.start_sampler()
+    test_obj.enter_phase('launch')
+
+    launch_complete = True
+    try:
+        launch(test_obj)
+    except:
+        test_obj.add_event('Failure to fully launch')
+        launch_complete = False
+        wait_for_marathon_up(test_obj)
+        pass
+
+    # time to finish launch
+    try:
+        time_deployment2(test_obj, starting_tasks)
+        launch_complete = True
+    except Exception as e:
+        assert False
+
+    current_tasks = get_current_app_tasks(starting_tasks)
+    test_obj.add_event('undeploying {} tasks'.format(current_tasks))
+
+    # delete pods
+    delete_all_apps_wait2(test_obj)
+
+    assert launch_complete
+
+
+def launch_pod_instances(test_obj):
+    client = marathon_client()
+    client.add_pod(pod(1, test_obj.instance, test_obj.containers))
+
+
+def launch_pods(test_obj, group_id=''):
+    """ Launches `test_obj.count` pods with `test_obj.instance` instances each.
+    The pods are posted concurrently like the apps of the `count` style.
+    """
+    launcher = AppLauncher(test_obj,
+                           concurrency=LAUNCH_CONCURRENCY,
+                           max_deployments=LAUNCH_MAX_DEPLOYMENTS,
+                           max_latency=LAUNCH_MAX_LATENCY)
+    test_obj.launcher = launcher
+
+    def on_error(e):
+        wait_for_marathon_up(test_obj)
+
+    pods = (pod('{}/{}'.format(group_id, num), test_obj.instance, test_obj.containers)
+            for num in range(1, test_obj.count + 1))
+    launcher.launch(pods, on_error, post_pod)
+
+
+def launch_pod_group(test_obj):
+    """ Launches the pods of the test into the group `/test`.  Marathon does
+    not take pods in group definitions so the pods are posted one by one.
+    """
+    launch_pods(test_obj, '/test')
+
+
 def delete_all_apps_wait2(test_obj=None, msg='undeployment failure'):
 
+    start = time.time()
+    if test_obj is not None:
+        test_obj.enter_phase('undeploy')
+        test_obj.start_teardown_sampler()
     try:
-        delete_all_apps()
+        delete_all_apps(test_obj)
     except Exception as e:
         if test_obj is not None:
             test_obj.add_event(msg)
@@ -299,17 +656,29 @@ def delete_all_apps_wait2(test_obj=None, msg='undeployment failure'):
     # however it is a marathon internal issue on getting a timely response
     # all tested situations the remove did succeed
     try:
-        undeployment_wait(test_obj)
+        undeployment_wait(test_obj, start)
     except Exception as e:
         msg = str(e)
         if test_obj is not None:
             test_obj.add_event(msg)
+            if test_obj.teardown_sampler is not None:
+                test_obj.teardown_sampler.stop()
         assert False, msg
+    finally:
+        resource_cache.invalidate()
 
 
-def undeployment_wait(test_obj=None):
-    client = marathon.create_client()
-    start = time.time()
+def undeployment_wait(test_obj=None, start=None):
+    if start is None:
+        start = time.time()
+    end, failed = event_deployment_wait(test_obj)
+    if end is not None:
+        assert not failed, failed_deployments(failed)
+        if test_obj is not None:
+            test_obj.undeploy_complete(start, end)
+        return
+
+    client = marathon_client()
     deployment_count = 1
     failure_count = 0
     while deployment_count > 0:
@@ -336,8 +705,17 @@ def undeployment_wait(test_obj=None):
 
 
 def time_deployment2(test_obj, starting_tasks):
-    client = marathon.create_client()
-    target_tasks = starting_tasks + (test_obj.count * test_obj.instance)
+    test_obj.enter_phase('deploy')
+    end, failed = event_deployment_wait(test_obj)
+    if end is not None:
+        if failed:
+            test_obj.failed(failed_deployments(failed))
+        else:
+            test_obj.successful(end)
+        return
+
+    client = marathon_client()
+    target_tasks = starting_tasks + test_obj.target_tasks()
     current_tasks = 0
 
     deployment_count = 1
@@ -406,12 +784,12 @@ def elapse_time(start, end=None):
     return round(end-start, 3)
 
 
-def write_meta_data(test_metadata={}, filename='meta-data.json'):
+def cluster_metadata(test_metadata={}):
     resources = available_resources()
     metadata = {
         'dcos-version': dcos_version(),
         'marathon-version': get_marathon_version(),
-        'private-agents': len(get_private_agents()),
+        'private-agents': len(timed_call('GET /mesos/master/state-summary', get_private_agents)),
         'resources': {
             'cpus': resources.cpus,
             'memory': resources.mem
@@ -419,26 +797,72 @@ def write_meta_data(test_metadata={}, filename='meta-data.json'):
     }
 
     metadata.update(test_metadata)
+    return metadata
+
+
+def write_meta_data(test_metadata={}, filename='meta-data.json'):
+    metadata = cluster_metadata(test_metadata)
     with open(filename, 'w') as out:
         json.dump(metadata, out)
+    return metadata
+
+
+# identifies the results of this test session in the results store
+RUN_ID = new_run_id()
+
+
+def log_results(test_log):
+    for scale_test in test_log:
+        print(scale_test)
+        scale_test.log_events()
+        scale_test.log_stats()
+        print('')
+
+
+def store_results(test_log, metadata=None, filename='scale-results.jsonl'):
+    """ Appends the results of `test_log` to the results store and writes the
+    scale test csv of them.
+    """
+    results = [result_of(scale_test, RUN_ID, metadata) for scale_test in test_log]
+    ResultsStore(filename).append(results)
+    write_csv(results)
+    return results
+
+
+def write_series(test_log, filename='scale-test-series.json'):
+    """ Writes the sampled launch and teardown progress of each scale test.  The
+    samples are (timestamp, running tasks, staged tasks, active deployments).
+    """
+    series = {}
+    for scale_test in test_log:
+        if scale_test.sampler is not None:
+            series[scale_test.name] = scale_test.sampler.to_dict()
+            series[scale_test.name]['start'] = scale_test.start
+            if scale_test.teardown_sampler is not None:
+                series[scale_test.name]['teardown'] = scale_test.teardown_sampler.to_dict()
+            if scale_test.readers is not None:
+                series[scale_test.name]['reads'] = scale_test.readers.summary()
+
+    with open(filename, 'w') as out:
+        json.dump(series, out)
 
 
 def get_marathon_version():
-    client = marathon.create_client()
+    client = marathon_client()
     about = client.get_about()
     return about.get("version")
 
 
 def cluster_info(mom_name='marathon-user'):
-    agents = get_private_agents()
+    agents = timed_call('GET /mesos/master/state-summary', get_private_agents)
     print("agents: {}".format(len(agents)))
-    client = marathon.create_client()
+    client = marathon_client()
     about = client.get_about()
     print("marathon version: {}".format(about.get("version")))
     # see if there is a MoM
     with marathon_on_marathon(mom_name):
         try:
-            client = marathon.create_client()
+            client = marathon_client()
             about = client.get_about()
             print("marathon MoM version: {}".format(about.get("version")))
 
@@ -446,33 +870,44 @@ def cluster_info(mom_name='marathon-user'):
             print("Marathon MoM not present")
 
 
-def get_mom_json(version='v1.3.6'):
-    mom_json = get_resource("mom.json")
-    docker_image = "mesosphere/marathon:{}".format(version)
-    mom_json['container']['docker']['image'] = docker_image
+def get_mom_json(version='v1.3.6', flags=None):
+    """ MoM app definition of marathon `version`.
+
+    :param flags: dict of marathon command line flag (without --) to value which
+        replace the quoted or unquoted values of mom.json, a flag missing from
+        mom.json is appended
+    """
+    mom_json = load_fixture("mom.json", image="mesosphere/marathon:{}".format(version))
     mom_json['labels']['DCOS_PACKAGE_VERSION'] = version
+    for flag, value in (flags or {}).items():
+        option = '--{} "{}"'.format(flag, value)
+        mom_json['cmd'], replaced = re.subn(r'--{}(?=\s|$)(\s+("[^"]*"|(?!--)\S+))?'.format(re.escape(flag)),
+                                            lambda match: option,
+                                            mom_json['cmd'])
+        if replaced == 0:
+            mom_json['cmd'] += ' ' + option
     return mom_json
 
 
-def install_mom(version='v1.3.6'):
+def install_mom(version='v1.3.6', flags=None):
     # the docker tags start with v
     # however the marathon reports version without the v :(
     if not version.startswith('v'):
         version = 'v{}'.format(version)
 
-    client = marathon.create_client()
-    client.add_app(get_mom_json(version))
+    client = marathon_client()
+    client.add_app(get_mom_json(version, flags))
     print("Installing MoM: {}".format(version))
     deployment_wait()
 
 
 def uninstall_mom():
     try:
-        framework_id = get_service_framework_id('marathon-user')
+        framework_id = timed_call('GET /mesos/master/state', get_service_framework_id, 'marathon-user')
         if framework_id is not None:
             print('uninstalling: {}'.format(framework_id))
             dcos_client = mesos.DCOSClient()
-            dcos_client.shutdown_framework(framework_id)
+            timed_call('POST /mesos/master/teardown', dcos_client.shutdown_framework, framework_id)
             time.sleep(2)
     except:
         pass
@@ -482,7 +917,7 @@ def uninstall_mom():
     while not removed:
         try:
             max_times =- 1
-            client = marathon.create_client()
+            client = marathon_client()
             client.remove_app('marathon-user')
             deployment_wait()
             time.sleep(2)
@@ -536,7 +971,7 @@ def is_mom_version(version):
         try:
             max_times == 1
             with marathon_on_marathon():
-                client = marathon.create_client()
+                client = marathon_client()
                 about = client.get_about()
                 same_version = version == about.get("version")
                 check_complete = True
@@ -589,29 +1024,73 @@ class Resources(object):
         return Resources(self.cpus * other, self.mem * other)
 
 
+# resource types of a mesos agent in the state summary
+RESOURCE_TYPES = ['resources', 'used_resources', 'offered_resources', 'reserved_resources', 'unreserved_resources']
+
+
+def summarize_resources(summary):
+    """ Sums the cpus and mem of all agents for every type of `RESOURCE_TYPES`
+    in one pass over the state summary.  The sums are kept in one flat array
+    of (cpus, mem) pairs.  Reserved resources are summed over all roles.
+
+    :return: dict of resource type to `Resources`
+    """
+    totals = array.array('d', [0.0]) * (2 * len(RESOURCE_TYPES))
+    for agent in summary.get('slaves', []):
+        for index, rtype in enumerate(RESOURCE_TYPES):
+            resources = agent.get(rtype)
+            if not resources:
+                continue
+            if rtype == 'reserved_resources':
+                for role_resources in resources.values():
+                    totals[2 * index] += role_resources.get('cpus', 0)
+                    totals[2 * index + 1] += role_resources.get('mem', 0)
+            else:
+                totals[2 * index] += resources.get('cpus', 0)
+                totals[2 * index + 1] += resources.get('mem', 0)
+
+    return dict((rtype, Resources(totals[2 * index], totals[2 * index + 1]))
+                for index, rtype in enumerate(RESOURCE_TYPES))
+
+
+class ResourceCache(object):
+    """ Caches the summarized cluster resources for `ttl` seconds.  Launches and
+    teardowns invalidate the cache.
+    """
+
+    def __init__(self, ttl=5):
+        self.ttl = ttl
+        self.fetches = 0
+        self._resources = None
+        self._fetched = 0
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            if self._resources is None or time.time() - self._fetched > self.ttl:
+                self._resources = summarize_resources(mesos_state_summary())
+                self._fetched = time.time()
+                self.fetches += 1
+            return self._resources
+
+    def invalidate(self):
+        with self._lock:
+            self._resources = None
+
+
+resource_cache = ResourceCache(RESOURCE_CACHE_TTL)
+
+
 def get_resources(rtype='resources'):
     """ resource types from summary include:  resources, used_resources
     offered_resources, reserved_resources, unreserved_resources
-    This current returns resources
     """
-    cpus = 0
-    mem = 0
-    summary = DCOSClient().get_state_summary()
-
-    if 'slaves' in summary:
-        agents = summary.get('slaves')
-        for agent in agents:
-            cpus += agent[rtype]['cpus']
-            mem += agent[rtype]['mem']
-
-    return Resources(cpus, mem)
+    return resource_cache.get()[rtype]
 
 
 def available_resources():
-    res = get_resources()
-    used = get_resources('used_resources')
-
-    return res - used
+    resources = resource_cache.get()
+    return resources['resources'] - resources['used_resources']
 
 
 class ScaleTest(object):
@@ -619,7 +1098,7 @@ class ScaleTest(object):
     name = ''
     # app, pod
     under_test = ''
-    # instance, group, count
+    # instance, group, count, batch
     style = ''
 
     instance = 1
@@ -628,16 +1107,30 @@ class ScaleTest(object):
     status = 'running'
     deploy_time = None
     undeploy_time = None
-
-    def __init__(self, name, mom, under_test, style, count, instance):
+    # killed tasks per second
+    undeploy_rate = None
+    # concurrent or root_group, see `Teardown`
+    teardown_path = None
+    # setup, launch, deploy, undeploy
+    phase = 'setup'
+
+    def __init__(self, name, mom, under_test, style, count, instance, batch_size=BATCH_SIZE):
         self.name = name
         self.under_test = under_test
         self.style = style
         self.instance = int(instance)
         self.count = int(count)
+        # apps per group for the batch style
+        self.batch_size = int(batch_size)
         self.start = time.time()
         self.mom = mom
         self.events = []
+        self.launcher = None
+        self.sampler = None
+        self.teardown_sampler = None
+        self.readers = None
+        # tasks of one instance, pods launch a task per container
+        self.containers = POD_CONTAINERS if under_test == 'pods' else 1
 
     def __str__(self):
         return "test: {} status: {} time: {} events: {}".format(
@@ -653,22 +1146,48 @@ class ScaleTest(object):
             self.deploy_time,
             len(self.events))
 
+    def target_tasks(self):
+        return self.count * self.instance * self.containers
+
     def add_event(self, eventInfo):
-        self.events.append('    event: {} (time in test: {})'.format(eventInfo, elapse_time(self.start)))
+        self.events.append((elapse_time(self.start), eventInfo))
 
-    def _status(self, status):
+    def _status(self, status, end=None):
         """ end of scale test, however still may have events like undeploy_time
         this marks the end of the test time
         """
         self.status = status
+        if self.sampler is not None:
+            self.sampler.stop()
         if 'successful' == status:
-            self.deploy_time = elapse_time(self.start)
+            self.deploy_time = elapse_time(self.start, end)
         else:
             self.deploy_time = 'x'
 
-    def successful(self):
+    def start_sampler(self):
+        """ starts sampling the launch progress until the test has a status """
+        self.sampler = LaunchSampler(self, SAMPLE_INTERVAL, STALL_THRESHOLD).start()
+
+    def start_teardown_sampler(self):
+        """ starts sampling the killed tasks until the undeployment is complete """
+        self.teardown_sampler = TeardownSampler(self, SAMPLE_INTERVAL).start()
+
+    def enter_phase(self, phase):
+        self.add_event('phase: {}'.format(phase))
+        self.phase = phase
+
+    def start_readers(self):
+        """ starts READ_LOAD_READERS readers of the marathon api if configured """
+        if READ_LOAD_READERS > 0:
+            self.readers = ReadLoad(self, READ_LOAD_READERS, READ_LOAD_ENDPOINTS, READ_LOAD_THINK_TIME).start()
+
+    def stop_readers(self):
+        if self.readers is not None:
+            self.readers.stop()
+
+    def successful(self, end=None):
         self.add_event('successful')
-        self._status('successful')
+        self._status('successful', end)
 
     def failed(self, reason="unknown"):
         self.add_event('failed: {}'.format(reason))
@@ -678,20 +1197,64 @@ class ScaleTest(object):
         self.add_event('skipped: {}'.format(reason))
         self._status('skipped')
 
-    def undeploy_complete(self, start):
+    def undeploy_complete(self, start, end=None):
         self.add_event('undeployment complete')
-        self.undeploy_time = elapse_time(start)
+        self.undeploy_time = elapse_time(start, end)
+        if self.teardown_sampler is None:
+            return
+        self.teardown_sampler.stop()
+        # no rate if the sampler did not see the tasks being killed
+        killed = self.teardown_sampler.tasks_killed()
+        if killed > 0 and self.undeploy_time > 0:
+            self.undeploy_rate = round(killed / self.undeploy_time, 3)
 
     def log_events(self):
-        for event in self.events:
-            print(event)
+        for time_in_test, event in self.events:
+            print('    event: {} (time in test: {})'.format(event, time_in_test))
 
     def log_stats(self):
-        print('    *status*: {}, deploy: {}, undeploy: {}'.format(self.status, self.deploy_time, self.undeploy_time))
+        print('    *status*: {}, deploy: {}, undeploy: {}, undeploy rate: {}/s, teardown: {}'.format(
+            self.status, self.deploy_time, self.undeploy_time, self.undeploy_rate, self.teardown_path))
+        if self.launcher is not None:
+            latencies = self.launcher.request_latencies()
+            print('    *launch*: requests: {}, errors: {}, rate: {}/s, latency p50: {}, p90: {}, p99: {}, max: {}'.format(
+                len(latencies),
+                self.launcher.errors,
+                self.launcher.ingest_rate(),
+                percentile(latencies, 50),
+                percentile(latencies, 90),
+                percentile(latencies, 99),
+                percentile(latencies, 100)))
+        if self.sampler is not None:
+            summary = self.sampler.summary()
+            print('    *progress*: tasks/s: {}, 50%: {}, 90%: {}, 100%: {}, stalls: {}'.format(
+                summary['tasks_per_second'],
+                summary['time_to_50'],
+                summary['time_to_90'],
+                summary['time_to_100'],
+                summary['stalls']))
+        if self.teardown_sampler is not None:
+            summary = self.teardown_sampler.summary()
+            print('    *teardown*: killed: {}, kill rate: {}/s, peak: {}/s'.format(
+                summary['tasks_killed'],
+                summary['kill_rate'],
+                summary['peak_kill_rate']))
+        if self.readers is not None:
+            for phase, endpoints in self.readers.summary().items():
+                for endpoint, latency in sorted(endpoints.items()):
+                    print('    *read* {} {}: reads: {}, errors: {}, p50: {}, p90: {}, p99: {}, max: {}'.format(
+                        phase, endpoint,
+                        latency['reads'],
+                        latency['errors'],
+                        latency['p50'],
+                        latency['p90'],
+                        latency['p99'],
+                        latency['max']))
 
 
 def start_test(name, marathons=None):
     """ test name example: test_mom1_apps_instances_1_100
+    or test_root_apps_batch_1000_1_100 with a batch size of 100 apps per group
     with list of marathons to test against.  If marathons are None, the root marathon is tested.
     """
     test = ScaleTest(name, *name.split("_")[1:])
@@ -709,6 +1272,18 @@ def resource_need(instances=1, counts=1, app_cpu=0.01, app_mem=1):
     return Resources(total_cpu, total_mem)
 
 
+def pod_resource_need(instances=1, counts=1, containers=4):
+    """ Resources of the pods including the default executor resources """
+    pod_json = pod(1, 1, containers)
+    pod_cpu = POD_EXECUTOR_CPU + sum(c['resources']['cpus'] for c in pod_json['containers'])
+    pod_mem = POD_EXECUTOR_MEM + sum(c['resources']['mem'] for c in pod_json['containers'])
+    return resource_need(instances, counts, pod_cpu, pod_mem)
+
+
 def scaletest_resources(test_obj):
+    if test_obj.under_test == 'pods':
+        return pod_resource_need(test_obj.instance,
+                                 test_obj.count,
+                                 test_obj.containers)
     return resource_need(test_obj.instance,
                          test_obj.count)
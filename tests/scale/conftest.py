@@ -0,0 +1,5 @@
+""" The modules shared with the system tests are in tests/shared """
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir, 'shared'))
@@ -0,0 +1,70 @@
+import threading
+import time
+
+from event_stream import EventStream
+
+
+class DeploymentWatcher(object):
+    """ Tracks the deployments of marathon from the event stream.  The watcher
+    is seeded with the deployments known to marathon via `track` and is complete
+    once a `deployment_success` or `deployment_failed` event was received for
+    each of them.  Status updates of tasks are counted on the way.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.active = None
+        self.finished = set()
+        self.failed = set()
+        self.completed_at = None
+        self.task_states = {}
+        self._condition = threading.Condition()
+        stream.add_listener(self._on_event)
+
+    def track(self, deployments):
+        """ Seeds the watcher with the deployments returned by `get_deployments` """
+        with self._condition:
+            ids = set(deployment['id'] for deployment in deployments)
+            self.active = ids - self.finished
+            if len(self.active) == 0:
+                self.completed_at = time.time()
+            self._condition.notify_all()
+
+    def status_updates(self, state='TASK_RUNNING'):
+        """ Number of status updates received with the task `state` """
+        return self.task_states.get(state, 0)
+
+    def _on_event(self, event_type, event, received):
+        if event_type == 'status_update_event':
+            state = event.get('taskStatus')
+            self.task_states[state] = self.task_states.get(state, 0) + 1
+            return
+        if event_type not in ('deployment_success', 'deployment_failed', 'stream_dropped'):
+            return
+
+        with self._condition:
+            if event_type != 'stream_dropped':
+                deployment_id = event.get('id')
+                self.finished.add(deployment_id)
+                if event_type == 'deployment_failed':
+                    self.failed.add(deployment_id)
+                if self.active is not None and deployment_id in self.active:
+                    self.active.discard(deployment_id)
+                    if len(self.active) == 0:
+                        self.completed_at = received
+            self._condition.notify_all()
+
+    def wait(self, timeout=None):
+        """ Waits until all tracked deployments are finished.
+
+        :return: time of the event which finished the last deployment or None
+            if the event stream dropped or the timeout was reached
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._condition:
+            while self.completed_at is None and not self.stream.dropped:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+            return self.completed_at
@@ -0,0 +1,623 @@
+""" In-process stand-in for the marathon and mesos endpoints used by the scale
+    harness.  It allows to run the harness without a DC/OS cluster in order to
+    profile the harness itself.
+
+    The server answers under DC/OS paths:  root marathon under `/marathon/` and
+    `/service/marathon/`, a MoM under `/service/marathon-user/` and mesos under
+    `/mesos/`.
+"""
+import contextlib
+import json
+import os
+import queue
+import random
+import re
+import shutil
+import socketserver
+import tempfile
+import threading
+import time
+import uuid
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from six.moves import urllib
+
+
+def timestamp(epoch=None):
+    if epoch is None:
+        epoch = time.time()
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(epoch)) + '.{:03d}Z'.format(int(epoch * 1000) % 1000)
+
+
+def normalize_id(path_id):
+    return '/' + path_id.strip('/')
+
+
+class FakeMarathon(object):
+    """ The state of one fake marathon.  Deployments finish `deployment_duration`
+    seconds after they were started.  Tasks are staged when the deployment
+    starts and running once it finished.
+    """
+
+    def __init__(self, name, version, cluster):
+        self.name = name
+        self.version = version
+        self.cluster = cluster
+        self.framework_id = '{}-0000'.format(uuid.uuid4())
+        self.apps = {}
+        self.pods = {}
+        # run spec id to the dict of its tasks by task id
+        self.run_spec_tasks = {}
+        self.deployments = {}
+        self.subscribers = []
+        self.lock = threading.RLock()
+
+    def tasks(self, run_spec_id=None):
+        with self.lock:
+            if run_spec_id is not None:
+                return list(self.run_spec_tasks.get(run_spec_id, {}).values())
+            return [task for tasks in self.run_spec_tasks.values() for task in tasks.values()]
+
+    def info(self):
+        return {
+            'name': self.name,
+            'version': self.version,
+            'frameworkId': self.framework_id,
+            'leader': '127.0.0.1:8080',
+            'elected': True
+        }
+
+    # events
+    def subscribe(self):
+        subscriber = queue.Queue()
+        with self.lock:
+            self.subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            if subscriber in self.subscribers:
+                self.subscribers.remove(subscriber)
+
+    def publish(self, event_type, **event):
+        event['eventType'] = event_type
+        event['timestamp'] = timestamp()
+        with self.lock:
+            for subscriber in self.subscribers:
+                subscriber.put(event)
+
+    # apps and pods
+    def app_json(self, app):
+        app = dict(app)
+        tasks = self.tasks(app['id'])
+        app['tasksRunning'] = len([task for task in tasks if task['state'] == 'TASK_RUNNING'])
+        app['tasksStaged'] = len([task for task in tasks if task['state'] == 'TASK_STAGING'])
+        app['tasksHealthy'] = 0
+        app['tasksUnhealthy'] = 0
+        app['deployments'] = [{'id': d['id']} for d in self.deployments.values() if app['id'] in d['affectedApps']]
+        return app
+
+    def add_apps(self, apps, force=False):
+        with self.lock:
+            for app in apps:
+                app_id = normalize_id(app['id'])
+                if app_id in self.apps and not force:
+                    return None
+            changes = []
+            for app in apps:
+                app = dict(app)
+                app['id'] = normalize_id(app['id'])
+                app.setdefault('instances', 1)
+                app['version'] = timestamp()
+                self.apps[app['id']] = app
+                changes.append((app['id'], app.get('instances', 1), self._containers(app)))
+            return self._deploy(changes)
+
+    def add_pod(self, pod):
+        with self.lock:
+            pod = dict(pod)
+            pod['id'] = normalize_id(pod['id'])
+            if pod['id'] in self.pods:
+                return None
+            pod['version'] = timestamp()
+            self.pods[pod['id']] = pod
+            instances = pod.get('scaling', {}).get('instances', 1)
+            return self._deploy([(pod['id'], instances, self._containers(pod))])
+
+    def scale_app(self, app_id, instances):
+        with self.lock:
+            app = self.apps.get(normalize_id(app_id))
+            if app is None:
+                return None
+            app['instances'] = instances
+            return self._deploy([(app['id'], instances, self._containers(app))])
+
+    def remove(self, path_id):
+        """ Removes the app, pod or group with `path_id` and all its tasks """
+        path_id = normalize_id(path_id)
+        prefix = path_id.rstrip('/') + '/'
+        with self.lock:
+            removed = [run_spec_id for run_spec_id in list(self.apps) + list(self.pods)
+                       if run_spec_id == path_id or run_spec_id.startswith(prefix)]
+            if len(removed) == 0 and path_id != '/':
+                return None
+            for run_spec_id in removed:
+                self.apps.pop(run_spec_id, None)
+                self.pods.pop(run_spec_id, None)
+            return self._deploy([(run_spec_id, 0, 1) for run_spec_id in removed])
+
+    def group(self, group_id):
+        """ The group with `group_id` and its sub groups as marathon nests them """
+        group_id = normalize_id(group_id)
+        with self.lock:
+            apps = [self.app_json(app) for app in self.apps.values()]
+            pods = list(self.pods.values())
+        return self._group(group_id, apps, pods)
+
+    def _group(self, group_id, apps, pods):
+        prefix = group_id.rstrip('/') + '/'
+        group = {'id': group_id, 'apps': [], 'pods': [], 'groups': [], 'dependencies': []}
+        sub_groups = set()
+        for kind, run_specs in [('apps', apps), ('pods', pods)]:
+            for run_spec in run_specs:
+                if not run_spec['id'].startswith(prefix):
+                    continue
+                rest = run_spec['id'][len(prefix):]
+                if '/' in rest:
+                    sub_groups.add(prefix + rest.split('/')[0])
+                else:
+                    group[kind].append(run_spec)
+        group['groups'] = [self._group(sub_group, apps, pods) for sub_group in sorted(sub_groups)]
+        return group
+
+    def _containers(self, run_spec):
+        return max(1, len(run_spec.get('containers', [])))
+
+    # deployments
+    def _deploy(self, changes):
+        """ changes are (run spec id, target instances, tasks per instance) """
+        now = time.time()
+        deployment = {
+            'id': str(uuid.uuid4()),
+            'version': timestamp(now),
+            'affectedApps': [change[0] for change in changes],
+            'affectedPods': [],
+            'steps': [],
+            'currentActions': [],
+            'currentStep': 1,
+            'totalSteps': 1,
+            'due': now + self.cluster.deployment_duration,
+            'changes': changes
+        }
+        for run_spec_id, instances, containers in changes:
+            tasks = self.run_spec_tasks.setdefault(run_spec_id, {})
+            for _ in range(len(tasks), instances * containers):
+                task = self.cluster.new_task(run_spec_id)
+                tasks[task['id']] = task
+        self.deployments[deployment['id']] = deployment
+        self.publish('deployment_info', plan={'id': deployment['id']}, currentStep={})
+        return deployment
+
+    def deployment_json(self, deployment):
+        return dict((key, value) for key, value in deployment.items() if key not in ('due', 'changes'))
+
+    def stop_deployment(self, deployment_id):
+        with self.lock:
+            return self.deployments.pop(deployment_id, None)
+
+    def tick(self, now):
+        with self.lock:
+            for deployment in list(self.deployments.values()):
+                if deployment['due'] <= now:
+                    self._finish(deployment)
+
+    def _finish(self, deployment):
+        del self.deployments[deployment['id']]
+        for run_spec_id, instances, containers in deployment['changes']:
+            tasks = self.run_spec_tasks.get(run_spec_id, {})
+            for index, task_id in enumerate(sorted(tasks)):
+                task = tasks[task_id]
+                if index >= instances * containers:
+                    del tasks[task_id]
+                    self._status_update(task, 'TASK_KILLED')
+                elif task['state'] != 'TASK_RUNNING':
+                    task['state'] = 'TASK_RUNNING'
+                    task['startedAt'] = timestamp()
+                    self._status_update(task, 'TASK_RUNNING')
+            if len(tasks) == 0:
+                self.run_spec_tasks.pop(run_spec_id, None)
+        self.publish('deployment_success', id=deployment['id'], plan={'id': deployment['id']})
+
+    def _status_update(self, task, state):
+        self.publish('status_update_event',
+                     slaveId=task['slaveId'],
+                     taskId=task['id'],
+                     taskStatus=state,
+                     message='',
+                     appId=task['appId'],
+                     host=task['host'],
+                     ports=[],
+                     version='')
+
+
+class FakeCluster(object):
+    """ Fake mesos master with a root marathon and any number of MoMs.
+
+    :param deployment_duration: seconds until a deployment finishes
+    :param latency: seconds added to each response
+    :param failure_rate: fraction of requests which are answered with 503
+    :param pods: False answers /v2/pods with 404 like marathon before 1.4
+    """
+
+    def __init__(self, deployment_duration=1.0, latency=0.0, failure_rate=0.0,
+                 agents=10, agent_cpus=100, agent_mem=100000, moms=None,
+                 version='1.5.0', dcos_version='1.10.0', pods=True):
+        self.deployment_duration = deployment_duration
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.agents = ['10.0.{}.{}'.format(n // 250, n % 250 + 1) for n in range(agents)]
+        self.agent_ids = ['{}-S{}'.format(uuid.uuid4(), n) for n in range(agents)]
+        self.agent_cpus = agent_cpus
+        self.agent_mem = agent_mem
+        self.dcos_version = dcos_version
+        self.pods = pods
+        self.marathons = {'marathon': FakeMarathon('marathon', version, self)}
+        for name, mom_version in (moms or {'marathon-user': version}).items():
+            self.marathons[name] = FakeMarathon(name, mom_version, self)
+        self.requests = {}
+        self.started = None
+        self._task_count = 0
+        self._lock = threading.Lock()
+        self.stopped = threading.Event()
+        self._server = None
+
+    def new_task(self, run_spec_id):
+        with self._lock:
+            self._task_count += 1
+            number = self._task_count
+        agent = number % len(self.agents)
+        return {
+            'id': '{}.{}'.format(run_spec_id.strip('/').replace('/', '_'), uuid.uuid4()),
+            'appId': run_spec_id,
+            'host': self.agents[agent],
+            'slaveId': self.agent_ids[agent],
+            'state': 'TASK_STAGING',
+            'stagedAt': timestamp(),
+            'ports': []
+        }
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return 'http://{}:{}/'.format(host, port)
+
+    def start(self, port=0):
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), FakeClusterHandler)
+        self._server.cluster = self
+        self.started = time.time()
+        for target in (self._server.serve_forever, self._tick):
+            thread = threading.Thread(target=target)
+            thread.daemon = True
+            thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def _tick(self):
+        while not self.stopped.wait(0.01):
+            now = time.time()
+            for fake_marathon in list(self.marathons.values()):
+                fake_marathon.tick(now)
+
+    def count_request(self, key):
+        with self._lock:
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+    def request_rates(self):
+        """ Requests per second for each endpoint since the start """
+        elapsed = max(time.time() - self.started, 0.001)
+        with self._lock:
+            return dict((key, round(count / elapsed, 3)) for key, count in self.requests.items())
+
+    # mesos
+    def all_tasks(self):
+        tasks = []
+        for fake_marathon in self.marathons.values():
+            tasks.extend((fake_marathon, task) for task in fake_marathon.tasks())
+        return tasks
+
+    def state_summary(self):
+        frameworks = []
+        task_count = 0
+        for fake_marathon in self.marathons.values():
+            framework = {'id': fake_marathon.framework_id, 'name': fake_marathon.name, 'active': True}
+            for task in fake_marathon.tasks():
+                framework[task['state']] = framework.get(task['state'], 0) + 1
+                task_count += 1
+            frameworks.append(framework)
+
+        used_cpus = task_count * 0.01 / len(self.agents)
+        used_mem = task_count * 32.0 / len(self.agents)
+        slaves = []
+        for agent_id, hostname in zip(self.agent_ids, self.agents):
+            slaves.append({
+                'id': agent_id,
+                'hostname': hostname,
+                'active': True,
+                'resources': {'cpus': self.agent_cpus, 'mem': self.agent_mem, 'disk': 0},
+                'used_resources': {'cpus': used_cpus, 'mem': used_mem, 'disk': 0},
+                'offered_resources': {'cpus': 0, 'mem': 0, 'disk': 0},
+                'reserved_resources': {},
+                'unreserved_resources': {'cpus': self.agent_cpus, 'mem': self.agent_mem, 'disk': 0}
+            })
+        return {'hostname': 'fake-master', 'cluster': 'fake', 'slaves': slaves, 'frameworks': frameworks}
+
+    def state(self):
+        state = self.state_summary()
+        for framework in state['frameworks']:
+            framework['tasks'] = []
+        frameworks = dict((framework['name'], framework) for framework in state['frameworks'])
+        for fake_marathon, task in self.all_tasks():
+            frameworks[fake_marathon.name]['tasks'].append({
+                'id': task['id'],
+                'name': task['appId'].strip('/'),
+                'framework_id': fake_marathon.framework_id,
+                'slave_id': task['slaveId'],
+                'state': task['state'],
+                'resources': {'cpus': 0.01, 'mem': 32}
+            })
+        return state
+
+
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class FakeClusterHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    MARATHON_PATH = re.compile('^/(?:marathon|service/([^/]+))(/.*)$')
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_PUT(self):
+        self._handle('PUT')
+
+    def do_DELETE(self):
+        self._handle('DELETE')
+
+    @property
+    def cluster(self):
+        return self.server.cluster
+
+    def _handle(self, method):
+        url = urllib.parse.urlparse(self.path)
+        query = urllib.parse.parse_qs(url.query)
+        body = self._body()
+
+        if self.cluster.latency > 0:
+            time.sleep(self.cluster.latency)
+        if self.cluster.failure_rate > 0 and random.random() < self.cluster.failure_rate:
+            self.cluster.count_request('{} 503'.format(method))
+            return self._respond(503, {'message': 'injected failure'})
+
+        if url.path.startswith('/mesos/'):
+            return self._mesos(method, url.path[len('/mesos'):])
+        if url.path == '/dcos-metadata/dcos-version.json':
+            self.cluster.count_request('GET /dcos-metadata')
+            return self._respond(200, {'version': self.cluster.dcos_version})
+
+        match = self.MARATHON_PATH.match(url.path)
+        if match is None:
+            return self._respond(404, {'message': 'not found'})
+        fake_marathon = self.cluster.marathons.get(match.group(1) or 'marathon')
+        if fake_marathon is None:
+            return self._respond(404, {'message': 'service not found'})
+        self._marathon(fake_marathon, method, match.group(2), query, body)
+
+    def _body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length == 0:
+            return None
+        try:
+            return json.loads(self.rfile.read(length).decode('utf-8'))
+        except ValueError:
+            return None
+
+    def _respond(self, status, data):
+        content = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _mesos(self, method, path):
+        self.cluster.count_request('{} /mesos{}'.format(method, path))
+        if path in ('/master/state-summary', '/state-summary'):
+            return self._respond(200, self.cluster.state_summary())
+        if path in ('/master/state', '/master/state.json', '/state'):
+            return self._respond(200, self.cluster.state())
+        if path in ('/master/tasks', '/tasks'):
+            tasks = []
+            for framework in self.cluster.state()['frameworks']:
+                tasks.extend(framework['tasks'])
+            return self._respond(200, {'tasks': tasks})
+        if path in ('/master/slaves', '/slaves'):
+            return self._respond(200, {'slaves': self.cluster.state_summary()['slaves']})
+        self._respond(404, {'message': 'not found'})
+
+    def _marathon(self, fake_marathon, method, path, query, body):
+        parts = path.strip('/').split('/', 2)
+        endpoint = '/'.join(parts[:2])
+        rest = parts[2] if len(parts) > 2 else ''
+        self.cluster.count_request('{} {}/{}'.format(method, fake_marathon.name, endpoint))
+        force = query.get('force', ['false'])[0] == 'true'
+
+        if path.rstrip('/') == '/ping':
+            content = b'pong'
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+            return
+        if endpoint == 'v2/info':
+            return self._respond(200, fake_marathon.info())
+        if endpoint == 'v2/events':
+            return self._events(fake_marathon)
+        if endpoint == 'v2/deployments':
+            if method == 'DELETE':
+                if fake_marathon.stop_deployment(rest) is None:
+                    return self._respond(404, {'message': 'unknown deployment'})
+                return self._respond(202, {})
+            with fake_marathon.lock:
+                deployments = [fake_marathon.deployment_json(d) for d in fake_marathon.deployments.values()]
+            return self._respond(200, deployments)
+        if endpoint == 'v2/tasks':
+            return self._respond(200, {'tasks': fake_marathon.tasks()})
+        if endpoint == 'v2/apps':
+            return self._apps(fake_marathon, method, rest, force, body)
+        if endpoint == 'v2/groups':
+            return self._groups(fake_marathon, method, rest, force, body)
+        if endpoint == 'v2/pods' and self.cluster.pods:
+            return self._pods(fake_marathon, method, rest, body)
+        self._respond(404, {'message': 'not found'})
+
+    def _deployment_result(self, deployment, status=200):
+        if deployment is None:
+            return self._respond(409, {'message': 'conflict'})
+        self._respond(status, {'deploymentId': deployment['id'], 'version': deployment['version']})
+
+    def _apps(self, fake_marathon, method, app_id, force, body):
+        if method == 'POST':
+            deployment = fake_marathon.add_apps([body], force)
+            if deployment is None:
+                return self._respond(409, {'message': 'An app with id [{}] already exists.'.format(body.get('id'))})
+            with fake_marathon.lock:
+                return self._respond(201, fake_marathon.app_json(fake_marathon.apps[normalize_id(body['id'])]))
+        if method == 'DELETE':
+            deployment = fake_marathon.remove(app_id)
+            if deployment is None:
+                return self._respond(404, {'message': 'App not found'})
+            return self._deployment_result(deployment)
+        if method == 'PUT':
+            deployment = fake_marathon.scale_app(app_id, body.get('instances', 1))
+            if deployment is None:
+                deployment = fake_marathon.add_apps([dict(body, id=app_id)], True)
+            return self._deployment_result(deployment)
+
+        with fake_marathon.lock:
+            if app_id == '':
+                return self._respond(200, {'apps': [fake_marathon.app_json(app) for app in fake_marathon.apps.values()]})
+            if app_id.endswith('/tasks'):
+                run_spec_id = normalize_id(app_id[:-len('/tasks')])
+                return self._respond(200, {'tasks': fake_marathon.tasks(run_spec_id)})
+            app = fake_marathon.apps.get(normalize_id(app_id))
+            if app is None:
+                return self._respond(404, {'message': 'App not found'})
+            return self._respond(200, {'app': fake_marathon.app_json(app)})
+
+    def _groups(self, fake_marathon, method, group_id, force, body):
+        if method == 'POST' or method == 'PUT':
+            group_id = normalize_id(body.get('id', group_id))
+            apps = list(body.get('apps', []))
+            groups = list(body.get('groups', []))
+            while groups:
+                group = groups.pop()
+                apps.extend(group.get('apps', []))
+                groups.extend(group.get('groups', []))
+            deployment = fake_marathon.add_apps(apps, force or method == 'PUT')
+            return self._deployment_result(deployment, 201)
+        if method == 'DELETE':
+            deployment = fake_marathon.remove(group_id)
+            if deployment is None:
+                return self._respond(404, {'message': 'Group not found'})
+            return self._deployment_result(deployment)
+        self._respond(200, fake_marathon.group(group_id))
+
+    def _pods(self, fake_marathon, method, pod_id, body):
+        if method == 'POST':
+            deployment = fake_marathon.add_pod(body)
+            if deployment is None:
+                return self._respond(409, {'message': 'Pod already exists'})
+            return self._respond(201, body)
+        if method == 'DELETE':
+            deployment = fake_marathon.remove(pod_id)
+            if deployment is None:
+                return self._respond(404, {'message': 'Pod not found'})
+            return self._respond(202, {})
+
+        with fake_marathon.lock:
+            pods = list(fake_marathon.pods.values())
+            if pod_id == '::status':
+                return self._respond(200, [{'id': pod['id'], 'spec': pod, 'status': 'STABLE'} for pod in pods])
+            if pod_id == '':
+                return self._respond(200, pods)
+            pod = fake_marathon.pods.get(normalize_id(pod_id))
+            if pod is None:
+                return self._respond(404, {'message': 'Pod not found'})
+            return self._respond(200, pod)
+
+    def _events(self, fake_marathon):
+        subscriber = fake_marathon.subscribe()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        try:
+            self._chunk(b'\r\n')
+            while not self.cluster.stopped.is_set():
+                try:
+                    event = subscriber.get(timeout=0.5)
+                except queue.Empty:
+                    # keep alive, this also notices disconnected subscribers
+                    self._chunk(b'\r\n')
+                    continue
+                message = 'event: {}\r\ndata: {}\r\n\r\n'.format(event['eventType'], json.dumps(event))
+                self._chunk(message.encode('utf-8'))
+        except (IOError, OSError):
+            pass
+        finally:
+            fake_marathon.unsubscribe(subscriber)
+            self.close_connection = True
+
+    def _chunk(self, data):
+        self.wfile.write('{:x}\r\n'.format(len(data)).encode('ascii') + data + b'\r\n')
+        self.wfile.flush()
+
+
+@contextlib.contextmanager
+def fake_cluster_config(cluster):
+    """ Context manager which points the dcos client to the fake `cluster`.
+    The dcos client reads a temporary config through DCOS_CONFIG, the config
+    of the user is not touched.
+    """
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'dcos.toml')
+    with open(path, 'w') as toml_file:
+        toml_file.write('[core]\ndcos_url = "{}"\n'.format(cluster.url))
+    # the dcos client refuses configs readable by others
+    os.chmod(path, 0o600)
+    previous = os.environ.get('DCOS_CONFIG')
+    os.environ['DCOS_CONFIG'] = path
+
+    try:
+        yield cluster
+    finally:
+        if previous is None:
+            del os.environ['DCOS_CONFIG']
+        else:
+            os.environ['DCOS_CONFIG'] = previous
+        shutil.rmtree(directory, ignore_errors=True)
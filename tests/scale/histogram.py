@@ -0,0 +1,105 @@
+import math
+import re
+import threading
+
+
+class LatencyHistogram(object):
+    """ HDR style latency histogram.  Latencies are recorded in microseconds
+    into buckets of `significant_digits` significant digits so the relative
+    error of every percentile is bounded while the memory is bounded by the
+    number of buckets, not the number of recorded values.
+    """
+
+    def __init__(self, significant_digits=3):
+        self.significant_digits = significant_digits
+        self.counts = {}
+        self.count = 0
+        self.min = None
+        self.max = None
+
+    def bucket(self, micros):
+        if micros < 1:
+            return 0
+        magnitude = 10 ** max(0, int(math.floor(math.log10(micros))) + 1 - self.significant_digits)
+        return int(micros // magnitude * magnitude)
+
+    def record(self, seconds):
+        micros = int(seconds * 1000000)
+        bucket = self.bucket(micros)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.min = micros if self.min is None else min(self.min, micros)
+        self.max = micros if self.max is None else max(self.max, micros)
+
+    def percentile(self, percent):
+        """ Latency in seconds below which `percent` of the values are, None if empty """
+        if self.count == 0:
+            return None
+        rank = max(1, int(math.ceil(percent / 100.0 * self.count)))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return bucket / 1000000.0
+        return self.max / 1000000.0
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'min': self.min / 1000000.0 if self.min is not None else None,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'p999': self.percentile(99.9),
+            'max': self.max / 1000000.0 if self.max is not None else None,
+            # bucket in microseconds to count
+            'buckets': dict((str(bucket), count) for bucket, count in sorted(self.counts.items()))
+        }
+
+
+# path segments which are ids rather than resources
+RESOURCES = ['apps', 'groups', 'pods', 'deployments', 'tasks', 'queue', 'info', 'events', 'leader',
+             'ping', 'metrics', 'versions', 'restart', 'instances', 'status',
+             'mesos', 'master', 'state-summary', 'state', 'slaves', 'marathon', 'service']
+
+
+def endpoint_of(method, path):
+    """ Endpoint of a request with the app, group and pod ids replaced by {id}:
+    `PUT /v2/apps/{id}`.
+    """
+    path = path.split('?')[0]
+    segments = []
+    for segment in path.strip('/').split('/'):
+        if segment in RESOURCES or re.match(r'^v\d+$', segment):
+            segments.append(segment)
+        elif len(segments) == 0 or segments[-1] != '{id}':
+            segments.append('{id}')
+    return '{} /{}'.format(method.upper(), '/'.join(segments))
+
+
+class LatencyRecorder(object):
+    """ Latency histograms of api calls per endpoint and response status """
+
+    def __init__(self, significant_digits=3):
+        self.significant_digits = significant_digits
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, status, seconds):
+        with self._lock:
+            key = (endpoint, str(status))
+            if key not in self.histograms:
+                self.histograms[key] = LatencyHistogram(self.significant_digits)
+            self.histograms[key].record(seconds)
+
+    def clear(self):
+        with self._lock:
+            self.histograms = {}
+
+    def to_dict(self):
+        """ {endpoint: {status: histogram}} """
+        with self._lock:
+            result = {}
+            for (endpoint, status), histogram in sorted(self.histograms.items()):
+                result.setdefault(endpoint, {})[status] = histogram.to_dict()
+            return result
@@ -0,0 +1,163 @@
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from utils import marathon_client
+
+
+def post_app(client, definition):
+    client.add_app(definition)
+
+
+def post_group(client, definition):
+    client.create_group(definition)
+
+
+def post_pod(client, definition):
+    client.add_pod(definition)
+
+
+class AppLauncher(object):
+    """ Posts app definitions to marathon keeping up to `concurrency` requests
+    in flight.  The launcher throttles itself when the deployment queue of
+    marathon grows beyond `max_deployments` or when the response latency of
+    `add_app` goes beyond `max_latency` seconds.  The latency of every request
+    is recorded in `latencies`.
+
+    Groups and pods are launched the same way by passing `post_group` or
+    `post_pod` to `launch`.
+    """
+
+    def __init__(self, test_obj=None, concurrency=8, max_deployments=30,
+                 max_latency=10.0, check_interval=1.0, client_factory=None):
+        self.test_obj = test_obj
+        self.concurrency = max(1, int(concurrency))
+        self.max_deployments = max_deployments
+        self.max_latency = max_latency
+        self.check_interval = check_interval
+        self.client_factory = client_factory or marathon_client
+
+        # (start time, latency in seconds, success)
+        self.latencies = []
+        self.deployment_depths = []
+        self.errors = 0
+
+        self._limit = self.concurrency
+        self._in_flight = 0
+        self._deployments = 0
+        self._done = False
+        self._error = None
+        self._condition = threading.Condition()
+
+    def launch(self, definitions, on_error=None, post=post_app):
+        """ Posts all `definitions` and blocks until every request returned.
+
+        :param definitions: iterable of app definitions
+        :param on_error: called with the exception of a failed request, an
+            exception raised by `on_error` stops the launch and is raised
+        :param post: function posting one definition with a marathon client
+        """
+        # a launcher is reused for several launches, e.g. the phases of a teardown
+        with self._condition:
+            self._limit = self.concurrency
+            self._in_flight = 0
+            self._deployments = 0
+            self._done = False
+            self._error = None
+
+        # bind to the marathon under test before the monitor starts
+        client = self.client_factory()
+        monitor = threading.Thread(target=self._monitor_deployments, args=(client,))
+        monitor.daemon = True
+        monitor.start()
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                for definition in definitions:
+                    self._acquire()
+                    if self._error is not None:
+                        self._release_slot()
+                        break
+                    executor.submit(self._post, client, definition, on_error, post)
+        finally:
+            with self._condition:
+                self._done = True
+                self._condition.notify_all()
+            monitor.join(self.check_interval * 2)
+        if self._error is not None:
+            raise self._error
+
+    def _acquire(self):
+        with self._condition:
+            while self._in_flight >= self._limit or self._deployments > self.max_deployments:
+                self._condition.wait(self.check_interval)
+            self._in_flight += 1
+
+    def _release_slot(self):
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def _release(self, latency, success):
+        with self._condition:
+            self._in_flight -= 1
+            if not success:
+                self.errors += 1
+            if not success or latency > self.max_latency:
+                # multiplicative decrease
+                self._limit = max(1, self._limit // 2)
+            elif latency < self.max_latency / 2 and self._limit < self.concurrency:
+                # additive increase
+                self._limit += 1
+            self._condition.notify_all()
+
+    def _post(self, client, definition, on_error, post):
+        start = time.time()
+        success = True
+        try:
+            post(client, definition)
+        except Exception as e:
+            success = False
+            self._add_event('launch exception: {}'.format(str(e)))
+            if on_error is not None:
+                try:
+                    on_error(e)
+                except Exception as error:
+                    with self._condition:
+                        if self._error is None:
+                            self._error = error
+        finally:
+            latency = time.time() - start
+            self.latencies.append((start, latency, success))
+            self._release(latency, success)
+
+    def _monitor_deployments(self, client):
+        while not self._done:
+            try:
+                depth = len(client.get_deployments())
+            except Exception:
+                # marathon is busy; the posting threads will report it
+                depth = self._deployments
+            self.deployment_depths.append((time.time(), depth))
+            with self._condition:
+                self._deployments = depth
+                self._condition.notify_all()
+                self._condition.wait(self.check_interval)
+
+    def _add_event(self, info):
+        if self.test_obj is not None:
+            self.test_obj.add_event(info)
+
+    def request_latencies(self):
+        return [latency for start, latency, success in self.latencies]
+
+    def ingest_rate(self):
+        """ Number of successful requests per second over the launch """
+        if len(self.latencies) == 0:
+            return 0
+        first = min(start for start, latency, success in self.latencies)
+        last = max(start + latency for start, latency, success in self.latencies)
+        successes = len([s for start, latency, s in self.latencies if s])
+        if last <= first:
+            return successes
+        return round(successes / (last - first), 3)
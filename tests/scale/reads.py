@@ -0,0 +1,90 @@
+import threading
+import time
+
+from stats import percentile
+from utils import marathon_client
+
+# the read requests of dashboards and service discovery
+READ_ENDPOINTS = {
+    'v2/apps': lambda client: client.get_apps(),
+    'v2/tasks': lambda client: client.get_tasks(None),
+    'v2/deployments': lambda client: client.get_deployments(),
+    'v2/info': lambda client: client.get_about()
+}
+
+
+class ReadLoad(object):
+    """ Runs `readers` threads which read the marathon api in a loop while a
+    scale test runs.  Each reader cycles through `endpoints` and waits
+    `think_time` seconds between reads.  Every read is recorded as
+    (timestamp, deployment phase of the test, endpoint, latency, success).
+    """
+
+    def __init__(self, test_obj, readers=4, endpoints=None, think_time=0, client_factory=None):
+        self.test_obj = test_obj
+        self.readers = readers
+        self.endpoints = endpoints or sorted(READ_ENDPOINTS)
+        self.think_time = think_time
+        self.client_factory = client_factory or marathon_client
+        self.reads = []
+        self._stopped = threading.Event()
+        self._threads = []
+
+    def start(self):
+        # bind to the marathon under test before the readers start
+        client = self.client_factory()
+        for reader in range(self.readers):
+            thread = threading.Thread(target=self._run, args=(client, reader))
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        for thread in self._threads:
+            thread.join(60)
+
+    def _run(self, client, reader):
+        # readers start at different endpoints so all endpoints are read all the time
+        index = reader
+        while not self._stopped.is_set():
+            endpoint = self.endpoints[index % len(self.endpoints)]
+            index += 1
+            phase = self.test_obj.phase
+            start = time.time()
+            success = True
+            try:
+                READ_ENDPOINTS[endpoint](client)
+            except Exception:
+                success = False
+            self.reads.append((round(start, 3), phase, endpoint, round(time.time() - start, 4), success))
+            if self.think_time > 0:
+                self._stopped.wait(self.think_time)
+
+    def phases(self):
+        """ phases in the order they were entered """
+        phases = []
+        for timestamp, phase, endpoint, latency, success in self.reads:
+            if phase not in phases:
+                phases.append(phase)
+        return phases
+
+    def summary(self):
+        """ Read latency percentiles per phase and endpoint """
+        summary = {}
+        for phase in self.phases():
+            summary[phase] = {}
+            for endpoint in self.endpoints:
+                latencies = [latency for t, p, e, latency, success in self.reads
+                             if p == phase and e == endpoint and success]
+                errors = len([r for r in self.reads if r[1] == phase and r[2] == endpoint and not r[4]])
+                summary[phase][endpoint] = {
+                    'reads': len(latencies),
+                    'errors': errors,
+                    'p50': percentile(latencies, 50),
+                    'p90': percentile(latencies, 90),
+                    'p99': percentile(latencies, 99),
+                    'max': percentile(latencies, 100)
+                }
+        return summary
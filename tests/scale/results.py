@@ -0,0 +1,220 @@
+""" Append-only store of scale test results.
+
+    Every scale test is stored as one `ScaleResult` json line in
+    `scale-results.jsonl`.  The store can be queried and exported with:
+
+    python results.py list
+    python results.py query --marathon root --style count
+    python results.py csv --output scale-test.csv
+"""
+import argparse
+import collections
+import csv
+import json
+import os
+import sys
+import time
+
+# as a script the shared modules are not on the path, see conftest.py
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir, 'shared'))
+from stats import percentile
+
+ScaleResult = collections.namedtuple('ScaleResult', [
+    'run_id',
+    'name',
+    # root, mom1, mom2
+    'marathon',
+    'marathon_version',
+    # apps, pods
+    'under_test',
+    # instances, count, group, batch
+    'style',
+    'count',
+    'instance',
+    'batch_size',
+    # successful, failed, skipped
+    'status',
+    'deploy_time',
+    'undeploy_time',
+    # killed tasks per second
+    'undeploy_rate',
+    # concurrent, root_group
+    'teardown_path',
+    'launch_rate',
+    'launch_latency_p50',
+    'launch_latency_p99',
+    'tasks_per_second',
+    'time_to_50',
+    'time_to_90',
+    'time_to_100',
+    # (time in test, event)
+    'events',
+    'metadata'
+])
+
+STYLES = ['instances', 'count', 'group', 'batch']
+
+
+def result_of(scale_test, run_id, metadata=None):
+    """ Creates the `ScaleResult` of a `ScaleTest` """
+    launch_rate = None
+    latency_p50 = None
+    latency_p99 = None
+    if scale_test.launcher is not None:
+        latencies = scale_test.launcher.request_latencies()
+        launch_rate = scale_test.launcher.ingest_rate()
+        latency_p50 = percentile(latencies, 50)
+        latency_p99 = percentile(latencies, 99)
+
+    progress = {}
+    if scale_test.sampler is not None:
+        progress = scale_test.sampler.summary()
+
+    return ScaleResult(
+        run_id=run_id,
+        name=scale_test.name,
+        marathon=scale_test.mom,
+        marathon_version=getattr(scale_test, 'mom_version', None),
+        under_test=scale_test.under_test,
+        style=scale_test.style,
+        count=scale_test.count,
+        instance=scale_test.instance,
+        batch_size=scale_test.batch_size if scale_test.style == 'batch' else None,
+        status=scale_test.status,
+        deploy_time=scale_test.deploy_time if scale_test.deploy_time != 'x' else None,
+        undeploy_time=scale_test.undeploy_time,
+        undeploy_rate=scale_test.undeploy_rate,
+        teardown_path=scale_test.teardown_path,
+        launch_rate=launch_rate,
+        launch_latency_p50=latency_p50,
+        launch_latency_p99=latency_p99,
+        tasks_per_second=progress.get('tasks_per_second'),
+        time_to_50=progress.get('time_to_50'),
+        time_to_90=progress.get('time_to_90'),
+        time_to_100=progress.get('time_to_100'),
+        events=scale_test.events,
+        metadata=metadata or {})
+
+
+class ResultsStore(object):
+    """ Scale results appended as json lines to `filename` """
+
+    def __init__(self, filename='scale-results.jsonl'):
+        self.filename = filename
+
+    def append(self, results):
+        with open(self.filename, 'a') as out:
+            for result in results:
+                out.write(json.dumps(result._asdict(), separators=(',', ':')))
+                out.write('\n')
+
+    def read(self):
+        if not os.path.isfile(self.filename):
+            return []
+        results = []
+        with open(self.filename, 'r') as fin:
+            for line in fin:
+                if line.strip():
+                    record = json.loads(line)
+                    results.append(ScaleResult(**dict((field, record.get(field)) for field in ScaleResult._fields)))
+        return results
+
+    def runs(self):
+        """ run ids in the order they were stored """
+        runs = []
+        for result in self.read():
+            if result.run_id not in runs:
+                runs.append(result.run_id)
+        return runs
+
+    def query(self, run_id=None, **criteria):
+        """ Results of `run_id` (all runs if None) matching all field `criteria` """
+        return [result for result in self.read()
+                if (run_id is None or result.run_id == run_id) and
+                all(getattr(result, field) == value for field, value in criteria.items())]
+
+
+def new_run_id():
+    return time.strftime('%Y%m%d-%H%M%S')
+
+
+def target_of(result):
+    if result.style == 'instances':
+        return result.instance
+    return result.count
+
+
+def write_csv(results, filename='scale-test.csv'):
+    """ Writes `results` in the layout of the scale test csv:  for apps and
+    pods, each marathon and style a title line, a row of targets, for the batch style a
+    row of batch sizes and a row of deploy times.
+    """
+    marathons = []
+    under_tests = []
+    for result in results:
+        if result.marathon not in marathons:
+            marathons.append(result.marathon)
+        if result.under_test not in under_tests:
+            under_tests.append(result.under_test)
+
+    with open(filename, 'w') as f:
+        w = csv.writer(f, quoting=csv.QUOTE_NONNUMERIC)
+        for under_test in under_tests:
+            for style in STYLES:
+                for marathon in sorted(marathons):
+                    selected = [r for r in results
+                                if r.marathon == marathon and r.style == style and r.under_test == under_test]
+                    if len(selected) == 0:
+                        continue
+                    title = style if under_test == 'apps' else '{} {}'.format(under_test, style)
+                    f.write('Marathon: {}, {}'.format(selected[0].marathon_version or marathon, title))
+                    f.write('\n')
+                    w.writerow([target_of(r) for r in selected])
+                    if style == 'batch':
+                        w.writerow([r.batch_size for r in selected])
+                    w.writerow([r.deploy_time if r.deploy_time is not None else 'x' for r in selected])
+                    f.write('\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Query and export scale test results')
+    parser.add_argument('--store', default='scale-results.jsonl', help='results file')
+    commands = parser.add_subparsers(dest='command')
+
+    commands.add_parser('list', help='list the stored runs')
+
+    query = commands.add_parser('query', help='print results as json lines')
+    query.add_argument('--run', help='run id, all runs by default')
+    query.add_argument('--marathon', help='root, mom1, mom2')
+    query.add_argument('--style', choices=STYLES)
+    query.add_argument('--under-test', choices=['apps', 'pods'])
+    query.add_argument('--status', choices=['successful', 'failed', 'skipped'])
+
+    export = commands.add_parser('csv', help='write the scale test csv of a run')
+    export.add_argument('--run', help='run id, the latest run by default')
+    export.add_argument('--output', default='scale-test.csv')
+
+    args = parser.parse_args(argv)
+    store = ResultsStore(args.store)
+
+    if args.command == 'list':
+        for run_id in store.runs():
+            print('{}: {} tests'.format(run_id, len(store.query(run_id))))
+    elif args.command == 'query':
+        criteria = dict((field, getattr(args, field)) for field in ('marathon', 'style', 'under_test', 'status')
+                        if getattr(args, field) is not None)
+        for result in store.query(args.run, **criteria):
+            print(json.dumps(result._asdict()))
+    elif args.command == 'csv':
+        runs = store.runs()
+        run_id = args.run or (runs[-1] if runs else None)
+        write_csv(store.query(run_id), args.output)
+        print('wrote {} for run {}'.format(args.output, run_id))
+    else:
+        parser.print_help()
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
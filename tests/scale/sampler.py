@@ -0,0 +1,179 @@
+import threading
+import time
+
+from utils import marathon_client, mesos_state_summary
+
+
+def framework_task_counts(summary, framework_name):
+    """ Returns the running and staged task counts of the framework named
+    `framework_name` from a mesos state summary.
+    """
+    running = 0
+    staged = 0
+    for framework in summary.get('frameworks', []):
+        if framework.get('name') == framework_name:
+            running += framework.get('TASK_RUNNING', 0)
+            staged += framework.get('TASK_STAGING', 0) + framework.get('TASK_STARTING', 0)
+    return running, staged
+
+
+class LaunchSampler(object):
+    """ Samples (timestamp, running tasks, staged tasks, active deployments) of
+    a scale test in a background thread every `interval` seconds.  The tasks are
+    counted from the mesos state summary for the framework under test, the
+    deployments are read from the marathon under test.
+    """
+
+    def __init__(self, test_obj, interval=0.5, stall_threshold=10):
+        self.test_obj = test_obj
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.framework_name = 'marathon' if test_obj.mom == 'root' else 'marathon-user'
+        self.samples = []
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._client = marathon_client()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(self.interval * 4)
+
+    def _run(self):
+        next_sample = time.time()
+        while not self._stopped.is_set():
+            try:
+                self.samples.append(self.sample())
+            except Exception as e:
+                # marathon or mesos are busy, skip this sample
+                pass
+            next_sample += self.interval
+            self._stopped.wait(max(0, next_sample - time.time()))
+
+    def sample(self):
+        timestamp = time.time()
+        running, staged = framework_task_counts(mesos_state_summary(), self.framework_name)
+        deployments = len(self._client.get_deployments())
+        return (round(timestamp, 3), running, staged, deployments)
+
+    def target_tasks(self):
+        return self.test_obj.target_tasks()
+
+    def time_to(self, fraction):
+        """ Seconds from the start of the test until `fraction` of the target
+        tasks were running or None if that was not reached.
+        """
+        if len(self.samples) == 0:
+            return None
+        baseline = self.samples[0][1]
+        needed = baseline + fraction * self.target_tasks()
+        for timestamp, running, staged, deployments in self.samples:
+            if running >= needed:
+                return round(timestamp - self.test_obj.start, 3)
+        return None
+
+    def rates(self):
+        """ Tasks per second between consecutive samples as (timestamp, rate) """
+        rates = []
+        for previous, current in zip(self.samples, self.samples[1:]):
+            elapsed = current[0] - previous[0]
+            if elapsed > 0:
+                rates.append((current[0], round((current[1] - previous[1]) / elapsed, 3)))
+        return rates
+
+    def tasks_per_second(self):
+        if len(self.samples) < 2:
+            return None
+        first = self.samples[0]
+        last = self.samples[-1]
+        if last[0] <= first[0]:
+            return None
+        return round((last[1] - first[1]) / (last[0] - first[0]), 3)
+
+    def stalls(self):
+        """ Intervals of at least `stall_threshold` seconds in which the number of
+        running tasks did not grow while the target was not reached.
+        """
+        stalls = []
+        if len(self.samples) == 0:
+            return stalls
+        target = self.samples[0][1] + self.target_tasks()
+        stall_start = None
+        last_running = None
+        for timestamp, running, staged, deployments in self.samples:
+            if last_running is not None and running <= last_running and running < target:
+                if stall_start is None:
+                    stall_start = previous_timestamp
+            else:
+                if stall_start is not None and previous_timestamp - stall_start >= self.stall_threshold:
+                    stalls.append((stall_start, previous_timestamp))
+                stall_start = None
+            last_running = running
+            previous_timestamp = timestamp
+        if stall_start is not None and previous_timestamp - stall_start >= self.stall_threshold:
+            stalls.append((stall_start, previous_timestamp))
+        return [(round(start - self.test_obj.start, 3), round(end - self.test_obj.start, 3))
+                for start, end in stalls]
+
+    def summary(self):
+        return {
+            'interval': self.interval,
+            'tasks_per_second': self.tasks_per_second(),
+            'time_to_50': self.time_to(0.5),
+            'time_to_90': self.time_to(0.9),
+            'time_to_100': self.time_to(1.0),
+            'stalls': self.stalls()
+        }
+
+    def to_dict(self):
+        series = self.summary()
+        series['samples'] = self.samples
+        return series
+
+
+class TeardownSampler(LaunchSampler):
+    """ Samples the tasks of the framework under test while it is torn down
+    and reports the kill rate in tasks per second.
+    """
+
+    def active(self, sample):
+        timestamp, running, staged, deployments = sample
+        return running + staged
+
+    def tasks_killed(self):
+        if len(self.samples) < 2:
+            return 0
+        return max(0, self.active(self.samples[0]) - self.active(self.samples[-1]))
+
+    def kill_rate(self):
+        """ Killed tasks per second from the first to the last sample """
+        if len(self.samples) < 2:
+            return None
+        elapsed = self.samples[-1][0] - self.samples[0][0]
+        if elapsed <= 0:
+            return None
+        return round(self.tasks_killed() / elapsed, 3)
+
+    def kill_rates(self):
+        """ Killed tasks per second between consecutive samples as (timestamp, rate) """
+        rates = []
+        for previous, current in zip(self.samples, self.samples[1:]):
+            elapsed = current[0] - previous[0]
+            if elapsed > 0:
+                rates.append((current[0], round((self.active(previous) - self.active(current)) / elapsed, 3)))
+        return rates
+
+    def summary(self):
+        rates = [rate for timestamp, rate in self.kill_rates()]
+        return {
+            'interval': self.interval,
+            'tasks_killed': self.tasks_killed(),
+            'kill_rate': self.kill_rate(),
+            'peak_kill_rate': max(rates) if rates else None
+        }
@@ -0,0 +1,95 @@
+from launcher import AppLauncher
+from dcos.errors import DCOSException
+from utils import http_status, marathon_client
+
+
+def remove_app(client, app_id):
+    client.remove_app(app_id, True)
+
+
+def remove_pod(client, pod_id):
+    client.remove_pod(pod_id, True)
+
+
+def remove_group(client, group_id):
+    client.remove_group(group_id, True)
+
+
+def root_content(client):
+    """ Returns the ids of the apps, pods and groups in the root group """
+    root = client.get_group('/')
+    apps = [app['id'] for app in root.get('apps', [])]
+    groups = [group['id'] for group in root.get('groups', [])]
+    # pods of sub groups are removed with their group
+    try:
+        pods = [pod['id'] for pod in client.list_pod() if pod['id'].count('/') == 1]
+    except DCOSException as e:
+        # marathon before 1.4 has no /v2/pods
+        if http_status(e) != 404:
+            raise
+        pods = []
+    return apps, pods, groups
+
+
+class Teardown(object):
+    """ Removes everything from marathon with up to `concurrency` delete
+    requests in flight.  The top level groups, the pods and the apps of the
+    root group are removed with one request each.  The requests are throttled
+    on the marathon deployment queue like the launch of a scale test.  With
+    more than `root_group_apps` apps in the root group, as after a `count`
+    test, the root group is removed with a single request instead.  `path`
+    is the way the teardown went, `concurrent` or `root_group`, it is recorded
+    as the `teardown_path` of the test.
+
+    While the tasks are killed a `TeardownSampler` of the test measures the
+    kill rate.
+    """
+
+    def __init__(self, test_obj=None, concurrency=8, max_deployments=30,
+                 max_latency=10.0, client_factory=None, root_group_apps=1000, check_interval=1.0):
+        self.test_obj = test_obj
+        self.client_factory = client_factory or marathon_client
+        self.root_group_apps = root_group_apps
+        self.launcher = AppLauncher(test_obj, concurrency, max_deployments, max_latency,
+                                    check_interval, client_factory=self.client_factory)
+        self.removed = {'apps': 0, 'pods': 0, 'groups': 0}
+        self.errors = []
+        self.path = None
+
+    def run(self):
+        """ Sends all delete requests and returns without waiting for the
+        deployments.  Groups are removed first as they hold most of the tasks
+        of the group and batch styles.
+        """
+        client = self.client_factory()
+        apps, pods, groups = root_content(client)
+        self._enter_path('root_group' if len(apps) > self.root_group_apps else 'concurrent')
+        if self.path == 'root_group':
+            remove_group(client, '/')
+            self.removed = {'apps': len(apps), 'pods': len(pods), 'groups': len(groups)}
+            return self
+
+        for kind, ids, remove in [('groups', groups, remove_group),
+                                  ('pods', pods, remove_pod),
+                                  ('apps', apps, remove_app)]:
+            if len(ids) == 0:
+                continue
+            self.launcher.launch(ids, self.errors.append, remove)
+            self.removed[kind] += len(ids)
+
+        if self.errors:
+            raise self.errors[0]
+        return self
+
+    def _enter_path(self, path):
+        self.path = path
+        if self.test_obj is not None:
+            self.test_obj.teardown_path = path
+            self.test_obj.add_event('teardown: {}'.format(path))
+
+    def request_latencies(self):
+        return self.launcher.request_latencies()
+
+    def delete_rate(self):
+        """ Number of successful delete requests per second """
+        return self.launcher.ingest_rate()
@@ -0,0 +1,174 @@
+from common import *
+from fake_cluster import FakeCluster, fake_cluster_config
+from teardown import Teardown
+
+import pytest
+import threading
+import tracemalloc
+
+"""
+    Runs the scale harness against an in-process fake of marathon and mesos.
+    No DC/OS cluster is needed.  These tests measure the harness itself:  its
+    cpu time, peak memory and the request rate it causes per endpoint.
+
+    to launch: py.test --capture=no tests/scale/test_fake_harness.py
+"""
+
+fake = None
+harness_results = []
+
+
+def run_measured(name, fn, *args):
+    requests_before = sum(fake.requests.values())
+    tracemalloc.start()
+    cpu_start = time.process_time()
+    start = time.time()
+
+    fn(*args)
+
+    elapsed = elapse_time(start)
+    cpu = round(time.process_time() - cpu_start, 3)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    requests_made = sum(fake.requests.values()) - requests_before
+    result = {
+        'test': name,
+        'time': elapsed,
+        'cpu': cpu,
+        'peak_memory_mb': round(peak / (1024.0 * 1024.0), 3),
+        'requests': requests_made,
+        'requests_per_second': round(requests_made / max(elapsed, 0.001), 3)
+    }
+    harness_results.append(result)
+    print(result)
+    return result
+
+
+def run_scale_test(name):
+    current_test = start_test(name)
+    if current_test.under_test == 'pods':
+        run_measured(name, scale_test_pods, current_test)
+    else:
+        run_measured(name, scale_test_apps, current_test)
+    current_test.log_events()
+    current_test.log_stats()
+    assert current_test.status == 'successful'
+
+
+@pytest.mark.parametrize("num_apps", [100, 1000, 10000, 25000])
+def test_fake_count_scale(num_apps):
+    run_scale_test('test_root_apps_count_{}_1'.format(num_apps))
+
+
+@pytest.mark.parametrize("num_apps", [100, 1000, 10000, 25000])
+def test_fake_group_scale(num_apps):
+    run_scale_test('test_root_apps_group_{}_1'.format(num_apps))
+
+
+@pytest.mark.parametrize("num_instances", [100, 1000, 10000, 25000])
+def test_fake_instance_scale(num_instances):
+    run_scale_test('test_root_apps_instances_1_{}'.format(num_instances))
+
+
+@pytest.mark.parametrize("num_pods", [100, 1000, 5000])
+def test_fake_pod_scale(num_pods):
+    run_scale_test('test_root_pods_count_{}_1'.format(num_pods))
+
+
+class TeardownClient(object):
+    """ Marathon client stub for the teardown.  Every removal starts a
+    deployment, every `get_deployments` finishes `finished_per_check` of them.
+    """
+
+    def __init__(self, groups, pods, apps, finished_per_check=10):
+        self.groups = ['/group-{}'.format(num) for num in range(groups)]
+        self.pods = ['/pod-{}'.format(num) for num in range(pods)]
+        self.apps = ['/app-{}'.format(num) for num in range(apps)]
+        self.finished_per_check = finished_per_check
+        self.removed = []
+        self.deployments = 0
+        self.lock = threading.Lock()
+
+    def get_group(self, group_id):
+        return {'apps': [{'id': app} for app in self.apps],
+                'groups': [{'id': group} for group in self.groups]}
+
+    def list_pod(self):
+        return [{'id': pod} for pod in self.pods]
+
+    def get_deployments(self):
+        with self.lock:
+            deployments = [{}] * self.deployments
+            self.deployments = max(0, self.deployments - self.finished_per_check)
+            return deployments
+
+    def _remove(self, id, force=False):
+        with self.lock:
+            self.removed.append(id)
+            self.deployments += 1
+
+    remove_group = _remove
+    remove_pod = _remove
+    remove_app = _remove
+
+
+def run_teardown(teardown):
+    thread = threading.Thread(target=teardown.run)
+    thread.daemon = True
+    thread.start()
+    thread.join(60)
+    assert not thread.is_alive(), 'teardown hangs'
+
+
+@pytest.mark.parametrize("groups,pods,apps", [(60, 20, 100), (0, 0, 5000), (20, None, 50)])
+def test_teardown_phases(groups, pods, apps):
+    """ Each phase of a teardown starts with a fresh launcher state, a
+    deployment queue above `max_deployments` at the end of a phase must not
+    block the next one.  With `pods` None the teardown runs against a fake
+    marathon without /v2/pods.
+    """
+    if pods is None:
+        without_pods = FakeCluster(deployment_duration=0.05, pods=False).start()
+        try:
+            fake_marathon = without_pods.marathons['marathon']
+            fake_marathon.add_apps([{'id': '/group-{}/app'.format(num)} for num in range(groups)] +
+                                   [{'id': '/app-{}'.format(num)} for num in range(apps)])
+            teardown = Teardown(concurrency=8, max_deployments=5,
+                                client_factory=client_factory(url=without_pods.url + 'marathon/'),
+                                root_group_apps=1000, check_interval=0.01)
+            run_teardown(teardown)
+            assert teardown.removed == {'apps': apps, 'pods': 0, 'groups': groups}
+            assert fake_marathon.apps == {}
+        finally:
+            without_pods.stop()
+        return
+
+    client = TeardownClient(groups, pods, apps)
+    teardown = Teardown(concurrency=8, max_deployments=5, client_factory=lambda: client,
+                        root_group_apps=1000, check_interval=0.01)
+    run_teardown(teardown)
+    if apps > 1000:
+        assert client.removed == ['/']
+    else:
+        assert sorted(client.removed) == sorted(client.groups + client.pods + client.apps)
+        assert teardown.removed == {'apps': apps, 'pods': pods, 'groups': groups}
+
+
+@pytest.fixture(scope='module', autouse=True)
+def fake_cluster():
+    global fake
+    fake = FakeCluster(
+        deployment_duration=float(os.environ.get('FAKE_DEPLOYMENT_DURATION', 1.0)),
+        latency=float(os.environ.get('FAKE_LATENCY', 0)),
+        failure_rate=float(os.environ.get('FAKE_FAILURE_RATE', 0)),
+        agents=int(os.environ.get('FAKE_AGENTS', 100))).start()
+    print('fake cluster at {}'.format(fake.url))
+    try:
+        with fake_cluster_config(fake):
+            yield fake
+    finally:
+        for result in harness_results:
+            print(result)
+        for endpoint, rate in sorted(fake.request_rates().items()):
+            print('{}: {} requests, {}/s'.format(endpoint, fake.requests[endpoint], rate))
+        fake.stop()
@@ -1,11 +1,25 @@
 from common import app, available_resources, cluster_info, ensure_mom_version
 from datetime import timedelta
 from dcos import marathon
+from launcher import AppLauncher
+from stats import percentile
 import itertools
+import json
 import logging
 import math
+import os
 import shakedown
-from utils import marathon_on_marathon
+import time
+from utils import marathon_client, marathon_on_marathon
+
+# size of the first probe of a capacity search
+CAP_START = int(os.environ.get('CAP_START', 100))
+# a capacity search stops once the limit is bracketed to this size
+CAP_PRECISION = int(os.environ.get('CAP_PRECISION', 100))
+# a probe fails if its deployment takes longer (seconds)
+CAP_MAX_DEPLOY_TIME = float(os.environ.get('CAP_MAX_DEPLOY_TIME', timedelta(minutes=10).total_seconds()))
+# a probe fails if the p99 latency of its api requests is higher (seconds)
+CAP_MAX_API_LATENCY = float(os.environ.get('CAP_MAX_API_LATENCY', 10))
 
 def setup_module(module):
     """ Setup test module
@@ -79,7 +93,7 @@ def test_incremental_scale():
     cluster_info()
     print(available_resources())
 
-    client = marathon.create_client()
+    client = marathon_client()
     client.add_app(app_def("cap-app"))
 
     for new_size in incremental_steps(linear_step_function(step_size=1000)):
@@ -102,7 +116,7 @@ def test_incremental_app_scale():
     cluster_info()
     print(available_resources())
 
-    client = marathon.create_client()
+    client = marathon_client()
     client.remove_group('/')
 
     for step in itertools.count(start=1):
@@ -124,7 +138,7 @@ def test_incremental_apps_per_group_scale():
     cluster_info()
     print(available_resources())
 
-    client = marathon.create_client()
+    client = marathon_client()
 
     batch_size_for = exponential_decay(start=500, decay=0.3)
     for step in itertools.count(start=0):
@@ -144,3 +158,205 @@ def test_incremental_apps_per_group_scale():
         shakedown.deployment_wait(timeout=timedelta(minutes=15).total_seconds())
 
         shakedown.echo("done.")
+
+
+class Probe(object):
+    """ Result of deploying one size in a capacity search """
+
+    def __init__(self, size, ok, deploy_time=None, api_latency=None, reason=None):
+        self.size = size
+        self.ok = ok
+        self.deploy_time = deploy_time
+        self.api_latency = api_latency
+        self.reason = reason
+
+    def __repr__(self):
+        return "size: {} ok: {} deploy: {} api latency: {} reason: {}".format(
+            self.size, self.ok, self.deploy_time, self.api_latency, self.reason)
+
+
+def capacity_search(probe, start=CAP_START, precision=CAP_PRECISION):
+    """
+    Finds the largest size for which `probe` succeeds.  The size doubles from
+    `start` until the first failure, then the interval between the last success
+    and the first failure is bisected until it is smaller than `precision`.
+
+    :param probe: function deploying a size and returning a `Probe`
+    :return: (largest good size, list of all probes)
+    """
+    probes = []
+
+    def run(size):
+        shakedown.echo("Probing {}".format(size))
+        result = probe(size)
+        shakedown.echo("{}".format(result))
+        probes.append(result)
+        return result.ok
+
+    good = 0
+    bad = None
+    size = start
+    while bad is None:
+        if run(size):
+            good = size
+            size *= 2
+        else:
+            bad = size
+
+    while bad - good > precision:
+        size = (good + bad) // 2
+        if run(size):
+            good = size
+        else:
+            bad = size
+
+    return good, probes
+
+
+def request_latency(fn, *args):
+    """ Seconds `fn` takes """
+    start = time.time()
+    fn(*args)
+    return time.time() - start
+
+
+def polled_deployment_wait(client, timeout, interval=1):
+    """ Polls the deployments of the marathon of `client` until there are none.
+
+    :return: latencies of the polls in seconds
+    """
+    latencies = []
+    deadline = time.time() + timeout
+    while True:
+        start = time.time()
+        deployments = client.get_deployments()
+        latencies.append(time.time() - start)
+        if len(deployments) == 0:
+            return latencies
+        if time.time() > deadline:
+            raise TimeoutError('deployments did not finish within {}s'.format(timeout))
+        time.sleep(interval)
+
+
+def timed_deployment(deploy):
+    """ Runs `deploy`, waits for its deployment and checks the SLOs.  The api
+    latency is the p99 of the requests of `deploy` and of the deployment
+    polls while it deploys, not the time `deploy` takes overall.
+
+    :param deploy: function deploying with a client, returns the latencies of its requests
+    :return: `Probe` without size
+    """
+    client = marathon_client()
+    start = time.time()
+    try:
+        request_latencies = deploy(client)
+        poll_latencies = polled_deployment_wait(client, CAP_MAX_DEPLOY_TIME)
+    except Exception as e:
+        return Probe(None, False, reason=str(e))
+    deploy_time = round(time.time() - start, 3)
+    api_latency = percentile(request_latencies + poll_latencies, 99)
+
+    if deploy_time > CAP_MAX_DEPLOY_TIME:
+        return Probe(None, False, deploy_time, api_latency, 'deployment too slow')
+    if api_latency > CAP_MAX_API_LATENCY:
+        return Probe(None, False, deploy_time, api_latency, 'api too slow')
+    return Probe(None, True, deploy_time, api_latency)
+
+
+def sized(result, size):
+    result.size = size
+    return result
+
+
+def reset_root():
+    client = marathon_client()
+    try:
+        client.remove_group('/', True)
+    except Exception:
+        # nothing to remove
+        pass
+    polled_deployment_wait(client, timedelta(minutes=30).total_seconds())
+
+
+def instances_probe(size):
+    """ Scales one app to `size` instances """
+    def deploy(client):
+        return [request_latency(client.scale_app, '/cap-app', size)]
+
+    client = marathon_client()
+    try:
+        client.get_app('/cap-app')
+    except Exception:
+        client.add_app(app_def('cap-app'))
+        polled_deployment_wait(client, CAP_MAX_DEPLOY_TIME)
+
+    result = sized(timed_deployment(deploy), size)
+    if not result.ok:
+        reset_root()
+    return result
+
+
+def apps_probe(size):
+    """ Launches `size` apps in the root group """
+    def deploy(client):
+        launcher = AppLauncher(client_factory=lambda: client)
+        launcher.launch(app_def('app-{0:0>5}'.format(num)) for num in range(size))
+        if launcher.errors > 0:
+            raise Exception('{} of {} app requests failed'.format(launcher.errors, size))
+        return launcher.request_latencies()
+
+    reset_root()
+    return sized(timed_deployment(deploy), size)
+
+
+def apps_per_group_probe(size):
+    """ Launches one group of `size` apps """
+    def deploy(client):
+        return [request_latency(client.create_group, {
+            "apps": [app_def("app-{0:0>5}".format(num)) for num in range(size)],
+            "dependencies": [],
+            "id": "/cap-group"
+        })]
+
+    reset_root()
+    return sized(timed_deployment(deploy), size)
+
+
+def run_capacity_search(name, probe):
+    cluster_info()
+    print(available_resources())
+
+    reset_root()
+    capacity, probes = capacity_search(probe)
+    reset_root()
+
+    shakedown.echo("{} capacity: {} (precision {})".format(name, capacity, CAP_PRECISION))
+    with open('capacity-{}.json'.format(name), 'w') as out:
+        json.dump({
+            'capacity': capacity,
+            'precision': CAP_PRECISION,
+            'max_deploy_time': CAP_MAX_DEPLOY_TIME,
+            'max_api_latency': CAP_MAX_API_LATENCY,
+            'probes': [probe.__dict__ for probe in probes]
+        }, out)
+
+
+def test_instances_capacity():
+    """
+    Searches the maximum number of instances of one app.
+    """
+    run_capacity_search('instances', instances_probe)
+
+
+def test_apps_capacity():
+    """
+    Searches the maximum number of apps in the root group.
+    """
+    run_capacity_search('apps', apps_probe)
+
+
+def test_apps_per_group_capacity():
+    """
+    Searches the maximum number of apps in one group.
+    """
+    run_capacity_search('apps-per-group', apps_per_group_probe)
@@ -0,0 +1,230 @@
+from utils import *
+from common import *
+from sampler import framework_task_counts
+
+import csv
+import os
+import pytest
+import threading
+import time
+"""
+    Drives load against the root marathon and N MoMs at the same time, the way
+    they share the mesos master and its offers in production.  Each framework
+    first launches its apps alone, then all frameworks launch together.  For
+    every framework the launch rate, the offer starvation and the slowdown
+    compared with running alone are reported.
+
+    The MoMs are read from CONTENTION_MOMS as comma separated service names
+    and have to be installed already.  The load of each framework is
+    CONTENTION_COUNT apps with CONTENTION_INSTANCES instances.
+"""
+moms = [name.strip() for name in os.environ.get('CONTENTION_MOMS', 'marathon-user').split(',') if name.strip()]
+count = int(os.environ.get('CONTENTION_COUNT', 1000))
+instances = int(os.environ.get('CONTENTION_INSTANCES', 1))
+# seconds to wait for the deployments of one framework
+deploy_timeout = float(os.environ.get('CONTENTION_TIMEOUT', 1800))
+
+results = []
+
+
+class FrameworkLoad(object):
+    """ Launches `count` apps of `instances` instances on the marathon service
+    `name` and waits for its deployments.  The marathon is addressed by url so
+    several loads run at the same time without switching the dcos config.
+    """
+
+    def __init__(self, name, count=100, instances=1):
+        self.name = name
+        self.url = service_url(name)
+        self.count = count
+        self.instances = instances
+        self.start = None
+        self.end = None
+        self.launcher = None
+        self.error = None
+
+    def client(self):
+        return marathon_client(self.url)
+
+    def target_tasks(self):
+        return self.count * self.instances
+
+    def run(self):
+        self.start = time.time()
+        self.end = None
+        self.error = None
+        self.launcher = AppLauncher(concurrency=LAUNCH_CONCURRENCY,
+                                    max_deployments=LAUNCH_MAX_DEPLOYMENTS,
+                                    max_latency=LAUNCH_MAX_LATENCY,
+                                    client_factory=self.client)
+        try:
+            self.launcher.launch(app('/contention/{}'.format(num), self.instances)
+                                 for num in range(1, self.count + 1))
+            self.end, failed = event_deployment_wait(timeout=deploy_timeout, url=self.url)
+            assert not failed, failed_deployments(failed)
+            if self.end is None:
+                self.end = self.wait_for_deployments()
+        except Exception as e:
+            self.error = e
+
+    def wait_for_deployments(self):
+        deadline = time.time() + deploy_timeout
+        while len(self.client().get_deployments()) > 0:
+            if time.time() > deadline:
+                raise TestException()
+            time.sleep(1)
+        return time.time()
+
+    def teardown(self):
+        # only the load, the root marathon also runs the MoMs
+        try:
+            self.client().remove_group('/contention', True)
+        except DCOSException:
+            # nothing launched
+            pass
+        self.wait_for_deployments()
+
+    def deploy_time(self):
+        if self.end is None:
+            return None
+        return elapse_time(self.start, self.end)
+
+    def launch_rate(self):
+        """ Launched tasks per second """
+        deploy_time = self.deploy_time()
+        if not deploy_time:
+            return None
+        return round(self.target_tasks() / deploy_time, 3)
+
+
+class OfferSampler(object):
+    """ Samples (timestamp, active tasks, offered cpus) of each framework from
+    the mesos state summary.  A sample is starved if the framework has not
+    reached its target, did not gain tasks since the previous sample and
+    holds no offers.
+    """
+
+    def __init__(self, loads, interval=SAMPLE_INTERVAL):
+        self.loads = loads
+        self.interval = interval
+        self.samples = dict((load.name, []) for load in loads)
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(self.interval * 4)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.sample()
+            except Exception:
+                # mesos is busy, skip this sample
+                pass
+            self._stopped.wait(self.interval)
+
+    def sample(self):
+        summary = mesos_state_summary()
+        timestamp = time.time()
+        for load in self.loads:
+            running, staged = framework_task_counts(summary, load.name)
+            offered = 0
+            for framework in summary.get('frameworks', []):
+                if framework.get('name') == load.name:
+                    offered += framework.get('offered_resources', {}).get('cpus', 0)
+            self.samples[load.name].append((timestamp, running + staged, offered))
+
+    def starvation(self, load):
+        """ Seconds and fraction of the launch in which `load` was starved """
+        samples = [sample for sample in self.samples[load.name]
+                   if load.start <= sample[0] <= (load.end or time.time())]
+        if len(samples) < 2:
+            return 0, 0
+        target = samples[0][1] + load.target_tasks()
+        starved = 0
+        for previous, current in zip(samples, samples[1:]):
+            if current[1] < target and current[1] <= previous[1] and current[2] == 0:
+                starved += current[0] - previous[0]
+        elapsed = samples[-1][0] - samples[0][0]
+        return round(starved, 3), round(starved / elapsed, 3) if elapsed > 0 else 0
+
+
+def test_marathon_contention():
+    loads = [FrameworkLoad(name, count, instances) for name in ['marathon'] + moms]
+    need = resource_need(instances, count * len(loads))
+    if need > (available_resources() * 0.8):
+        pytest.skip('insufficient resources for {} frameworks'.format(len(loads)))
+
+    alone = {}
+    for load in loads:
+        sampler = OfferSampler([load]).start()
+        load.run()
+        sampler.stop()
+        alone[load.name] = (load.deploy_time(), load.launch_rate(), sampler.starvation(load))
+        load.teardown()
+
+    sampler = OfferSampler(loads).start()
+    threads = [threading.Thread(target=load.run) for load in loads]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    sampler.stop()
+
+    for load in loads:
+        alone_time, alone_rate, alone_starvation = alone[load.name]
+        deploy_time = load.deploy_time()
+        slowdown = None
+        if alone_time and deploy_time:
+            slowdown = round(deploy_time / alone_time, 3)
+        starved_seconds, starved_fraction = sampler.starvation(load)
+        results.append({
+            'framework': load.name,
+            'tasks': load.target_tasks(),
+            'alone_deploy_time': alone_time,
+            'alone_launch_rate': alone_rate,
+            'alone_starved': alone_starvation[1],
+            'deploy_time': deploy_time,
+            'launch_rate': load.launch_rate(),
+            'starved_seconds': starved_seconds,
+            'starved': starved_fraction,
+            'slowdown': slowdown,
+            'error': str(load.error) if load.error is not None else None
+        })
+
+    for load in loads:
+        load.teardown()
+
+
+def setup_module(module):
+    cluster_info()
+    print('frameworks in test: {}'.format(['marathon'] + moms))
+    print(available_resources())
+
+
+def teardown_module(module):
+    for result in results:
+        print('{framework}: tasks: {tasks}, alone: {alone_deploy_time}s ({alone_launch_rate} tasks/s), '
+              'together: {deploy_time}s ({launch_rate} tasks/s), slowdown: {slowdown}, '
+              'starved: {starved} ({starved_seconds}s), error: {error}'.format(**result))
+    write_results()
+    write_api_latencies()
+    print_client_stats()
+
+
+def write_results(filename='contention.csv'):
+    fields = ['framework', 'tasks', 'alone_deploy_time', 'alone_launch_rate', 'alone_starved',
+              'deploy_time', 'launch_rate', 'starved_seconds', 'starved', 'slowdown', 'error']
+    with open(filename, 'w') as f:
+        w = csv.DictWriter(f, fieldnames=fields, quoting=csv.QUOTE_NONNUMERIC)
+        w.writeheader()
+        for result in results:
+            w.writerow(result)
@@ -0,0 +1,141 @@
+from utils import *
+from common import *
+from stats import bootstrap_ci, mann_whitney, median
+
+import csv
+import os
+"""
+    Compares the launch performance of two marathon versions running as MoM.
+    Each (version, style, size) cell is run `AB_REPEATS` times.  The versions are
+    interleaved in ABBA order so drift of the cluster affects both versions alike
+    while keeping the number of MoM re-installs low.
+
+    The versions are read from the environment variables MOM1 and MOM2.
+"""
+default_moms = {
+    'mom1': '1.3.6',
+    'mom2': '1.4.0-RC4'
+}
+# (style, apps, instances)
+cells = [
+    ('instances', 1, 100),
+    ('instances', 1, 1000),
+    ('count', 100, 1),
+    ('count', 1000, 1),
+    ('group', 100, 1),
+    ('batch', 1000, 1)
+]
+# significance level of the verdict
+alpha = 0.05
+
+marathons = {}
+test_log = []
+
+
+def test_ab_comparison():
+    repeats = int(os.environ.get('AB_REPEATS', 5))
+    for repeat in range(repeats):
+        order = ['mom1', 'mom2'] if repeat % 2 == 0 else ['mom2', 'mom1']
+        for mom in order:
+            for style, count, instances in cells:
+                run_cell(mom, style, count, instances, repeat)
+
+    report = compare(test_log)
+    print_report(report)
+    write_report(report)
+
+
+def run_cell(mom, style, count, instances, repeat):
+    name = 'test_{}_apps_{}_{}_{}'.format(mom, style, count, instances)
+    current_test = start_test(name, marathons)
+    current_test.add_event('repeat {}'.format(repeat))
+    test_log.append(current_test)
+    if scaletest_resources(current_test) > (available_resources() * 0.8):
+        current_test.skip('insufficient resources')
+        return
+
+    if not ensure_test_mom(current_test):
+        return
+    with marathon_on_marathon():
+        scale_test_apps(current_test)
+
+
+def compare(scale_tests):
+    """ Compares the successful deploy times of mom1 and mom2 per cell.
+
+    :return: list of dicts with the medians, confidence intervals, p-value and verdict per cell
+    """
+    report = []
+    for style, count, instances in cells:
+        times = {}
+        for mom in ('mom1', 'mom2'):
+            times[mom] = [t.deploy_time for t in scale_tests
+                          if t.mom == mom and t.style == style and t.count == count and
+                          t.instance == instances and t.status == 'successful']
+        u, p = mann_whitney(times['mom1'], times['mom2'])
+        median1 = median(times['mom1'])
+        median2 = median(times['mom2'])
+        if p is None:
+            verdict = 'insufficient data'
+        elif p >= alpha:
+            verdict = 'no significant difference'
+        elif median2 > median1:
+            verdict = '{} slower'.format(marathons['mom2'])
+        else:
+            verdict = '{} faster'.format(marathons['mom2'])
+        report.append({
+            'style': style,
+            'count': count,
+            'instances': instances,
+            'mom1_runs': len(times['mom1']),
+            'mom1_median': median1,
+            'mom1_ci': bootstrap_ci(times['mom1']),
+            'mom2_runs': len(times['mom2']),
+            'mom2_median': median2,
+            'mom2_ci': bootstrap_ci(times['mom2']),
+            'p': p,
+            'verdict': verdict
+        })
+    return report
+
+
+def print_report(report):
+    print('mom1: {} mom2: {}'.format(marathons['mom1'], marathons['mom2']))
+    for cell in report:
+        print('{style} {count}x{instances}: mom1 median {mom1_median} ci {mom1_ci} ({mom1_runs} runs), '
+              'mom2 median {mom2_median} ci {mom2_ci} ({mom2_runs} runs), p {p}: {verdict}'.format(**cell))
+
+
+def write_report(report, filename='ab-comparison.csv'):
+    with open(filename, 'w') as f:
+        w = csv.writer(f, quoting=csv.QUOTE_NONNUMERIC)
+        w.writerow(['style', 'count', 'instances',
+                    marathons['mom1'], 'ci low', 'ci high',
+                    marathons['mom2'], 'ci low', 'ci high',
+                    'p', 'verdict'])
+        for cell in report:
+            w.writerow([cell['style'], cell['count'], cell['instances'],
+                        cell['mom1_median'], cell['mom1_ci'][0], cell['mom1_ci'][1],
+                        cell['mom2_median'], cell['mom2_ci'][0], cell['mom2_ci'][1],
+                        cell['p'], cell['verdict']])
+
+
+def set_mom(name):
+    try:
+        marathons[name] = os.environ[name.upper()]
+    except:
+        marathons[name] = default_moms[name]
+        pass
+
+
+def setup_module(module):
+    set_mom('mom1')
+    set_mom('mom2')
+    cluster_info()
+    print('marathons in test: {}'.format(marathons))
+    print(available_resources())
+
+
+def teardown_module(module):
+    log_results(test_log)
+    store_results(test_log, write_meta_data({'marathons': marathons, 'comparison': 'ab'}))
@@ -0,0 +1,129 @@
+from utils import *
+from common import *
+
+import csv
+import os
+import pytest
+import time
+"""
+    Measures what event stream subscribers cost a MoM.  For each setting of
+    the MoM event bus flags, a `count` scale test runs first without and then
+    with EVENT_SUBSCRIBERS subscribers on `/v2/events`, EVENT_SLOW_SUBSCRIBERS
+    of which sleep EVENT_SLOW_DELAY seconds per event.  The event throughput,
+    the subscribers marathon dropped and the deploy times are reported.
+
+    The settings are EVENT_BUS_SETTINGS, comma separated pairs of
+    `--event_stream_max_outstanding_messages`:`--http_event_callback_slow_consumer_timeout`.
+"""
+settings = [tuple(int(value) for value in setting.split(':'))
+            for setting in os.environ.get('EVENT_BUS_SETTINGS', '50:10000,500:10000,50:1000').split(',')]
+subscribers = int(os.environ.get('EVENT_SUBSCRIBERS', 20))
+slow_subscribers = int(os.environ.get('EVENT_SLOW_SUBSCRIBERS', 5))
+slow_delay = float(os.environ.get('EVENT_SLOW_DELAY', 0.5))
+apps = int(os.environ.get('EVENT_BUS_APPS', 1000))
+mom_version = os.environ.get('MOM1', '1.4.0-RC4')
+
+results = []
+test_log = []
+
+
+class Subscriber(object):
+    """ An event stream subscriber counting the events it receives.  A slow
+    subscriber sleeps `delay` seconds per event which stalls its stream.
+    """
+
+    def __init__(self, url, delay=0):
+        self.delay = delay
+        self.events = 0
+        self.dropped_at = None
+        self.stream = EventStream(url)
+        self.stream.add_listener(self._on_event)
+
+    def _on_event(self, event_type, event, received):
+        if event_type == 'stream_dropped':
+            self.dropped_at = received
+            return
+        self.events += 1
+        if self.delay > 0:
+            time.sleep(self.delay)
+
+    def start(self):
+        self.stream.start()
+        return self
+
+    def stop(self):
+        self.stream.stop()
+
+
+@pytest.mark.parametrize("max_outstanding,slow_timeout", settings)
+def test_event_bus(max_outstanding, slow_timeout):
+    flags = {
+        'event_stream_max_outstanding_messages': max_outstanding,
+        'http_event_callback_slow_consumer_timeout': slow_timeout
+    }
+    uninstall_mom()
+    install_mom(mom_version, flags)
+    wait_for_service_endpoint('marathon-user', 1200)
+
+    baseline = run_deployment('baseline')
+
+    url = service_url('marathon-user')
+    subscribed = time.time()
+    started = [Subscriber(url, slow_delay if num < slow_subscribers else 0).start()
+               for num in range(subscribers)]
+    loaded = run_deployment('subscribed')
+    duration = elapse_time(subscribed)
+    for subscriber in started:
+        subscriber.stop()
+
+    fast = [s for s in started if s.delay == 0]
+    slow = [s for s in started if s.delay > 0]
+    result = {
+        'max_outstanding': max_outstanding,
+        'slow_consumer_timeout': slow_timeout,
+        'subscribers': subscribers,
+        'slow_subscribers': slow_subscribers,
+        'baseline_deploy_time': baseline.deploy_time,
+        'deploy_time': loaded.deploy_time,
+        'events_per_second': round(sum(s.events for s in fast) / max(len(fast), 1) / max(duration, 0.001), 3),
+        'fast_dropped': len([s for s in fast if s.dropped_at is not None]),
+        'slow_dropped': len([s for s in slow if s.dropped_at is not None]),
+        'slow_events': sum(s.events for s in slow)
+    }
+    results.append(result)
+    print(result)
+
+
+def run_deployment(phase):
+    current_test = start_test('test_mom1_apps_count_{}_1'.format(apps), {'mom1': mom_version})
+    current_test.add_event(phase)
+    test_log.append(current_test)
+    with marathon_on_marathon():
+        scale_test_apps(current_test)
+    return current_test
+
+
+def setup_module(module):
+    cluster_info()
+    print('event bus settings: {}'.format(settings))
+
+
+def teardown_module(module):
+    log_results(test_log)
+    write_results()
+    write_api_latencies()
+    print_client_stats()
+    # back to the flags of mom.json
+    uninstall_mom()
+    install_mom(mom_version)
+
+
+def write_results(filename='event-bus.csv'):
+    fields = ['max_outstanding', 'slow_consumer_timeout', 'subscribers', 'slow_subscribers',
+              'baseline_deploy_time', 'deploy_time', 'events_per_second',
+              'fast_dropped', 'slow_dropped', 'slow_events']
+    with open(filename, 'w') as f:
+        w = csv.DictWriter(f, fieldnames=fields, quoting=csv.QUOTE_NONNUMERIC)
+        w.writeheader()
+        for result in results:
+            w.writerow(result)
@@ -0,0 +1,113 @@
+from utils import *
+from common import *
+from dcos import http
+from sampler import framework_task_counts
+
+import csv
+import os
+import pytest
+import time
+"""
+    Measures the recovery of a MoM after its leader is killed depending on the
+    number of apps it has to load from zookeeper.  For each size of
+    FAILOVER_SIZES (apps with one instance) the MoM process is killed and the
+    time until these milestones is recorded:
+
+        ping:        `/ping` answers
+        serving:     `/v2/apps` serves all apps
+        reconciled:  marathon and mesos agree on the running tasks again, all
+                     apps report their tasks running and mesos counts the
+                     same number of running tasks for the framework
+"""
+sizes = [int(size) for size in os.environ.get('FAILOVER_SIZES', '100,1000,5000,10000').split(',')]
+# seconds to wait for each milestone
+milestone_timeout = float(os.environ.get('FAILOVER_TIMEOUT', 1800))
+# seconds between checks of a milestone
+poll_interval = 0.5
+
+results = []
+
+
+@pytest.mark.parametrize("num_apps", sizes)
+def test_mom_failover(num_apps):
+    url = service_url('marathon-user')
+    if resource_need(1, num_apps) > (available_resources() * 0.8):
+        results.append({'apps': num_apps, 'error': 'insufficient resources'})
+        return
+
+    with marathon_on_marathon():
+        delete_all_apps_wait()
+        launch_state(num_apps)
+
+    result = {'apps': num_apps}
+    mom_ip = next(iter(get_service_ips('marathon', 'marathon-user')))
+    killed = time.time()
+    kill_process_on_host(mom_ip, 'marathon-assembly')
+
+    result['ping'] = wait_for_milestone(killed, lambda: ping(url))
+    result['serving'] = wait_for_milestone(killed, lambda: serves_apps(url, num_apps))
+    result['reconciled'] = wait_for_milestone(killed, lambda: reconciled(url, num_apps))
+    results.append(result)
+    print(result)
+
+    with marathon_on_marathon():
+        delete_all_apps_wait()
+
+
+def launch_state(num_apps):
+    """ Launches `num_apps` apps in groups of BATCH_SIZE and waits for them """
+    launcher = AppLauncher(concurrency=BATCH_CONCURRENCY,
+                           max_deployments=LAUNCH_MAX_DEPLOYMENTS,
+                           max_latency=LAUNCH_MAX_LATENCY)
+    launcher.launch(batch_groups(num_apps, 1, BATCH_SIZE), post=post_group)
+    time_deployment('state')
+
+
+def wait_for_milestone(start, reached):
+    """ Seconds from `start` until `reached` returns True, None on timeout """
+    while time.time() - start < milestone_timeout:
+        try:
+            if reached():
+                return elapse_time(start)
+        except Exception:
+            # marathon is not back yet
+            pass
+        time.sleep(poll_interval)
+    return None
+
+
+def ping(url):
+    return http.get('{}ping'.format(url), timeout=5).status_code == 200
+
+
+def serves_apps(url, num_apps):
+    return len(marathon_client(url).get_apps()) >= num_apps
+
+
+def reconciled(url, num_apps):
+    running = sum(app.get('tasksRunning', 0) for app in marathon_client(url).get_apps())
+    mesos_running, staged = framework_task_counts(mesos_state_summary(), 'marathon-user')
+    return running >= num_apps and mesos_running == running and staged == 0
+
+
+def setup_module(module):
+    cluster_info()
+    print('failover sizes: {}'.format(sizes))
+    print(available_resources())
+
+
+def teardown_module(module):
+    for result in results:
+        print(result)
+    write_results()
+    write_api_latencies()
+    print_client_stats()
+
+
+def write_results(filename='failover.csv'):
+    with open(filename, 'w') as f:
+        w = csv.writer(f, quoting=csv.QUOTE_NONNUMERIC)
+        w.writerow(['apps', 'ping', 'serving', 'reconciled', 'error'])
+        for result in results:
+            w.writerow([result['apps'], result.get('ping'), result.get('serving'),
+                        result.get('reconciled'), result.get('error')])
@@ -1,7 +1,6 @@
 from utils import *
 from common import *
 
-import csv
 import time
 import sys
 import os
@@ -108,6 +107,23 @@ def test_mom1_apps_group_1000_1():
     run_test(sys._getframe().f_code.co_name)
 
 
+# batch
+def test_mom1_apps_batch_1000_1_100():
+    run_test(sys._getframe().f_code.co_name)
+
+
+def test_mom1_apps_batch_5000_1_100():
+    run_test(sys._getframe().f_code.co_name)
+
+
+def test_mom1_apps_batch_10000_1_500():
+    run_test(sys._getframe().f_code.co_name)
+
+
+def test_mom1_apps_batch_25000_1_500():
+    run_test(sys._getframe().f_code.co_name)
+
+
 # MOM2
 def test_mom2_apps_instances_1_1():
     run_test(sys._getframe().f_code.co_name)
@@ -189,6 +205,23 @@ def test_mom2_apps_group_100_1():
 
 def test_mom2_apps_group_1000_1():
     run_test(sys._getframe().f_code.co_name)
+
+
+# batch
+def test_mom2_apps_batch_1000_1_100():
+    run_test(sys._getframe().f_code.co_name)
+
+
+def test_mom2_apps_batch_5000_1_100():
+    run_test(sys._getframe().f_code.co_name)
+
+
+def test_mom2_apps_batch_10000_1_500():
+    run_test(sys._getframe().f_code.co_name)
+
+
+def test_mom2_apps_batch_25000_1_500():
+    run_test(sys._getframe().f_code.co_name)
 ##############
 # End Test Section
 ##############
@@ -217,13 +250,16 @@ def run_test(name):
 
 
 def get_mom_style_key(current_test):
+    """ `mom1_instances`, batch tests include the batch size: `mom1_batch_100` """
+    if current_test.style == 'batch':
+        return '{}_{}_{}'.format(current_test.mom, current_test.style, current_test.batch_size)
     return '{}_{}'.format(current_test.mom, current_test.style)
 
 
 def previous_style_test_failed(test_obj):
     failed = False
     try:
-        failed = type_test_failed.get(get_mom_style_key(current_test))
+        failed = type_test_failed.get(get_mom_style_key(test_obj))
     except:
         failed = False
         pass
@@ -248,10 +284,12 @@ def setup_module(module):
 
 
 def teardown_module(module):
-    stats = collect_stats()
-    write_csv(stats)
+    log_results(test_log)
+    store_results(test_log, write_meta_data(get_metadata()))
     read_csv()
-    write_meta_data(get_metadata())
+    write_series(test_log)
+    write_api_latencies()
+    print_client_stats()
 
 
 def get_metadata():
@@ -261,64 +299,10 @@ def get_metadata():
     return metadata
 
 
-def collect_stats():
-    stats = {
-        'mom1_instances': [],
-        'mom1_instances_target': [],
-        'mom1_instances_max': [],
-        'mom1_count': [],
-        'mom1_count_target': [],
-        'mom1_count_max': [],
-        'mom1_group': [],
-        'mom1_group_target': [],
-        'mom2_group': [],
-        'mom2_group_target': [],
-        'mom2_instances': [],
-        'mom2_instances_target': [],
-        'mom2_instances_max': [],
-        'mom2_count': [],
-        'mom2_count_target': [],
-        'mom2_count_max': []
-    }
-
-    for scale_test in test_log:
-        print(scale_test)
-        scale_test.log_events()
-        scale_test.log_stats()
-        print('')
-        stats.get(get_mom_style_key(scale_test)).append(scale_test.deploy_time)
-        target_key = '{}_target'.format(get_mom_style_key(scale_test))
-        if 'instances' in target_key:
-            stats.get(target_key).append(scale_test.instance)
-        else:
-            stats.get(target_key).append(scale_test.count)
-
-    return stats
-
-
 def read_csv(filename='scale-test.csv'):
     with open(filename, 'r') as fin:
         print(fin.read())
 
 
-def write_csv(stats, filename='scale-test.csv'):
-    with open(filename, 'w') as f:
-        w = csv.writer(f, quoting=csv.QUOTE_NONNUMERIC)
-        write_stat_lines(f, w, stats, 'mom1', 'instances')
-        write_stat_lines(f, w, stats, 'mom2', 'instances')
-        write_stat_lines(f, w, stats, 'mom1', 'count')
-        write_stat_lines(f, w, stats, 'mom2', 'count')
-        write_stat_lines(f, w, stats, 'mom1', 'group')
-        write_stat_lines(f, w, stats, 'mom2', 'group')
-
-
-def write_stat_lines(f, w, stats, marathon, test_type):
-        f.write('Marathon: {}, {}'.format(marathons.get(marathon), test_type))
-        f.write('\n')
-        w.writerow(stats['{}_{}_target'.format(marathon, test_type)])
-        w.writerow(stats['{}_{}'.format(marathon, test_type)])
-        f.write('\n')
-
-
 def get_current_test():
     return test_log[-1]
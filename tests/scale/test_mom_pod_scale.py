@@ -1,169 +1,173 @@
-from shakedown import *
-from dcos import config
-from six.moves import urllib
-from utils import get_resource
-
-import requests
-import json
-import time
+from utils import *
 from common import *
 
-instances_results = []
-instances_teardown = []
-count_results = []
-count_teardown = []
+import time
+import sys
+import os
+"""
+    Pod scale tests against a MoM.  They run through `ScaleTest` like the app
+    scale tests so app and pod launch throughput can be compared at equal task
+    counts.  Each pod instance has POD_CONTAINERS tasks.
 
+    assumptions:
+        1) written in progressively higher scale
+        2) the tests are run in the order they are written
 
-"""
     to launch: shakedown --dcos-url=$(dcos config show core.dcos_url)
         --ssh-key-file=~/.ssh/default.pem --stdout all
-        --stdout-inline test_pod_scale.py
+        --stdout-inline test_mom_pod_scale.py
 """
+default_moms = {
+    'mom1': '1.4.0-RC4'
+}
+# to be discovered
+marathons = {}
+type_test_failed = {}
 
+test_log = []
+##############
+# Test Section
+##############
+# MOM1
 
-def pod(id=1, instance=1, type="4"):
-    data = get_resource("pod-{}-containers.json".format(type))
-    data['id'] = "/" + str(id)
-    data['scaling']['instances'] = instance
-    return data
 
+def test_mom1_pods_instances_1_1():
+    run_test(sys._getframe().f_code.co_name)
 
-def pod_time_deployment():
-    global time_series
-    client = marathon.create_client()
-    start = time.time()
-    deployment_count = 1
-    while deployment_count > 0:
-        time.sleep(1)
-        deployments = client.get_deployments()
-        deployment_count = len(deployments)
 
-    elapse = elapse_time(start)
+def test_mom1_pods_instances_1_10():
+    run_test(sys._getframe().f_code.co_name)
 
-    return elapse
 
+def test_mom1_pods_instances_1_100():
+    run_test(sys._getframe().f_code.co_name)
 
-def launch_pods(count=1, instances=1):
-    client = marathon.create_client()
-    for num in range(1, count + 1):
-        client.add_pod(pod(num, instances))
 
+def test_mom1_pods_instances_1_500():
+    run_test(sys._getframe().f_code.co_name)
 
-def test_pod_instances_1():
-    with marathon_on_marathon():
-        _test_pod_scale(1, 1, instances_results, instances_teardown)
 
+def test_mom1_pods_instances_1_1000():
+    run_test(sys._getframe().f_code.co_name)
 
-def test_pod_instances_10():
-    with marathon_on_marathon():
-        _test_pod_scale(1, 10, instances_results, instances_teardown)
 
+def test_mom1_pods_instances_1_5000():
+    run_test(sys._getframe().f_code.co_name)
 
-def test_pod_instances_100():
-    with marathon_on_marathon():
-        _test_pod_scale(1, 100, instances_results, instances_teardown)
 
+#  counts
+def test_mom1_pods_count_1_1():
+    run_test(sys._getframe().f_code.co_name)
 
-def test_pod_instances_500():
-    with marathon_on_marathon():
-        _test_pod_scale(1, 500, instances_results, instances_teardown)
 
+def test_mom1_pods_count_10_1():
+    run_test(sys._getframe().f_code.co_name)
 
-def test_pod_instances_1000():
-    with marathon_on_marathon():
-        _test_pod_scale(1, 1000, instances_results, instances_teardown)
 
+def test_mom1_pods_count_100_1():
+    run_test(sys._getframe().f_code.co_name)
 
-def test_pod_instances_5000():
-    with marathon_on_marathon():
-        _test_pod_scale(1, 5000, instances_results, instances_teardown)
 
+def test_mom1_pods_count_500_1():
+    run_test(sys._getframe().f_code.co_name)
 
-def test_pod_count_1():
-    with marathon_on_marathon():
-        _test_pod_scale(1, 1, count_results, count_teardown)
 
+def test_mom1_pods_count_1000_1():
+    run_test(sys._getframe().f_code.co_name)
 
-def test_pod_count_10():
-    with marathon_on_marathon():
-        _test_pod_scale(10, 1, count_results, count_teardown)
 
+def test_mom1_pods_count_5000_1():
+    run_test(sys._getframe().f_code.co_name)
 
-def test_pod_count_100():
-    with marathon_on_marathon():
-        _test_pod_scale(100, 1, count_results, count_teardown)
 
+# groups
+def test_mom1_pods_group_1_1():
+    run_test(sys._getframe().f_code.co_name)
 
-def test_pod_count_500():
-    with marathon_on_marathon():
-        _test_pod_scale(500, 1, count_results, count_teardown)
 
+def test_mom1_pods_group_10_1():
+    run_test(sys._getframe().f_code.co_name)
 
-def test_pod_count_1000():
-    with marathon_on_marathon():
-        _test_pod_scale(1000, 1, count_results, count_teardown)
+
+def test_mom1_pods_group_100_1():
+    run_test(sys._getframe().f_code.co_name)
+
+
+def test_mom1_pods_group_1000_1():
+    run_test(sys._getframe().f_code.co_name)
+##############
+# End Test Section
+##############
 
 
-def test_pod_count_5000():
+def run_test(name):
+    current_test = start_test(name, marathons)
+    test_log.append(current_test)
+    need = scaletest_resources(current_test)
+    # TODO: why marathon stops at 80%
+    if need > (available_resources() * 0.8):
+        current_test.skip('insufficient resources')
+        return
+    if previous_style_test_failed(current_test):
+        current_test.skip('smaller scale failed')
+        return
+
+    assert ensure_test_mom(current_test)
     with marathon_on_marathon():
-        _test_pod_scale(5000, 1, count_results, count_teardown)
+        scale_test_pods(current_test)
 
+    if "failed" in current_test.status:
+        type_test_failed[get_mom_style_key(current_test)] = True
 
-def _test_pod_scale(pod_count, instances, test_results, teardown_results):
-    test = "scaling pods: " + str(pod_count) + " instances: " + str(instances)
-    client = marathon.create_client()
-    delete_all_pods()
-    pod_time_deployment()
-    test_time, teardown_time = scale_pods(pod_count, instances)
-    print("{} test time: {}".format(test, test_time))
-    print("{} teardown time: {}".format(test, teardown_time))
 
-    test_results.append(test_time)
-    teardown_results.append(teardown_time)
+def get_mom_style_key(current_test):
+    return '{}_{}'.format(current_test.mom, current_test.style)
 
 
-def scale_pods(pod_count=1, instances=1):
-    start = time.time()
-    launch_pods(pod_count, instances)
-    deploy_time = pod_time_deployment()
-    test_end = time.time()
-    delete_all_pods()
-    pod_time_deployment()
-    delete_time = elapse_time(test_end)
-    return elapse_time(start, test_end), delete_time
+def previous_style_test_failed(test_obj):
+    return type_test_failed.get(get_mom_style_key(test_obj), False)
 
 
-def delete_all_pods():
-    client = marathon.create_client()
-    pods = client.list_pod()
-    print("deleting {} pods".format(len(pods)))
-    client.remove_group("/", True)
-    pod_time_deployment()
+def set_mom(name):
+    try:
+        marathons[name] = os.environ[name.upper()]
+    except:
+        marathons[name] = default_moms[name]
+        pass
 
 
 def setup_module(module):
-    # verify test system requirements are met (number of nodes needed)
-    agents = get_private_agents()
-    print("agents: {}".format(len(agents)))
-    with marathon_on_marathon():
-        client = marathon.create_client()
-        about = client.get_about()
-        print("marathon version: {}".format(about.get("version")))
+    set_mom('mom1')
+    cluster_info()
+    print('marathons in test: {}'.format(marathons))
+    print(available_resources())
+    assert ensure_mom_version(marathons['mom1'])
     prefetch_docker_images_on_all_nodes()
 
 
 def teardown_module(module):
-    agents = get_private_agents()
-    print("agents: {}".format(len(agents)))
     with marathon_on_marathon():
-        client = marathon.create_client()
-        about = client.get_about()
-        print("marathon version: {}".format(about.get("version")))
-        delete_all_pods()
-    print("instance test: {}".format(instances_results))
-    print("instance teardown: {}".format(instances_teardown))
-    print("count test: {}".format(count_results))
-    print("count teardown: {}".format(count_teardown))
+        delete_all_apps_wait()
+    log_results(test_log)
+    store_results(test_log, write_meta_data(get_metadata()))
+    read_csv()
+    write_series(test_log)
+    write_api_latencies()
+    print_client_stats()
+    print_fixture_stats()
+
+
+def get_metadata():
+    metadata = {
+        'marathons': marathons,
+        'pod-containers': POD_CONTAINERS
+    }
+    return metadata
+
+
+def read_csv(filename='scale-test.csv'):
+    with open(filename, 'r') as fin:
+        print(fin.read())
 
 
 def prefetch_docker_images_on_all_nodes():
@@ -172,7 +176,7 @@ def prefetch_docker_images_on_all_nodes():
         data = get_resource("pod-2-containers.json")
         data['constraints'] = unique_host_constraint()
         data['scaling']['instances'] = len(agents)
-        client = marathon.create_client()
+        client = marathon_client()
         client.add_pod(data)
         time_deployment("undeploy")
-        delete_all_pods()
+        delete_all_apps_wait()
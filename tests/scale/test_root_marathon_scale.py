@@ -3,7 +3,6 @@ from common import *
 
 import pytest
 
-import csv
 import time
 import sys
 import os
@@ -66,13 +65,32 @@ def test_group_scale(num_apps, num_instances):
     run_test('root', 'apps', 'group', num_apps, num_instances)
 
 
+@pytest.mark.parametrize("num_apps, num_instances, batch_size", [
+  (1000, 1, 10),
+  (1000, 1, 100),
+  (5000, 1, 100),
+  (5000, 1, 500),
+  (10000, 1, 100),
+  (10000, 1, 500),
+  (25000, 1, 500),
+  (25000, 1, 1000)
+])
+def test_batch_scale(num_apps, num_instances, batch_size):
+    """ Runs scale test on `num_apps` usually 1 instance each deployed as groups
+    of `batch_size` apps.
+    """
+    run_test('root', 'apps', 'batch', num_apps, num_instances, batch_size)
+
+
 ##############
 # End Test Section
 ##############
 
 
-def run_test(marathon, launch_type, test_type, num_apps, num_instances):
+def run_test(marathon, launch_type, test_type, num_apps, num_instances, batch_size=None):
     test_name = 'test_{}_{}_{}_{}_{}'.format(marathon, launch_type, test_type, num_apps, num_instances)
+    if batch_size is not None:
+        test_name = '{}_{}'.format(test_name, batch_size)
     current_test = start_test(test_name)
     test_log.append(current_test)
     need = scaletest_resources(current_test)
@@ -94,8 +112,12 @@ def run_test(marathon, launch_type, test_type, num_apps, num_instances):
 
 def get_style_key(current_test):
     """ The style key is historical and is the key to recording test results.
-    For root marathon the key is `root_instances` or `root_group`.
+    For root marathon the key is `root_instances` or `root_group`.  Batch
+    tests of another batch size are no smaller scale, the batch style key
+    includes the batch size: `root_batch_100`.
     """
+    if current_test.style == 'batch':
+        return '{}_{}_{}'.format(current_test.mom, current_test.style, current_test.batch_size)
     return '{}_{}'.format(current_test.mom, current_test.style)
 
 
@@ -110,10 +132,12 @@ def setup_module(module):
 
 
 def teardown_module(module):
-    stats = collect_stats()
-    write_csv(stats)
+    log_results(test_log)
+    store_results(test_log, write_meta_data(get_metadata()))
     read_csv()
-    write_meta_data(get_metadata())
+    write_series(test_log)
+    write_api_latencies()
+    print_client_stats()
     delete_all_apps_wait()
 
 
@@ -124,53 +148,10 @@ def get_metadata():
     return metadata
 
 
-def collect_stats():
-    stats = {
-        'root_instances': [],
-        'root_instances_target': [],
-        'root_instances_max': [],
-        'root_count': [],
-        'root_count_target': [],
-        'root_count_max': [],
-        'root_group': [],
-        'root_group_target': []
-    }
-
-    for scale_test in test_log:
-        print(scale_test)
-        scale_test.log_events()
-        scale_test.log_stats()
-        print('')
-        stats.get(get_style_key(scale_test)).append(scale_test.deploy_time)
-        target_key = '{}_target'.format(get_style_key(scale_test))
-        if 'instances' in target_key:
-            stats.get(target_key).append(scale_test.instance)
-        else:
-            stats.get(target_key).append(scale_test.count)
-
-    return stats
-
-
 def read_csv(filename='scale-test.csv'):
     with open(filename, 'r') as fin:
         print(fin.read())
 
 
-def write_csv(stats, filename='scale-test.csv'):
-    with open(filename, 'w') as f:
-        w = csv.writer(f, quoting=csv.QUOTE_NONNUMERIC)
-        write_stat_lines(f, w, stats, 'root', 'instances')
-        write_stat_lines(f, w, stats, 'root', 'count')
-        write_stat_lines(f, w, stats, 'root', 'group')
-
-
-def write_stat_lines(f, w, stats, marathon, test_type):
-        f.write('Marathon: {}, {}'.format('root', test_type))
-        f.write('\n')
-        w.writerow(stats['{}_{}_target'.format(marathon, test_type)])
-        w.writerow(stats['{}_{}'.format(marathon, test_type)])
-        f.write('\n')
-
-
 def get_current_test():
     return test_log[-1]
@@ -0,0 +1,45 @@
+from common import *
+
+import pytest
+
+"""
+    Compares the cost of the task count backends of `get_current_tasks` at
+    different numbers of running tasks.
+"""
+
+
+@pytest.mark.parametrize("num_instances", [
+  0,
+  100,
+  1000,
+  5000,
+  10000
+])
+def test_task_count_cost(num_instances):
+    if num_instances > 0:
+        client = marathon_client()
+        client.add_app(app('count-cost', num_instances))
+        time_deployment('count cost')
+
+    results = benchmark_task_counters()
+    for backend, result in sorted(results.items()):
+        print('tasks: {} backend: {} ({}) count: {} mean: {} p90: {} max: {}'.format(
+            num_instances,
+            backend,
+            result['scope'],
+            result['count'],
+            result['mean'],
+            result['p90'],
+            result['max']))
+
+    delete_all_apps_wait()
+
+
+def setup_module(module):
+    delete_all_apps_wait()
+    cluster_info()
+    print(available_resources())
+
+
+def teardown_module(module):
+    delete_all_apps_wait()
@@ -3,9 +3,16 @@ import json
 import os
 import re
 import subprocess
+import time
+from histogram import LatencyRecorder, endpoint_of
 from six.moves import urllib
 from dcos import http, util, config
+from dcos.errors import DCOSException, DCOSHTTPException
+from dcos.mesos import DCOSClient
 from shakedown import run_command_on_master
+from clients import *
+from resources import *
+
 
 def file_dir():
     """Gets the path to the shakedown dcos scale directory"""
@@ -24,52 +31,73 @@ def ee_version():
     return version
 
 
-# should be in shakedown
+def fixture_path(resource):
+    """ Fixtures are named relative to the scale directory """
+    return "{}/{}".format(file_dir(), resource)
+
+
 def get_resource(resource):
     """
     :param resource: optional filename or http(s) url
     for the application or group resource
     :type resource: str
-    :returns: resource
+    :returns: a copy of the resource, parsed once
     :rtype: dict
     """
-    resource = "{}/{}".format(file_dir(), resource)
     if resource is not None:
-        if os.path.isfile(resource):
-            with util.open_file(resource) as resource_file:
-                return util.load_json(resource_file)
-        else:
-            try:
-                http.silence_requests_warnings()
-                req = http.get(resource)
-                if req.status_code == 200:
-                    data = b''
-                    for chunk in req.iter_content(1024):
-                        data += chunk
-                    return util.load_jsons(data.decode('utf-8'))
-                else:
-                    raise Exception
-            except Exception:
-                raise DCOSException(
-                    "Can't read from resource: {0}.\n"
-                    "Please check that it exists.".format(resource))
-
-
-@contextlib.contextmanager
-def marathon_on_marathon(name='marathon-user'):
-    """ Context manager for altering the marathon client for MoM
-    :param name: service name of MoM to use
-    :type name: str
-    """
+        return fixture_registry.copy(fixture_path(resource))
+
+
+def load_fixture(resource, id=None, instances=None, image=None, constraints=None):
+    """ Copy of the app or pod fixture `resource` with overrides, see `FixtureRegistry.copy` """
+    return fixture_registry.copy(fixture_path(resource), id, instances, image, constraints)
+
+
+# latencies of all marathon and mesos calls of the harness
+api_latencies = LatencyRecorder()
+
 
-    toml_config_o = config.get_config()
-    dcos_url = config.get_config_val('core.dcos_url', toml_config_o)
-    service_name = 'service/{}/'.format(name)
-    marathon_url = urllib.parse.urljoin(dcos_url, service_name)
-    config.set_val('marathon.url', marathon_url)
+def record_api_latency(method, path, status, seconds):
+    api_latencies.record(endpoint_of(method, path), status, seconds)
 
+
+# every request of the shared clients is recorded
+client_registry.recorder = record_api_latency
+
+
+def timed_call(endpoint, fn, *args, **kwargs):
+    """ Calls `fn` and records its latency for `endpoint` in `api_latencies`.
+    The status is `ok` if `fn` returned, the status of the response if it
+    raised for one and `error` otherwise.
+    """
+    start = time.time()
     try:
-        yield
-    finally:
-        # return config to previous state
-        config.save(toml_config_o)
+        result = fn(*args, **kwargs)
+    except Exception as e:
+        api_latencies.record(endpoint, http_status(e) or 'error', time.time() - start)
+        raise
+    api_latencies.record(endpoint, 'ok', time.time() - start)
+    return result
+
+
+def mesos_state_summary():
+    return timed_call('GET /mesos/master/state-summary', DCOSClient().get_state_summary)
+
+
+def write_api_latencies(filename='api-latency.json'):
+    """ Prints the latency percentiles of each endpoint and status and writes
+    the histograms to `filename`.
+    """
+    latencies = api_latencies.to_dict()
+    for endpoint, statuses in latencies.items():
+        for status, histogram in statuses.items():
+            print('{} {}: count: {}, p50: {}, p90: {}, p99: {}, p99.9: {}, max: {}'.format(
+                endpoint, status,
+                histogram['count'],
+                histogram['p50'],
+                histogram['p90'],
+                histogram['p99'],
+                histogram['p999'],
+                histogram['max']))
+    with open(filename, 'w') as out:
+        json.dump(latencies, out)
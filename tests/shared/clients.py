@@ -0,0 +1,197 @@
+""" Marathon clients, shared by the scale and the system tests """
+import contextlib
+import os
+import requests
+import threading
+import time
+from six.moves import urllib
+from dcos import http, marathon, config
+from dcos.errors import DCOSHTTPException
+
+
+# marathon the clients of a thread point to, set by `marathon_on_marathon`
+endpoint = threading.local()
+
+
+def marathon_url():
+    """ The url of the marathon the clients of this thread point to, the one of
+    the innermost `marathon_on_marathon` or else the one of the dcos config.
+    """
+    url = getattr(endpoint, 'url', None)
+    if url is not None:
+        return url
+    toml_config = config.get_config()
+    url = config.get_config_val('marathon.url', toml_config)
+    if url is None:
+        dcos_url = config.get_config_val('core.dcos_url', toml_config)
+        url = urllib.parse.urljoin(dcos_url, 'marathon/')
+    return url
+
+
+def service_url(name='marathon'):
+    """ The url of the marathon service `name`, root marathon for `marathon` """
+    dcos_url = config.get_config_val('core.dcos_url', config.get_config())
+    if name == 'marathon':
+        return urllib.parse.urljoin(dcos_url, 'marathon/')
+    return urllib.parse.urljoin(dcos_url, 'service/{}/'.format(name))
+
+
+# connections kept alive per marathon by the client registry
+CLIENT_POOL_SIZE = int(os.environ.get('CLIENT_POOL_SIZE', 16))
+
+
+def ssl_verify(toml_config):
+    """ `requests` verify of core.ssl_verify: a boolean or the path of a CA
+    bundle, verified like the dcos client when it is not set.
+    """
+    verify = config.get_config_val('core.ssl_verify', toml_config)
+    if verify is None:
+        return True
+    if isinstance(verify, str) and verify.lower() in ('true', 'false'):
+        return verify.lower() == 'true'
+    return verify
+
+
+class PooledRpcClient(marathon.RpcClient):
+    """ Marathon rpc client which sends all requests through one keep-alive
+    `requests.Session` instead of opening a new connection per request.
+    `recorder` is called with (method, path, status, seconds) of every request.
+    """
+
+    def __init__(self, base_url, timeout, pool_size=CLIENT_POOL_SIZE, recorder=None):
+        super(PooledRpcClient, self).__init__(base_url, timeout)
+        self.recorder = recorder
+        self.requests_served = 0
+        self._lock = threading.Lock()
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        toml_config = config.get_config()
+        token = config.get_config_val('core.dcos_acs_token', toml_config)
+        if token is not None:
+            self.session.headers['Authorization'] = 'token={}'.format(token)
+        self.session.verify = ssl_verify(toml_config)
+
+    def http_req(self, method_fn, path, *args, **kwargs):
+        return super(PooledRpcClient, self).http_req(
+            self._session_request(method_fn.__name__, path), path, *args, **kwargs)
+
+    def _session_request(self, method, path):
+        def request(url, **kwargs):
+            kwargs.setdefault('headers', {'Accept': 'application/json'})
+            start = time.time()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except Exception:
+                self._record(method, path, 'error', time.time() - start)
+                raise
+            self._record(method, path, response.status_code, time.time() - start)
+            with self._lock:
+                self.requests_served += 1
+            if not 200 <= response.status_code < 300:
+                raise DCOSHTTPException(response)
+            return response
+        return request
+
+    def _record(self, method, path, status, seconds):
+        if self.recorder is not None:
+            self.recorder(method, path, status, seconds)
+
+    def connections_opened(self):
+        opened = 0
+        for adapter in set(self.session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                opened += pools[key].num_connections
+        return opened
+
+
+class ClientRegistry(object):
+    """ Marathon clients keyed by the marathon base url.  All clients for the
+    same url (root marathon or a MoM) share one connection pool.
+    """
+
+    def __init__(self, pool_size=CLIENT_POOL_SIZE, recorder=None):
+        self.pool_size = pool_size
+        self.recorder = recorder
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def client(self, url=None):
+        if url is None:
+            url = marathon_url()
+        with self._lock:
+            if url not in self._clients:
+                timeout = config.get_config_val('core.timeout') or http.DEFAULT_TIMEOUT
+                rpc = PooledRpcClient(url, timeout, self.pool_size, self.recorder)
+                self._clients[url] = marathon.Client(rpc)
+            return self._clients[url]
+
+    def stats(self):
+        """ connections opened and requests served per marathon url """
+        with self._lock:
+            return {url: {'connections': client._rpc.connections_opened(),
+                          'requests': client._rpc.requests_served}
+                    for url, client in self._clients.items()}
+
+    def clear(self):
+        with self._lock:
+            for client in self._clients.values():
+                client._rpc.session.close()
+            self._clients = {}
+
+
+client_registry = ClientRegistry()
+
+
+def marathon_client(url=None):
+    """ Shared marathon client for `url`, by default for the marathon the
+    clients of this thread point to (see `marathon_on_marathon`).
+    """
+    return client_registry.client(url)
+
+
+def client_factory(name=None, url=None):
+    """ Factory of the shared client of the marathon service `name` or of
+    `url`, bound when it is created so it can be called from any thread.
+    """
+    if url is None:
+        url = service_url(name) if name is not None else marathon_url()
+    return lambda: client_registry.client(url)
+
+
+def http_status(error):
+    """ Status of the response which caused `error`, None if there was none.
+    The marathon client raises a `DCOSException` from the `DCOSHTTPException`
+    of the response.
+    """
+    while error is not None:
+        if isinstance(error, DCOSHTTPException):
+            return error.response.status_code
+        error = error.__cause__ or error.__context__
+    return None
+
+
+def print_client_stats():
+    for url, stats in client_registry.stats().items():
+        print('client {}: connections opened: {}, requests served: {}'.format(
+            url, stats['connections'], stats['requests']))
+
+
+@contextlib.contextmanager
+def marathon_on_marathon(name='marathon-user'):
+    """ Context manager pointing the marathon clients of this thread to MoM.
+    Only the current thread is switched and the dcos config is not touched,
+    threads started inside need a client or a `client_factory` bound before.
+    :param name: service name of MoM to use
+    :type name: str
+    """
+
+    previous = getattr(endpoint, 'url', None)
+    endpoint.url = service_url(name)
+    try:
+        yield
+    finally:
+        endpoint.url = previous
@@ -0,0 +1,113 @@
+""" The marathon event stream, shared by the scale and the system tests """
+import json
+import socket
+import threading
+import time
+
+from dcos import http
+
+
+def parse_events(lines):
+    """ Parses the lines of a marathon event stream into (event type, event)
+    pairs.  The type falls back to the `eventType` of the event if the stream
+    does not name it, events which are not valid json are skipped.
+    """
+    event_type = None
+    data = []
+    for line in lines:
+        if not line:
+            if data:
+                try:
+                    event = json.loads('\n'.join(data))
+                except ValueError:
+                    event = None
+                if event is not None:
+                    yield event_type if event_type is not None else event.get('eventType'), event
+            event_type = None
+            data = []
+        elif line.startswith('event:'):
+            event_type = line[len('event:'):].strip()
+        elif line.startswith('data:'):
+            data.append(line[len('data:'):].strip())
+
+
+class EventStream(object):
+    """ Reads the marathon event stream `/v2/events` in a background thread
+    and hands every event to the registered listeners.  A listener is called
+    with the event type, the event data as dict and the time the event was
+    received.  If the connection drops the stream is marked as `dropped` and
+    the listeners are called with the `stream_dropped` event type.
+    """
+
+    def __init__(self, marathon_url, connect_timeout=10, read_timeout=60):
+        if not marathon_url.endswith('/'):
+            marathon_url += '/'
+        self.url = '{}v2/events'.format(marathon_url)
+        self.timeout = (connect_timeout, read_timeout)
+        self.dropped = False
+        self.error = None
+        self._listeners = []
+        self._response = None
+        self._thread = None
+        self._stopped = False
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+        return self
+
+    def start(self):
+        """ Connects to the event stream.  The call returns once marathon
+        accepted the subscription so no event after this call is missed.
+        """
+        http.silence_requests_warnings()
+        self._response = http.get(
+            self.url,
+            headers={'Accept': 'text/event-stream', 'Cache-Control': 'no-cache'},
+            stream=True,
+            timeout=self.timeout)
+        self._thread = threading.Thread(target=self._read)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped = True
+        if self._response is None:
+            return
+        # closing the response would wait for the blocked reader thread,
+        # shutting the socket down wakes it up instead
+        connection = getattr(self._response.raw, '_connection', None)
+        sock = getattr(connection, 'sock', None)
+        try:
+            if sock is not None:
+                sock.shutdown(socket.SHUT_RDWR)
+            else:
+                self._response.close()
+        except Exception:
+            pass
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def _read(self):
+        try:
+            lines = self._response.iter_lines(chunk_size=1024, decode_unicode=True)
+            for event_type, event in parse_events(lines):
+                if self._stopped:
+                    return
+                self._notify(event_type, event, time.time())
+        except Exception as e:
+            self.error = e
+        finally:
+            self._response.close()
+
+        if not self._stopped:
+            self.dropped = True
+            self._notify('stream_dropped', {}, time.time())
+
+    def _notify(self, event_type, event, received):
+        for listener in self._listeners:
+            listener(event_type, event, received)
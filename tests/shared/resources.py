@@ -0,0 +1,96 @@
+""" Fixtures of apps, pods and groups, shared by the scale and the system tests """
+import os
+import threading
+
+from dcos import http, util
+from dcos.errors import DCOSException
+
+
+def fetch_resource(resource):
+    """ Parsed json of the file or http(s) url `resource` """
+    if os.path.isfile(resource):
+        with util.open_file(resource) as resource_file:
+            return util.load_json(resource_file)
+    try:
+        http.silence_requests_warnings()
+        req = http.get(resource, stream=True)
+        if req.status_code == 200:
+            # one growing buffer, concatenating bytes is quadratic
+            data = bytearray()
+            for chunk in req.iter_content(64 * 1024):
+                data.extend(chunk)
+            return util.load_jsons(data.decode('utf-8'))
+        else:
+            raise Exception
+    except Exception:
+        raise DCOSException(
+            "Can't read from resource: {0}.\n"
+            "Please check that it exists.".format(resource))
+
+
+def copy_json(value):
+    """ Deep copy of parsed json, faster than `copy.deepcopy` as there are no cycles """
+    if isinstance(value, dict):
+        return {key: copy_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [copy_json(item) for item in value]
+    return value
+
+
+class FixtureRegistry(object):
+    """ Parses every fixture once and hands out copies of it.  `loads` counts
+    the fixtures read and parsed, `copies` the copies handed out.
+    """
+
+    def __init__(self):
+        self.loads = 0
+        self.copies = 0
+        self._templates = {}
+        self._lock = threading.Lock()
+
+    def template(self, resource):
+        with self._lock:
+            if resource not in self._templates:
+                self._templates[resource] = fetch_resource(resource)
+                self.loads += 1
+            return self._templates[resource]
+
+    def copy(self, resource, id=None, instances=None, image=None, constraints=None):
+        """ Copy of the app or pod `resource` with the given fields replaced.
+        Pods take `constraints` in the pod format, see `pod_constraints`.
+        """
+        definition = copy_json(self.template(resource))
+        with self._lock:
+            self.copies += 1
+        is_pod = 'containers' in definition
+        if id is not None:
+            definition['id'] = str(id) if str(id).startswith('/') else '/' + str(id)
+        if instances is not None:
+            if is_pod:
+                definition.setdefault('scaling', {'kind': 'fixed'})['instances'] = instances
+            else:
+                definition['instances'] = instances
+        if image is not None:
+            if is_pod:
+                for container in definition['containers']:
+                    container.setdefault('image', {'kind': 'DOCKER'})['id'] = image
+            else:
+                definition['container']['docker']['image'] = image
+        if constraints is not None:
+            if is_pod:
+                definition.setdefault('scheduling', {}).setdefault('placement', {})['constraints'] = constraints
+            else:
+                definition['constraints'] = constraints
+        return definition
+
+    def stats(self):
+        with self._lock:
+            return {'fixtures': len(self._templates), 'loads': self.loads, 'copies': self.copies}
+
+
+fixture_registry = FixtureRegistry()
+
+
+def print_fixture_stats():
+    stats = fixture_registry.stats()
+    print('fixtures: {}, loaded: {}, copied: {}'.format(stats['fixtures'], stats['loads'], stats['copies']))
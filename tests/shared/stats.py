@@ -0,0 +1,91 @@
+import itertools
+import math
+import random
+
+
+def percentile(values, percent):
+    """ Nearest-rank percentile of `values`, None if there are no values """
+    if len(values) == 0:
+        return None
+    ordered = sorted(values)
+    rank = int(math.ceil(percent / 100.0 * len(ordered)))
+    return round(ordered[max(0, rank - 1)], 3)
+
+
+def median(values):
+    if len(values) == 0:
+        return None
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    if len(ordered) % 2 == 1:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2.0
+
+
+def bootstrap_ci(values, statistic=median, confidence=0.95, resamples=2000, seed=42):
+    """ Bootstrap confidence interval of `statistic` over `values`.
+
+    :return: (low, high) or (None, None) without values
+    """
+    if len(values) == 0:
+        return None, None
+    rand = random.Random(seed)
+    estimates = sorted(
+        statistic([rand.choice(values) for _ in values]) for _ in range(resamples))
+    tail = (1 - confidence) / 2.0
+    low = estimates[int(tail * (resamples - 1))]
+    high = estimates[int(math.ceil((1 - tail) * (resamples - 1)))]
+    return round(low, 3), round(high, 3)
+
+
+def _rank_sum(first, second):
+    """ Sum of the ranks of `first` in the union of both samples, ties get
+    their average rank.
+    """
+    combined = sorted([(value, 0) for value in first] + [(value, 1) for value in second])
+    ranks = [0.0] * len(combined)
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2.0 + 1
+        i = j + 1
+    return sum(rank for rank, (value, sample) in zip(ranks, combined) if sample == 0)
+
+
+def mann_whitney(first, second, exact_limit=20):
+    """ Two sided Mann-Whitney U test of the samples `first` and `second`.
+    For up to `exact_limit` values in total the p-value is computed exactly
+    from all rank assignments, otherwise with the normal approximation.
+
+    :return: (u, p) or (None, None) if a sample is empty
+    """
+    n1 = len(first)
+    n2 = len(second)
+    if n1 == 0 or n2 == 0:
+        return None, None
+    u = _rank_sum(first, second) - n1 * (n1 + 1) / 2.0
+    mean_u = n1 * n2 / 2.0
+    observed = abs(u - mean_u)
+
+    if n1 + n2 <= exact_limit:
+        values = list(first) + list(second)
+        extreme = 0
+        total = 0
+        for indexes in itertools.combinations(range(n1 + n2), n1):
+            chosen = set(indexes)
+            sample = [values[i] for i in indexes]
+            rest = [values[i] for i in range(n1 + n2) if i not in chosen]
+            if abs(_rank_sum(sample, rest) - n1 * (n1 + 1) / 2.0 - mean_u) >= observed - 1e-9:
+                extreme += 1
+            total += 1
+        return u, round(extreme / float(total), 4)
+
+    sigma = math.sqrt(n1 * n2 * (n1 + n2 + 1) / 12.0)
+    if sigma == 0:
+        return u, 1.0
+    z = (observed - 0.5) / sigma
+    p = math.erfc(max(z, 0) / math.sqrt(2))
+    return u, round(p, 4)
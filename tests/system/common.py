@@ -1,9 +1,16 @@
 """ """
 from shakedown import *
 from utils import *
+from concurrent.futures import ThreadPoolExecutor
+from events import EventConsumer
+from waiter import DEPLOYMENT_EVENTS, TASK_EVENTS, wait_until
 from dcos.errors import DCOSException
 from distutils.version import LooseVersion
 
+import json
+import os
+import re
+import threading
 import uuid
 import random
 import pytest
@@ -13,6 +20,16 @@ marathon_1_3 = pytest.mark.skipif('marthon_version_less_than("1.3")')
 marathon_1_4 = pytest.mark.skipif('marthon_version_less_than("1.4")')
 marathon_1_5 = pytest.mark.skipif('marthon_version_less_than("1.5")')
 
+# tests which need the cluster to themselves, see conftest.py
+exclusive = pytest.mark.exclusive
+# tests which only touch the apps in their namespace and run concurrently
+namespaced = pytest.mark.namespaced
+
+# group of the namespaces of the tests
+NAMESPACE_ROOT = '/' + os.environ.get('SYSTEM_TEST_NAMESPACE', 'system-tests')
+# group of the current test, None outside a namespace
+current_namespace = None
+
 
 def app(id=1, instances=1):
     app_json = {
@@ -80,7 +97,7 @@ def group():
                         "cpus": 0.01,
                         "dependencies": [],
                         "disk": 0.0,
-                        "id": "/test-group/sleep/goodnight",
+                        "id": ns("test-group/sleep/goodnight"),
                         "instances": 1,
                         "mem": 32.0
                     },
@@ -89,17 +106,17 @@ def group():
                         "cpus": 0.01,
                         "dependencies": [],
                         "disk": 0.0,
-                        "id": "/test-group/sleep/goodnight2",
+                        "id": ns("test-group/sleep/goodnight2"),
                         "instances": 1,
                         "mem": 32.0
                     }
                 ],
                 "dependencies": [],
                 "groups": [],
-                "id": "/test-group/sleep",
+                "id": ns("test-group/sleep"),
             }
         ],
-        "id": "/test-group"
+        "id": ns("test-group")
     }
 
 
@@ -331,30 +348,31 @@ def health_check(path='/', port_index=0, failures=1, timeout=2):
 
 
 def cluster_info(mom_name='marathon-user'):
-    agents = get_private_agents()
-    print("agents: {}".format(len(agents)))
-    client = marathon.create_client()
-    about = client.get_about()
-    print("marathon version: {}".format(about.get("version")))
-    # see if there is a MoM
-    with marathon_on_marathon(mom_name):
-        try:
-            client = marathon.create_client()
-            about = client.get_about()
-            print("marathon MoM version: {}".format(about.get("version")))
-
-        except Exception as e:
-            print("Marathon MoM not present")
-
-
-def delete_all_apps():
-    client = marathon.create_client()
+    fingerprint = cluster_fingerprint(mom_name)
+    print("agents: {}".format(fingerprint['agents']))
+    print("marathon version: {}".format(fingerprint['marathon']))
+    if fingerprint['mom'] is not None:
+        print("marathon MoM version: {}".format(fingerprint['mom']))
+    else:
+        print("Marathon MoM not present")
+    print("dcos version: {}, security: {}".format(fingerprint['dcos'], fingerprint['security']))
+
+
+def delete_all_apps(concurrency=8):
+    """ Removes all apps except marathon-user with `concurrency` requests in flight """
+    client = marathon_client()
     apps = client.get_apps()
+    app_ids = []
     for app in apps:
         if app['id'] == '/marathon-user':
             print('WARNING: marathon-user installed')
         else:
-            client.remove_app(app['id'], True)
+            app_ids.append(app['id'])
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        removals = [executor.submit(client.remove_app, app_id, True) for app_id in app_ids]
+    for removal in removals:
+        removal.result()
 
 
 @pytest.fixture(scope="function")
@@ -364,7 +382,7 @@ def remove_undeployed():
 
 
 def stop_all_deployments(noisy=False):
-    client = marathon.create_client()
+    client = marathon_client()
     deployments = client.get_deployments()
     for deployment in deployments:
         try:
@@ -376,7 +394,55 @@ def stop_all_deployments(noisy=False):
 
 def delete_all_apps_wait():
     delete_all_apps()
-    deployment_wait()
+    wait_for_deployments()
+
+
+def enter_namespace(function):
+    """ Starts a namespace for the test `function`, a group of its own below
+    NAMESPACE_ROOT.  `ns` puts ids into this group.
+    """
+    global current_namespace
+    name = re.sub('[^a-z0-9]+', '-', function.__name__.lower()).strip('-')
+    worker = os.environ.get('PYTEST_XDIST_WORKER', 'main')
+    current_namespace = '{}/{}-{}-{}'.format(NAMESPACE_ROOT, worker, name, uuid.uuid4().hex[:6])
+    return current_namespace
+
+
+def leave_namespace():
+    global current_namespace
+    current_namespace = None
+
+
+def ns(id):
+    """ `id` in the namespace of the current test, unchanged outside a namespace """
+    if current_namespace is None:
+        return id
+    return '{}/{}'.format(current_namespace, str(id).lstrip('/'))
+
+
+def in_namespace(id):
+    return current_namespace is None or id.startswith(current_namespace + '/')
+
+
+def delete_namespace_wait():
+    """ Removes the group of the current test from the marathon the client points to """
+    client = marathon_client()
+    try:
+        client.remove_group(current_namespace, True)
+    except DCOSException:
+        # nothing was launched
+        return
+    wait_for_deployments()
+
+
+def task_name(app_id):
+    """ Mesos task name of the tasks of `app_id`: `/group/app` runs `app.group` """
+    return '.'.join(reversed(app_id.strip('/').split('/')))
+
+
+def dns_name(app_id, service='marathon-user'):
+    """ Mesos dns name of `app_id`: `/group/app` is `app-group.<service>.mesos` """
+    return '{}.{}.mesos'.format('-'.join(reversed(app_id.strip('/').split('/'))), service)
 
 
 def ip_other_than_mom():
@@ -392,11 +458,11 @@ def ip_other_than_mom():
 
 @pytest.fixture(scope="function")
 def event_fixture():
-    run_command_on_master('rm test.txt')
-    run_command_on_master('curl --compressed -H "Cache-Control: no-cache" -H "Accept: text/event-stream" -o test.txt leader.mesos:8080/v2/events &')
-    yield
-    kill_process_on_host(master_ip(), '[c]url')
-    run_command_on_master('rm test.txt')
+    """ Consumer of the event stream of the marathon the client points to """
+    consumer = EventConsumer(marathon_url()).start()
+    yield consumer
+    consumer.stop()
+    print('event delivery lag: {}'.format(consumer.lag_summary()))
 
 
 def ip_of_mom():
@@ -418,7 +484,7 @@ def ensure_mom():
 
         try:
             install_package_and_wait('marathon')
-            deployment_wait()
+            wait_for_deployments()
         except:
             pass
 
@@ -456,23 +522,34 @@ def block_port(host, port, direction='INPUT'):
 def wait_for_task(service, task, timeout_sec=120):
     """Waits for a task which was launched to be launched"""
 
-    now = time.time()
-    future = now + timeout_sec
-
-    while now < future:
-        response = None
-        try:
-            response = get_service_task(service, task)
-        except Exception as e:
-            pass
-
+    def task_running():
+        response = get_service_task(service, task)
         if response is not None and response['state'] == 'TASK_RUNNING':
             return response
-        else:
-            time.sleep(5)
-            now = time.time()
 
-    return None
+    return wait_until(task_running, timeout_sec, 'task {} of {}'.format(task, service), TASK_EVENTS)
+
+
+def namespace_deployments(client):
+    """ Deployments affecting the namespace of the current test, all outside a namespace """
+    return [deployment for deployment in client.get_deployments()
+            if current_namespace is None or
+            any(in_namespace(id) for id in deployment.get('affectedApps', []) + deployment.get('affectedPods', []))]
+
+
+def wait_for_deployments(timeout=120):
+    """ Waits until the marathon the client points to has no deployments, in
+    a namespace none of the namespace.  Like `deployment_wait` but woken by
+    the deployment events.
+    """
+
+    client = marathon_client()
+
+    def no_deployments():
+        return len(namespace_deployments(client)) == 0
+
+    assert wait_until(no_deployments, timeout, 'deployments', DEPLOYMENT_EVENTS), \
+        'deployments did not finish within {}s'.format(timeout)
 
 
 def get_pod_tasks(pod_id):
@@ -486,11 +563,75 @@ def get_pod_tasks(pod_id):
     return pod_tasks
 
 
+def ee_version():
+    """ Security mode of an enterprise cluster, NA for open DC/OS """
+    version = "NA"
+    # cat /opt/mesosphere/etc/bootstrap-config.json | jq '.["security"]'
+    status, stdout = run_command_on_master('cat /opt/mesosphere/etc/bootstrap-config.json')
+    if status:
+        configuration = json.loads(stdout)
+        version = configuration.get('security', version)
+    return version
+
+
+def about_version(url):
+    return marathon_client(url).get_about().get('version')
+
+
+# mom name to the probes of the cluster fingerprint which succeeded
+fingerprints = {}
+fingerprint_lock = threading.Lock()
+
+
+def probe_fingerprint(mom_name='marathon-user'):
+    """ Versions of marathon, MoM and DC/OS, the number of private agents and
+    the security mode of the cluster.  The probes run concurrently, one which
+    succeeded is kept for the session and one which failed is tried again on
+    the next call.
+
+    :return: (values of the probes which succeeded, exceptions of those which failed)
+    """
+    with fingerprint_lock:
+        fingerprint = fingerprints.setdefault(mom_name, {})
+        probes = {
+            'marathon': (about_version, dcos_service_url('marathon')),
+            'mom': (about_version, dcos_service_url(mom_name)),
+            'dcos': (dcos_version,),
+            'agents': (lambda: len(get_private_agents()),),
+            'security': (ee_version,)
+        }
+        missing = dict((key, probe) for key, probe in probes.items() if key not in fingerprint)
+        errors = {}
+        if missing:
+            with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+                futures = dict((key, executor.submit(*probe)) for key, probe in missing.items())
+            for key, future in futures.items():
+                try:
+                    fingerprint[key] = future.result()
+                except Exception as e:
+                    errors[key] = e
+        return dict(fingerprint), errors
+
+
+def cluster_fingerprint(mom_name='marathon-user'):
+    """ The fingerprint of the cluster, see `probe_fingerprint`.  A probe which failed is None. """
+    fingerprint, errors = probe_fingerprint(mom_name)
+    for key in errors:
+        fingerprint[key] = None
+    return fingerprint
+
+
+def fingerprint_value(key, mom_name='marathon-user'):
+    """ The value of the fingerprint probe `key`, raises the error of the probe if it failed """
+    fingerprint, errors = probe_fingerprint(mom_name)
+    if key in errors:
+        raise errors[key]
+    return fingerprint[key]
+
+
 def marathon_version():
-    client = marathon.create_client()
-    about = client.get_about()
     # 1.3.9 or 1.4.0-RC8
-    return LooseVersion(about.get("version"))
+    return LooseVersion(fingerprint_value('marathon'))
 
 
 def marthon_version_less_than(version):
@@ -504,7 +645,7 @@ dcos_1_7 = pytest.mark.skipif('dcos_version_less_than("1.7")')
 
 
 def dcos_canonical_version():
-    version = dcos_version().replace('-dev', '')
+    version = fingerprint_value('dcos').replace('-dev', '')
     return LooseVersion(version)
 
 
@@ -0,0 +1,47 @@
+""" Concurrent runs of the system tests against one cluster, for example with
+    pytest-xdist: `py.test -n 4 test_marathon_basics.py`.
+
+    Tests marked `namespaced` launch their apps into a group of their own
+    (see `enter_namespace`) and run concurrently.  All other tests and those
+    marked `exclusive` run alone.  The workers agree through a lock file,
+    SYSTEM_TEST_LOCK.
+
+    The modules shared with the scale tests are in tests/shared.
+"""
+import fcntl
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir, 'shared'))
+
+LOCK_FILE = os.environ.get('SYSTEM_TEST_LOCK', os.path.join(tempfile.gettempdir(), 'marathon-system-tests.lock'))
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'namespaced: the test only touches the apps of its namespace')
+    config.addinivalue_line('markers', 'exclusive: the test needs the cluster to itself')
+
+
+def runs_concurrently(keywords):
+    return 'namespaced' in keywords and 'exclusive' not in keywords
+
+
+@pytest.fixture(autouse=True)
+def cluster_access(request):
+    """ Shares the cluster with the other namespaced tests or takes it for
+    the test alone.  Waiting on the queue lock first lets an exclusive test
+    in before the namespaced tests arriving after it.
+    """
+    with open(LOCK_FILE + '.queue', 'a') as queue, open(LOCK_FILE, 'a') as lock:
+        fcntl.flock(queue, fcntl.LOCK_EX)
+        try:
+            fcntl.flock(lock, fcntl.LOCK_SH if runs_concurrently(request.keywords) else fcntl.LOCK_EX)
+        finally:
+            fcntl.flock(queue, fcntl.LOCK_UN)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
@@ -0,0 +1,120 @@
+import calendar
+import datetime
+import threading
+import time
+
+from event_stream import EventStream
+from stats import percentile
+
+
+def event_time(event):
+    """ Seconds since the epoch of the `timestamp` of a marathon event or None """
+    timestamp = event.get('timestamp')
+    if timestamp is None:
+        return None
+    try:
+        parsed = datetime.datetime.strptime(timestamp, '%Y-%m-%dT%H:%M:%S.%fZ')
+    except ValueError:
+        return None
+    return calendar.timegm(parsed.utctimetuple()) + parsed.microsecond / 1000000.0
+
+
+def entity_ids(event):
+    """ Ids of the apps, pods, tasks and deployments an event is about """
+    ids = set()
+    for field in ('appId', 'podId', 'taskId', 'id'):
+        if isinstance(event.get(field), str):
+            ids.add(event[field])
+    # pod events only carry the uri of the request
+    uri = event.get('uri')
+    if isinstance(uri, str):
+        for prefix in ('/v2/apps', '/v2/pods'):
+            if uri.startswith(prefix + '/'):
+                ids.add(uri[len(prefix):].split('::')[0])
+    plan = event.get('plan')
+    if isinstance(plan, dict) and 'id' in plan:
+        ids.add(plan['id'])
+    step = event.get('currentStep')
+    if isinstance(step, dict):
+        for action in step.get('actions', []):
+            for field in ('app', 'pod'):
+                if field in action:
+                    ids.add(action[field])
+    return ids
+
+
+class EventConsumer(EventStream):
+    """ Consumes the marathon event stream `/v2/events` in a background thread.
+    The events are indexed by event type and by the ids of the apps, pods,
+    tasks and deployments they are about, tests block on an event with
+    `wait_for`.  The delivery lag of every event, the time between its
+    `timestamp` and its arrival, is recorded.  The lag includes the clock
+    difference between the marathon leader and the test host.  Listeners
+    added with `add_listener` are called with (event type, event, received)
+    for every event and with `stream_dropped` if the connection drops, see
+    `EventStream`.  A consumer with `retain` False only calls its listeners.
+    """
+
+    def __init__(self, marathon_url, connect_timeout=10, read_timeout=60, retain=True):
+        super(EventConsumer, self).__init__(marathon_url, connect_timeout, read_timeout)
+        # (event type, event, received)
+        self.events = []
+        self.lags = []
+        self.retain = retain
+        self._by_type = {}
+        self._by_entity = {}
+        self._condition = threading.Condition()
+
+    def _notify(self, event_type, event, received):
+        super(EventConsumer, self)._notify(event_type, event, received)
+        if event_type == 'stream_dropped':
+            with self._condition:
+                self._condition.notify_all()
+            return
+        if not self.retain:
+            return
+
+        sent = event_time(event)
+        with self._condition:
+            entry = (event_type, event, received)
+            self.events.append(entry)
+            self._by_type.setdefault(event_type, []).append(entry)
+            for entity_id in entity_ids(event):
+                self._by_entity.setdefault((event_type, entity_id), []).append(entry)
+            if sent is not None:
+                self.lags.append(received - sent)
+            self._condition.notify_all()
+
+    def received(self, event_type, entity_id=None):
+        """ Events of `event_type`, only those about `entity_id` if given """
+        with self._condition:
+            if entity_id is None:
+                entries = self._by_type.get(event_type, [])
+            else:
+                entries = self._by_entity.get((event_type, entity_id), [])
+            return [event for t, event, received in entries]
+
+    def wait_for(self, event_type, entity_id=None, predicate=None, timeout=30):
+        """ Blocks until an event of `event_type` about `entity_id` (any entity
+        if None) which matches `predicate` was received.
+
+        :return: the event
+        """
+        deadline = time.time() + timeout
+        with self._condition:
+            while True:
+                for event in self.received(event_type, entity_id):
+                    if predicate is None or predicate(event):
+                        return event
+                remaining = deadline - time.time()
+                assert not self.dropped, 'event stream dropped waiting for {} of {}'.format(event_type, entity_id)
+                assert remaining > 0, 'no {} event for {} within {}s'.format(event_type, entity_id, timeout)
+                self._condition.wait(remaining)
+
+    def lag_summary(self):
+        return {
+            'events': len(self.events),
+            'p50': percentile(self.lags, 50),
+            'p99': percentile(self.lags, 99),
+            'max': percentile(self.lags, 100)
+        }
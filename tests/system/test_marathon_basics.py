@@ -14,15 +14,17 @@ from shakedown import private_agent_2
 from utils import *
 from dcos import *
 
+pytestmark = namespaced
+
 
 def test_launch_mesos_container():
     """ Test the successful launch of a mesos container on MoM.
     """
     with marathon_on_marathon():
-        client = marathon.create_client()
-        app_id = uuid.uuid4().hex
+        client = marathon_client()
+        app_id = ns(uuid.uuid4().hex)
         client.add_app(app_mesos(app_id))
-        deployment_wait()
+        wait_for_deployments()
 
         tasks = client.get_tasks(app_id)
         app = client.get_app(app_id)
@@ -35,10 +37,10 @@ def test_launch_docker_container():
     """ Test the successful launch of a docker container on MoM.
     """
     with marathon_on_marathon():
-        client = marathon.create_client()
-        app_id = uuid.uuid4().hex
+        client = marathon_client()
+        app_id = ns(uuid.uuid4().hex)
         client.add_app(app_docker(app_id))
-        deployment_wait()
+        wait_for_deployments()
 
         tasks = client.get_tasks(app_id)
         app = client.get_app(app_id)
@@ -54,7 +56,7 @@ def test_launch_mesos_mom_graceperiod():
         on this test in `test_root_marathon.py::test_launch_mesos_root_marathon_graceperiod`
     """
 
-    app_id = uuid.uuid4().hex
+    app_id = ns(uuid.uuid4().hex)
     app_def = app_mesos(app_id)
     default_graceperiod = 3
     graceperiod = 20
@@ -67,25 +69,25 @@ def test_launch_mesos_mom_graceperiod():
     app_def['cmd'] = '/opt/mesosphere/bin/python test.py'
 
     with marathon_on_marathon():
-        client = marathon.create_client()
+        client = marathon_client()
         client.add_app(app_def)
-        deployment_wait()
+        wait_for_deployments()
 
-        tasks = get_service_task('marathon-user', app_id)
+        tasks = get_service_task('marathon-user', task_name(app_id))
         assert tasks is not None
 
         client.scale_app(app_id, 0)
-        tasks = get_service_task('marathon-user', app_id)
+        tasks = get_service_task('marathon-user', task_name(app_id))
         assert tasks is not None
 
         # task should still be here after the default_graceperiod
         time.sleep(default_graceperiod + 1)
-        tasks = get_service_task('marathon-user', app_id)
+        tasks = get_service_task('marathon-user', task_name(app_id))
         assert tasks is not None
 
         # but not after the set graceperiod
         time.sleep(graceperiod)
-        tasks = get_service_task('marathon-user', app_id)
+        tasks = get_service_task('marathon-user', task_name(app_id))
         assert tasks is None
 
 
@@ -94,7 +96,7 @@ def ignore_launch_mesos_mom_default_graceperiod():
         on this test in `test_root_marathon.py::test_launch_mesos_root_marathon_default_graceperiod`
     """
 
-    app_id = uuid.uuid4().hex
+    app_id = ns(uuid.uuid4().hex)
     app_def = app_mesos(app_id)
 
     fetch = [{
@@ -104,22 +106,22 @@ def ignore_launch_mesos_mom_default_graceperiod():
     app_def['cmd'] = '/opt/mesosphere/bin/python test.py'
 
     with marathon_on_marathon():
-        client = marathon.create_client()
+        client = marathon_client()
         client.add_app(app_def)
-        deployment_wait()
+        wait_for_deployments()
 
-        task = get_service_task('marathon-user', app_id)
+        task = get_service_task('marathon-user', task_name(app_id))
         assert task is not None
         task_id = task.get('id')
         client.scale_app(app_id, 0)
-        task = get_service_task('marathon-user', app_id)
+        task = get_service_task('marathon-user', task_name(app_id))
         assert task is not None
 
         # 3 sec is the default
         # task should be gone after 3 secs
         default_graceperiod = 3
         time.sleep(default_graceperiod + 1)
-        task = get_service_task('marathon-user', app_id)
+        task = get_service_task('marathon-user', task_name(app_id))
         assert task is None
 
 
@@ -128,7 +130,7 @@ def test_launch_docker_mom_graceperiod():
         This is the same test as above however tests against docker.
     """
 
-    app_id = uuid.uuid4().hex
+    app_id = ns(uuid.uuid4().hex)
     app_def = app_docker(app_id)
     app_def['container']['docker']['image'] = 'kensipe/python-test'
     default_graceperiod = 3
@@ -137,36 +139,36 @@ def test_launch_docker_mom_graceperiod():
     app_def['cmd'] = 'python test.py'
 
     with marathon_on_marathon():
-        client = marathon.create_client()
+        client = marathon_client()
         client.add_app(app_def)
-        deployment_wait()
+        wait_for_deployments()
 
-        tasks = get_service_task('marathon-user', app_id)
+        tasks = get_service_task('marathon-user', task_name(app_id))
         assert tasks is not None
 
         client.scale_app(app_id, 0)
-        tasks = get_service_task('marathon-user', app_id)
+        tasks = get_service_task('marathon-user', task_name(app_id))
         assert tasks is not None
 
         # task should still be here after the default_graceperiod
         time.sleep(default_graceperiod + 1)
-        tasks = get_service_task('marathon-user', app_id)
+        tasks = get_service_task('marathon-user', task_name(app_id))
         assert tasks is not None
 
         # but not after the set graceperiod
         time.sleep(graceperiod)
-        tasks = get_service_task('marathon-user', app_id)
+        tasks = get_service_task('marathon-user', task_name(app_id))
         assert tasks is None
 
 
 def test_docker_port_mappings():
     """ Tests docker ports are mapped and are accessible from the host.
     """
-    app_id = uuid.uuid4().hex
+    app_id = ns(uuid.uuid4().hex)
     with marathon_on_marathon():
-        client = marathon.create_client()
+        client = marathon_client()
         client.add_app(app_docker(app_id))
-        deployment_wait()
+        wait_for_deployments()
 
         tasks = client.get_tasks(app_id)
         host = tasks[0]['host']
@@ -182,12 +184,12 @@ def test_docker_port_mappings():
 def test_docker_dns_mapping():
     """ Tests that a running docker task is accessible from DNS.
     """
-    app_id = uuid.uuid4().hex
+    app_id = ns(uuid.uuid4().hex)
     with marathon_on_marathon():
-        client = marathon.create_client()
+        client = marathon_client()
         app_json = app_docker(app_id)
         client.add_app(app_json)
-        deployment_wait()
+        wait_for_deployments()
 
         tasks = client.get_tasks(app_id)
         host = tasks[0]['host']
@@ -198,8 +200,8 @@ def test_docker_dns_mapping():
 
         @retrying.retry(stop_max_delay=10000)
         def check_dns():
-            cmd = 'ping -c 1 {}.marathon-user.mesos'.format(app_id)
-            wait_for_dns('{}.marathon-user.mesos'.format(app_id))
+            cmd = 'ping -c 1 {}'.format(dns_name(app_id))
+            wait_for_dns(dns_name(app_id))
             status, output = run_command_on_master(cmd)
             assert status
 
@@ -209,9 +211,9 @@ def test_launch_app_timed():
     This simple test verifies that if a app is launched on marathon that within 3 secs
     it will be a task.
     """
-    app_id = uuid.uuid4().hex
+    app_id = ns(uuid.uuid4().hex)
     with marathon_on_marathon():
-        client = marathon.create_client()
+        client = marathon_client()
         client.add_app(app_mesos(app_id))
         # if not launched in 3 sec fail
         time.sleep(3)
@@ -244,20 +246,21 @@ def test_ui_available():
     assert response.status_code == 200
 
 
+@exclusive
 def test_task_failure_recovers():
     """ Tests that if a task is KILLED, it will be relaunched and the taskID is different.
     """
-    app_id = uuid.uuid4().hex
+    app_id = ns(uuid.uuid4().hex)
     app_def = app(app_id)
 
     with marathon_on_marathon():
-        client = marathon.create_client()
+        client = marathon_client()
         client.add_app(app_def)
-        deployment_wait()
+        wait_for_deployments()
         tasks = client.get_tasks(app_id)
         host = tasks[0]['host']
         kill_process_on_host(host, '[s]leep')
-        deployment_wait()
+        wait_for_deployments()
 
         @retrying.retry(stop_max_delay=10000)
         def check_new_task_id():
@@ -269,16 +272,16 @@ def test_good_user():
     """ Test changes an app from the non-specified (default user) to another
         good user.  This works on coreOS.
     """
-    app_id = uuid.uuid4().hex
+    app_id = ns(uuid.uuid4().hex)
     app_def = app(app_id)
     app_def['user'] = 'core'
 
     with marathon_on_marathon():
-        client = marathon.create_client()
+        client = marathon_client()
         client.add_app(app_def)
         # if bad this wait will fail.
         # Good user `core` didn't launch.  This only works on a coreOS or a system with a core user.
-        deployment_wait()
+        wait_for_deployments()
         tasks = client.get_tasks(app_id)
         assert tasks[0]['id'] != app_def['id'], "Good user `core` didn't launch.  This only works on a coreOS or a system with a core user."
 
@@ -287,12 +290,12 @@ def test_bad_user():
     """ Test changes the default user to a bad user and confirms that task will
         not launch.
     """
-    app_id = uuid.uuid4().hex
+    app_id = ns(uuid.uuid4().hex)
     app_def = app(app_id)
     app_def['user'] = 'bad'
 
     with marathon_on_marathon():
-        client = marathon.create_client()
+        client = marathon_client()
         client.add_app(app_def)
 
         @retrying.retry(wait_fixed=1000, stop_max_delay=10000)
@@ -306,7 +309,7 @@ def test_bad_user():
 def test_bad_uri():
     """ Tests marathon's response to launching a task with a bad url (a url that isn't fetchable)
     """
-    app_id = uuid.uuid4().hex
+    app_id = ns(uuid.uuid4().hex)
     app_def = app(app_id)
     fetch = [{
       "uri": "http://mesosphere.io/missing-artifact"
@@ -315,7 +318,7 @@ def test_bad_uri():
     app_def['fetch'] = fetch
 
     with marathon_on_marathon():
-        client = marathon.create_client()
+        client = marathon_client()
         client.add_app(app_def)
 
         @retrying.retry(wait_fixed=1000, stop_max_delay=10000)
@@ -332,17 +335,11 @@ def test_launch_group():
     """ Tests the lauching a group of apps at the same time (by request, it is 2 deep)
     """
     with marathon_on_marathon():
-        client = marathon.create_client()
-        try:
-            client.remove_group('/')
-            deployment_wait()
-        except Exception as e:
-            pass
-
+        client = marathon_client()
         client.create_group(group())
-        deployment_wait()
+        wait_for_deployments()
 
-        group_apps = client.get_group('/test-group/sleep')
+        group_apps = client.get_group(ns('test-group/sleep'))
         apps = group_apps['apps']
         assert len(apps) == 2
 
@@ -351,29 +348,23 @@ def test_scale_group():
     """ Tests the scaling of a group
     """
     with marathon_on_marathon():
-        client = marathon.create_client()
-        try:
-            client.remove_group('/test-group', True)
-            deployment_wait()
-        except Exception as e:
-            pass
-
+        client = marathon_client()
         client.create_group(group())
-        deployment_wait()
+        wait_for_deployments()
 
-        group_apps = client.get_group('/test-group/sleep')
+        group_apps = client.get_group(ns('test-group/sleep'))
         apps = group_apps['apps']
         assert len(apps) == 2
-        tasks1 = client.get_tasks('/test-group/sleep/goodnight')
-        tasks2 = client.get_tasks('/test-group/sleep/goodnight2')
+        tasks1 = client.get_tasks(ns('test-group/sleep/goodnight'))
+        tasks2 = client.get_tasks(ns('test-group/sleep/goodnight2'))
         assert len(tasks1) == 1
         assert len(tasks2) == 1
 
         # scale by 2 for the entire group
-        client.scale_group('/test-group/sleep', 2)
-        deployment_wait()
-        tasks1 = client.get_tasks('/test-group/sleep/goodnight')
-        tasks2 = client.get_tasks('/test-group/sleep/goodnight2')
+        client.scale_group(ns('test-group/sleep'), 2)
+        wait_for_deployments()
+        tasks1 = client.get_tasks(ns('test-group/sleep/goodnight'))
+        tasks2 = client.get_tasks(ns('test-group/sleep/goodnight2'))
         assert len(tasks1) == 2
         assert len(tasks2) == 2
 
@@ -384,29 +375,23 @@ def test_scale_app_in_group():
     """ Tests the scaling of an individual app in a group
     """
     with marathon_on_marathon():
-        client = marathon.create_client()
-        try:
-            client.remove_group('/test-group', True)
-            deployment_wait()
-        except Exception as e:
-            pass
-
+        client = marathon_client()
         client.create_group(group())
-        deployment_wait()
+        wait_for_deployments()
 
-        group_apps = client.get_group('/test-group/sleep')
+        group_apps = client.get_group(ns('test-group/sleep'))
         apps = group_apps['apps']
         assert len(apps) == 2
-        tasks1 = client.get_tasks('/test-group/sleep/goodnight')
-        tasks2 = client.get_tasks('/test-group/sleep/goodnight2')
+        tasks1 = client.get_tasks(ns('test-group/sleep/goodnight'))
+        tasks2 = client.get_tasks(ns('test-group/sleep/goodnight2'))
         assert len(tasks1) == 1
         assert len(tasks2) == 1
 
         # scaling just an app in the group
-        client.scale_app('/test-group/sleep/goodnight', 2)
-        deployment_wait()
-        tasks1 = client.get_tasks('/test-group/sleep/goodnight')
-        tasks2 = client.get_tasks('/test-group/sleep/goodnight2')
+        client.scale_app(ns('test-group/sleep/goodnight'), 2)
+        wait_for_deployments()
+        tasks1 = client.get_tasks(ns('test-group/sleep/goodnight'))
+        tasks2 = client.get_tasks(ns('test-group/sleep/goodnight2'))
         assert len(tasks1) == 2
         assert len(tasks2) == 1
 
@@ -416,38 +401,32 @@ def test_scale_app_in_group_then_group():
     """ Tests the scaling of an app in the group, then the group
     """
     with marathon_on_marathon():
-        client = marathon.create_client()
-        try:
-            client.remove_group('/test-group', True)
-            deployment_wait()
-        except Exception as e:
-            pass
-
+        client = marathon_client()
         client.create_group(group())
-        deployment_wait()
+        wait_for_deployments()
 
-        group_apps = client.get_group('/test-group/sleep')
+        group_apps = client.get_group(ns('test-group/sleep'))
         apps = group_apps['apps']
         assert len(apps) == 2
-        tasks1 = client.get_tasks('/test-group/sleep/goodnight')
-        tasks2 = client.get_tasks('/test-group/sleep/goodnight2')
+        tasks1 = client.get_tasks(ns('test-group/sleep/goodnight'))
+        tasks2 = client.get_tasks(ns('test-group/sleep/goodnight2'))
         assert len(tasks1) == 1
         assert len(tasks2) == 1
 
         # scaling just an app
-        client.scale_app('/test-group/sleep/goodnight', 2)
-        deployment_wait()
-        tasks1 = client.get_tasks('/test-group/sleep/goodnight')
-        tasks2 = client.get_tasks('/test-group/sleep/goodnight2')
+        client.scale_app(ns('test-group/sleep/goodnight'), 2)
+        wait_for_deployments()
+        tasks1 = client.get_tasks(ns('test-group/sleep/goodnight'))
+        tasks2 = client.get_tasks(ns('test-group/sleep/goodnight2'))
         assert len(tasks1) == 2
         assert len(tasks2) == 1
 
         # scaling the group after 1 app in the group was scaled.
-        client.scale_group('/test-group/sleep', 2)
-        deployment_wait()
+        client.scale_group(ns('test-group/sleep'), 2)
+        wait_for_deployments()
         time.sleep(1)
-        tasks1 = client.get_tasks('/test-group/sleep/goodnight')
-        tasks2 = client.get_tasks('/test-group/sleep/goodnight2')
+        tasks1 = client.get_tasks(ns('test-group/sleep/goodnight'))
+        tasks2 = client.get_tasks(ns('test-group/sleep/goodnight2'))
         assert len(tasks1) == 4
         assert len(tasks2) == 2
 
@@ -456,27 +435,27 @@ def test_health_check_healthy():
     """ Tests health checks of an app launched by marathon.
     """
     with marathon_on_marathon():
-        client = marathon.create_client()
+        client = marathon_client()
         app_def = python_http_app()
-        app_def['id'] = 'no-health'
+        app_def['id'] = ns('no-health')
         client.add_app(app_def)
-        deployment_wait()
+        wait_for_deployments()
 
-        app = client.get_app('/no-health')
+        app = client.get_app(ns('no-health'))
 
         assert app['tasksRunning'] == 1
         assert app['tasksHealthy'] == 0
 
-        client.remove_app('/no-health')
+        client.remove_app(ns('no-health'))
         health_list = []
         health_list.append(health_check())
-        app_def['id'] = 'healthy'
+        app_def['id'] = ns('healthy')
         app_def['healthChecks'] = health_list
 
         client.add_app(app_def)
-        deployment_wait()
+        wait_for_deployments()
 
-        app = client.get_app('/healthy')
+        app = client.get_app(ns('healthy'))
 
         assert app['tasksRunning'] == 1
         assert app['tasksHealthy'] == 1
@@ -487,48 +466,49 @@ def test_health_check_unhealthy():
         This was a health check that never passed.
     """
     with marathon_on_marathon():
-        client = marathon.create_client()
+        client = marathon_client()
         app_def = python_http_app()
         health_list = []
         health_list.append(health_check('/bad-url', 0, 0))
-        app_def['id'] = 'unhealthy'
+        app_def['id'] = ns('unhealthy')
         app_def['healthChecks'] = health_list
 
         client.add_app(app_def)
 
         @retrying.retry(wait_fixed=1000, stop_max_delay=3000)
         def check_failure_message():
-            app = client.get_app('/unhealthy')
+            app = client.get_app(ns('unhealthy'))
             assert app['tasksRunning'] == 1
             assert app['tasksHealthy'] == 0
             assert app['tasksUnhealthy'] == 1
 
 
 @private_agent_2
+@exclusive
 def test_health_failed_check():
     """ Tests a health check of an app launched by marathon.
         The health check succeeded, then failed due to a network partition.
     """
 
     with marathon_on_marathon():
-        client = marathon.create_client()
+        client = marathon_client()
         app_def = python_http_app()
         health_list = []
         health_list.append(health_check())
-        app_def['id'] = 'healthy'
+        app_def['id'] = ns('healthy')
         app_def['healthChecks'] = health_list
 
         pin_to_host(app_def, ip_other_than_mom())
 
         client.add_app(app_def)
-        deployment_wait()
+        wait_for_deployments()
 
         # healthy
-        app = client.get_app('/healthy')
+        app = client.get_app(ns('healthy'))
         assert app['tasksRunning'] == 1
         assert app['tasksHealthy'] == 1
 
-        tasks = client.get_tasks('/healthy')
+        tasks = client.get_tasks(ns('healthy'))
         host = tasks[0]['host']
         port = tasks[0]['ports'][0]
 
@@ -538,14 +518,14 @@ def test_health_failed_check():
         block_port(host, port)
         time.sleep(7)
         restore_iptables(host)
-        deployment_wait()
+        wait_for_deployments()
 
         # after network failure is restored.  The task returns and is a new task ID
         @retrying.retry(wait_fixed=1000, stop_max_delay=3000)
         def check_health_message():
-            new_tasks = client.get_tasks('/healthy')
+            new_tasks = client.get_tasks(ns('healthy'))
             assert new_tasks[0]['id'] != tasks[0]['id']
-            app = client.get_app('/healthy')
+            app = client.get_app(ns('healthy'))
             assert app['tasksRunning'] == 1
             assert app['tasksHealthy'] == 1
 
@@ -554,72 +534,74 @@ def test_health_failed_check():
 def test_pinned_task_scales_on_host_only():
     """ Tests that scaling a pinned app scales only on the pinned node.
     """
-    app_def = app('pinned')
+    app_def = app(ns('pinned'))
     host = ip_other_than_mom()
     pin_to_host(app_def, host)
 
     with marathon_on_marathon():
-        client = marathon.create_client()
+        client = marathon_client()
         client.add_app(app_def)
-        deployment_wait()
+        wait_for_deployments()
 
-        tasks = client.get_tasks('/pinned')
+        tasks = client.get_tasks(ns('pinned'))
         assert len(tasks) == 1
         assert tasks[0]['host'] == host
 
-        client.scale_app('pinned', 10)
-        deployment_wait()
+        client.scale_app(ns('pinned'), 10)
+        wait_for_deployments()
 
-        tasks = client.get_tasks('/pinned')
+        tasks = client.get_tasks(ns('pinned'))
         assert len(tasks) == 10
         for task in tasks:
             assert task['host'] == host
 
 
 @private_agent_2
+@exclusive
 def test_pinned_task_recovers_on_host():
     """ Tests that a killed pinned task will recover on the pinned node.
     """
-    app_def = app('pinned')
+    app_def = app(ns('pinned'))
     host = ip_other_than_mom()
     pin_to_host(app_def, host)
 
     with marathon_on_marathon():
-        client = marathon.create_client()
+        client = marathon_client()
         client.add_app(app_def)
-        deployment_wait()
-        tasks = client.get_tasks('/pinned')
+        wait_for_deployments()
+        tasks = client.get_tasks(ns('pinned'))
 
         kill_process_on_host(host, '[s]leep')
-        deployment_wait()
+        wait_for_deployments()
 
         @retrying.retry(wait_fixed=1000, stop_max_delay=3000)
         def check_for_new_task():
-            new_tasks = client.get_tasks('/pinned')
+            new_tasks = client.get_tasks(ns('pinned'))
             assert tasks[0]['id'] != new_tasks[0]['id']
             assert new_tasks[0]['host'] == host
 
 
 @private_agent_2
+@exclusive
 def test_pinned_task_does_not_scale_to_unpinned_host():
     """ Tests when a task lands on a pinned node (and barely fits) when asked to
         scale past the resources of that node will not scale.
     """
-    app_def = app('pinned')
+    app_def = app(ns('pinned'))
     host = ip_other_than_mom()
     pin_to_host(app_def, host)
     # only 1 can fit on the node
     app_def['cpus'] = 3.5
     with marathon_on_marathon():
-        client = marathon.create_client()
+        client = marathon_client()
         client.add_app(app_def)
-        deployment_wait()
-        tasks = client.get_tasks('/pinned')
-        client.scale_app('pinned', 2)
+        wait_for_deployments()
+        tasks = client.get_tasks(ns('pinned'))
+        client.scale_app(ns('pinned'), 2)
         # typical deployments are sub 3 secs
         time.sleep(5)
-        deployments = client.get_deployments()
-        tasks = client.get_tasks('/pinned')
+        deployments = namespace_deployments(client)
+        tasks = client.get_tasks(ns('pinned'))
 
         # still deploying
         assert len(deployments) == 1
@@ -631,19 +613,19 @@ def test_pinned_task_does_not_find_unknown_host():
     """ Tests that a task pinned to an unknown host will not launch.
         within 10 secs it is still in deployment and 0 tasks are running.
     """
-    app_def = app('pinned')
+    app_def = app(ns('pinned'))
     host = ip_other_than_mom()
     pin_to_host(app_def, '10.255.255.254')
     # only 1 can fit on the node
     app_def['cpus'] = 3.5
     with marathon_on_marathon():
-        client = marathon.create_client()
+        client = marathon_client()
         client.add_app(app_def)
         # deploys are within secs
         # assuming after 10 no tasks meets criteria
         time.sleep(10)
 
-        tasks = client.get_tasks('/pinned')
+        tasks = client.get_tasks(ns('pinned'))
         assert len(tasks) == 0
 
 @dcos_1_8
@@ -653,10 +635,11 @@ def test_launch_container_with_persistent_volume():
     """
     with marathon_on_marathon():
         app_def = persistent_volume_app()
+        app_def['id'] = ns(app_def['id'])
         app_id = app_def['id']
-        client = marathon.create_client()
+        client = marathon_client()
         client.add_app(app_def)
-        deployment_wait()
+        wait_for_deployments()
 
         tasks = client.get_tasks(app_id)
         assert len(tasks) == 1
@@ -670,7 +653,7 @@ def test_launch_container_with_persistent_volume():
         assert data == 'hello\n', "'{}' was not equal to hello\\n".format(data)
 
         client.restart_app(app_id)
-        deployment_wait()
+        wait_for_deployments()
 
         tasks = client.get_tasks(app_id)
         assert len(tasks) == 1
@@ -687,12 +670,12 @@ def test_launch_container_with_persistent_volume():
 def test_update_app():
     """ Tests update an app.
     """
-    app_id = uuid.uuid4().hex
+    app_id = ns(uuid.uuid4().hex)
     app_def = app_mesos(app_id)
     with marathon_on_marathon():
-        client = marathon.create_client()
+        client = marathon_client()
         client.add_app(app_def)
-        deployment_wait()
+        wait_for_deployments()
 
         tasks = client.get_tasks(app_id)
         assert len(tasks) == 1
@@ -700,7 +683,7 @@ def test_update_app():
         app_def['cpus'] = 1
         app_def['instances'] = 2
         client.update_app(app_id, app_def)
-        deployment_wait()
+        wait_for_deployments()
 
         tasks = client.get_tasks(app_id)
         assert len(tasks) == 2
@@ -709,14 +692,14 @@ def test_update_app():
 def test_update_app_rollback():
     """ Tests updating an app then rolling back the update.
     """
-    app_id = uuid.uuid4().hex
+    app_id = ns(uuid.uuid4().hex)
     app_def = readiness_and_health_app()
     app_def['id'] = app_id
 
     with marathon_on_marathon():
-        client = marathon.create_client()
+        client = marathon_client()
         client.add_app(app_def)
-        deployment_wait()
+        wait_for_deployments()
 
         # start with 1
         tasks = client.get_tasks(app_id)
@@ -724,7 +707,7 @@ def test_update_app_rollback():
 
         app_def['instances'] = 2
         client.update_app(app_id, app_def)
-        deployment_wait()
+        wait_for_deployments()
 
         # update works to 2
         tasks = client.get_tasks(app_id)
@@ -736,7 +719,7 @@ def test_update_app_rollback():
         deployment_id = client.update_app(app_id, app_def)
         client.rollback_deployment(deployment_id)
 
-        deployment_wait()
+        wait_for_deployments()
         # update to 1 instance is rollback to 2
         tasks = client.get_tasks(app_id)
         assert len(tasks) == 2
@@ -745,14 +728,14 @@ def test_update_app_rollback():
 def test_update_app_poor_health():
     """ Tests updating an app with an automatic rollback due to poor health.
     """
-    app_id = uuid.uuid4().hex
+    app_id = ns(uuid.uuid4().hex)
     app_def = readiness_and_health_app()
     app_def['id'] = app_id
 
     with marathon_on_marathon():
-        client = marathon.create_client()
+        client = marathon_client()
         client.add_app(app_def)
-        deployment_wait()
+        wait_for_deployments()
 
         # start with 1
         tasks = client.get_tasks(app_id)
@@ -764,10 +747,10 @@ def test_update_app_poor_health():
         deployment_id = client.update_app(app_id, app_def)
         # 2 min wait
         try:
-            deployment_wait()
+            wait_for_deployments()
         except:
             client.rollback_deployment(deployment_id)
-            deployment_wait()
+            wait_for_deployments()
             pass
 
         tasks = client.get_tasks(app_id)
@@ -775,13 +758,12 @@ def test_update_app_poor_health():
 
 
 def setup_function(function):
+    enter_namespace(function)
+
+
+def teardown_function(function):
     with marathon_on_marathon():
-        try:
-            client = marathon.create_client()
-            client.remove_group("/", True)
-            deployment_wait()
-        except:
-            pass
+        delete_namespace_wait()
 
 
 def setup_module(module):
@@ -790,15 +772,12 @@ def setup_module(module):
 
 
 def teardown_module(module):
-    with marathon_on_marathon():
-        client = marathon.create_client()
-        client.remove_group("/", True)
-        deployment_wait()
+    leave_namespace()
 
 
 def app_docker(app_id=None):
     if app_id is None:
-        app_id = uuid.uuid4().hex
+        app_id = ns(uuid.uuid4().hex)
 
     return {
         'id': app_id,
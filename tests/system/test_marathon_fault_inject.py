@@ -1,10 +1,11 @@
 """Marathon acceptance tests for DC/OS regarding network partitioning"""
 
 import os
+import threading
+import time
 
 import pytest
 import requests
-import retrying
 
 from common import *
 from shakedown import *
@@ -16,6 +17,9 @@ PACKAGE_APP_ID = 'marathon-user'
 DCOS_SERVICE_URL = dcos_service_url(PACKAGE_APP_ID)
 TOKEN = dcos_acs_token()
 
+# restarts masters and agents and blocks ports
+pytestmark = exclusive
+
 
 def setup_module(module):
     # verify test system requirements are met (number of nodes needed)
@@ -26,8 +30,7 @@ def setup_module(module):
 
 def setup_function(function):
     wait_for_service_endpoint('marathon-user')
-    with marathon_on_marathon():
-        delete_all_apps_wait()
+    enter_namespace(function)
 
 
 @private_agent_2
@@ -36,22 +39,19 @@ def test_mom_with_master_process_failure():
         It is expected that the service endpoint will come back and that the
         task_id is the original task_id
     """
-    app_def = app('master-failure')
+    app_def = app(ns('master-failure'))
     host = ip_other_than_mom()
     pin_to_host(app_def, host)
     with marathon_on_marathon():
-        client = marathon.create_client()
+        client = marathon_client()
         client.add_app(app_def)
-        deployment_wait()
-        tasks = client.get_tasks('/master-failure')
+        wait_for_deployments()
+        tasks = client.get_tasks(ns('master-failure'))
         original_task_id = tasks[0]['id']
         systemctl_master()
         wait_for_service_endpoint('marathon-user')
 
-        @retrying.retry(wait_fixed=1000, stop_max_delay=10000)
-        def check_task_recovery():
-            tasks = client.get_tasks('/master-failure')
-            tasks[0]['id'] == original_task_id
+        assert wait_for_task_id(client, ns('master-failure'), original_task_id), 'task was replaced'
 
 
 @private_agent_2
@@ -59,14 +59,14 @@ def test_mom_when_disconnected_from_zk():
     """ Launch an app from MoM.  Then knock out access to zk from the MoM.
         Verify the task is still good.
     """
-    app_def = app('zk-failure')
+    app_def = app(ns('zk-failure'))
     host = ip_other_than_mom()
     pin_to_host(app_def, host)
     with marathon_on_marathon():
-        client = marathon.create_client()
+        client = marathon_client()
         client.add_app(app_def)
-        deployment_wait()
-        tasks = client.get_tasks('/zk-failure')
+        wait_for_deployments()
+        tasks = client.get_tasks(ns('zk-failure'))
         original_task_id = tasks[0]['id']
 
         with iptable_rules(host):
@@ -75,76 +75,66 @@ def test_mom_when_disconnected_from_zk():
             time.sleep(10)
 
         # after access to zk is restored.
-        @retrying.retry(wait_fixed=1000, stop_max_delay=3000)
-        def check_task_is_back():
-            tasks = client.get_tasks('/zk-failure')
-            tasks[0]['id'] == original_task_id
+        assert wait_for_task_id(client, ns('zk-failure'), original_task_id), 'task was replaced'
 
 
 @private_agent_2
 def test_mom_when_task_agent_bounced():
     """ Launch an app from MoM and restart the node the task is on.
     """
-    app_def = app('agent-failure')
+    app_def = app(ns('agent-failure'))
     host = ip_other_than_mom()
     pin_to_host(app_def, host)
     with marathon_on_marathon():
-        client = marathon.create_client()
+        client = marathon_client()
         client.add_app(app_def)
-        deployment_wait()
-        tasks = client.get_tasks('/agent-failure')
+        wait_for_deployments()
+        tasks = client.get_tasks(ns('agent-failure'))
         original_task_id = tasks[0]['id']
         restart_agent(host)
 
-        @retrying.retry(wait_fixed=1000, stop_max_delay=3000)
-        def check_task_is_back():
-            tasks = client.get_tasks('/agent-failure')
-            tasks[0]['id'] == original_task_id
+        assert wait_for_task_id(client, ns('agent-failure'), original_task_id), 'task was replaced'
 
 
 @private_agent_2
 def test_mom_when_mom_agent_bounced():
     """ Launch an app from MoM and restart the node MoM is on.
     """
-    app_def = app('agent-failure')
+    app_def = app(ns('agent-failure'))
     mom_ip = ip_of_mom()
     host = ip_other_than_mom()
     pin_to_host(app_def, host)
     with marathon_on_marathon():
-        client = marathon.create_client()
+        client = marathon_client()
         client.add_app(app_def)
-        deployment_wait()
-        tasks = client.get_tasks('/agent-failure')
+        wait_for_deployments()
+        tasks = client.get_tasks(ns('agent-failure'))
         original_task_id = tasks[0]['id']
 
         restart_agent(mom_ip)
 
-        @retrying.retry(wait_fixed=1000, stop_max_delay=3000)
-        def check_task_is_back():
-            tasks = client.get_tasks('/agent-failure')
-            tasks[0]['id'] == original_task_id
+        assert wait_for_task_id(client, ns('agent-failure'), original_task_id), 'task was replaced'
 
 
 @private_agent_2
 def test_mom_when_mom_process_killed():
     """ Launched a task from MoM then killed MoM.
     """
-    app_def = app('agent-failure')
+    app_def = app(ns('agent-failure'))
     host = ip_other_than_mom()
     pin_to_host(app_def, host)
     with marathon_on_marathon():
-        client = marathon.create_client()
+        client = marathon_client()
         client.add_app(app_def)
-        deployment_wait()
-        tasks = client.get_tasks('/agent-failure')
+        wait_for_deployments()
+        tasks = client.get_tasks(ns('agent-failure'))
         original_task_id = tasks[0]['id']
 
         kill_process_on_host(ip_of_mom(), 'marathon-assembly')
         wait_for_task('marathon', 'marathon-user', 300)
         wait_for_service_endpoint('marathon-user')
 
-        tasks = client.get_tasks('/agent-failure')
-        tasks[0]['id'] == original_task_id
+        assert wait_for_task_id(client, ns('agent-failure'), original_task_id), 'task was replaced'
 
 
 @private_agent_2
@@ -158,12 +148,13 @@ def test_mom_with_network_failure():
     print("MoM IP: {}".format(mom_ip))
 
     app_def = get_resource("{}/large-sleep.json".format(fixture_dir()))
+    app_def['id'] = ns(app_def['id'])
 
     with marathon_on_marathon():
-        client = marathon.create_client()
+        client = marathon_client()
         client.add_app(app_def)
-        wait_for_task("marathon-user", "sleep")
-        tasks = client.get_tasks('sleep')
+        wait_for_task("marathon-user", task_name(app_def['id']))
+        tasks = client.get_tasks(app_def['id'])
         original_sleep_task_id = tasks[0]["id"]
         task_ip = tasks[0]['host']
 
@@ -179,14 +170,13 @@ def test_mom_with_network_failure():
     reconnect_agent(mom_ip)
     reconnect_agent(task_ip)
 
-    service_delay()
     wait_for_service_endpoint(PACKAGE_APP_ID)
-    wait_for_task("marathon-user", "sleep")
+    wait_for_task("marathon-user", task_name(app_def['id']))
 
     with marathon_on_marathon():
-        client = marathon.create_client()
-        wait_for_task("marathon-user", "sleep")
-        tasks = client.get_tasks('sleep')
+        client = marathon_client()
+        wait_for_task("marathon-user", task_name(app_def['id']))
+        tasks = client.get_tasks(app_def['id'])
         current_sleep_task_id = tasks[0]["id"]
 
     assert current_sleep_task_id == original_sleep_task_id, "Task ID shouldn't change"
@@ -203,12 +193,13 @@ def test_mom_with_network_failure_bounce_master():
     print("MoM IP: {}".format(mom_ip))
 
     app_def = get_resource("{}/large-sleep.json".format(fixture_dir()))
+    app_def['id'] = ns(app_def['id'])
 
     with marathon_on_marathon():
-        client = marathon.create_client()
+        client = marathon_client()
         client.add_app(app_def)
-        wait_for_task("marathon-user", "sleep")
-        tasks = client.get_tasks('sleep')
+        wait_for_task("marathon-user", task_name(app_def['id']))
+        tasks = client.get_tasks(app_def['id'])
         original_sleep_task_id = tasks[0]["id"]
         task_ip = tasks[0]['host']
         print("\nTask IP: " + task_ip)
@@ -228,28 +219,188 @@ def test_mom_with_network_failure_bounce_master():
     reconnect_agent(mom_ip)
     reconnect_agent(task_ip)
 
-    service_delay()
     wait_for_service_endpoint(PACKAGE_APP_ID)
-    wait_for_task("marathon-user", "sleep")
+    wait_for_task("marathon-user", task_name(app_def['id']))
 
     with marathon_on_marathon():
-        client = marathon.create_client()
-        wait_for_task("marathon-user", "sleep")
-        tasks = client.get_tasks('sleep')
+        client = marathon_client()
+        wait_for_task("marathon-user", task_name(app_def['id']))
+        tasks = client.get_tasks(app_def['id'])
         current_sleep_task_id = tasks[0]["id"]
 
     assert current_sleep_task_id == original_sleep_task_id, "Task ID shouldn't change"
 
 
-def teardown_module(module):
+# size of the deployment of the fault scenarios: apps and instances per app
+FAULT_SCALE_APPS = int(os.environ.get('FAULT_SCALE_APPS', 100))
+FAULT_SCALE_INSTANCES = int(os.environ.get('FAULT_SCALE_INSTANCES', 10))
+# fraction of the tasks running when the fault is injected
+FAULT_AT = float(os.environ.get('FAULT_AT', 0.5))
+# seconds zk is blocked or the agent is partitioned
+FAULT_DURATION = int(os.environ.get('FAULT_DURATION', 60))
+
+
+class ApiProbe(object):
+    """ Pings the marathon api every `interval` seconds in a background thread
+    and records (timestamp, available).
+    """
+
+    def __init__(self, interval=1):
+        self.interval = interval
+        self.samples = []
+        self._stopped = threading.Event()
+
+    def start(self):
+        client = marathon_client()
+        thread = threading.Thread(target=self._run, args=(client,))
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+
+    def _run(self, client):
+        while not self._stopped.is_set():
+            start = time.time()
+            try:
+                client.get_about()
+                available = True
+            except Exception:
+                available = False
+            self.samples.append((start, available))
+            self._stopped.wait(max(0, self.interval - (time.time() - start)))
+
+    def unavailable(self):
+        """ Seconds the api did not answer and the longest outage """
+        total = 0
+        longest = 0
+        outage = 0
+        for previous, current in zip(self.samples, self.samples[1:]):
+            if not previous[1]:
+                outage += current[0] - previous[0]
+                total += current[0] - previous[0]
+                longest = max(longest, outage)
+            else:
+                outage = 0
+        return round(total, 3), round(longest, 3)
+
+
+def in_scale_group(app_id):
+    return app_id.startswith(ns('fault-scale/'))
+
+
+def running_scale_tasks(client):
+    return [task for task in client.get_tasks(None)
+            if in_scale_group(task['appId']) and task.get('state') == 'TASK_RUNNING']
+
+
+def scale_task_ids(client):
+    return set(task['id'] for task in running_scale_tasks(client))
+
+
+def inject_master_restart():
+    systemctl_master('restart')
+
+
+def inject_zk_block():
+    host = ip_of_mom()
+    with iptable_rules(host):
+        block_port(host, 2181)
+        time.sleep(FAULT_DURATION)
+
+
+def inject_agent_partition():
+    # an agent running tasks of the deployment, not the one of MoM
+    mom_ip = ip_of_mom()
+    with marathon_on_marathon():
+        hosts = [task['host'] for task in running_scale_tasks(marathon_client()) if task['host'] != mom_ip]
+    assert hosts, 'no task of the deployment runs on an agent other than the one of MoM ({})'.format(mom_ip)
+    host = hosts[0]
+    partition_agent(host)
+    service_delay(FAULT_DURATION)
+    reconnect_agent(host)
+
+
+FAULTS = {
+    'master': inject_master_restart,
+    'zk': inject_zk_block,
+    'partition': inject_agent_partition
+}
+
+
+@private_agent_2
+@pytest.mark.parametrize("fault", sorted(FAULTS))
+def test_mom_fault_during_scale_deployment(fault):
+    """ Launches FAULT_SCALE_APPS apps with FAULT_SCALE_INSTANCES instances
+        from MoM and injects `fault` once FAULT_AT of the tasks are running.
+        Measures the time the deployment needs after the fault is over, the
+        tasks lost and relaunched and how long the api was unavailable.
+    """
+    target = FAULT_SCALE_APPS * FAULT_SCALE_INSTANCES
     with marathon_on_marathon():
-        delete_all_apps_wait()
+        client = marathon_client()
+        client.create_group({
+            "id": ns('fault-scale'),
+            "apps": [app(ns('fault-scale/{}'.format(num)), FAULT_SCALE_INSTANCES)
+                     for num in range(1, FAULT_SCALE_APPS + 1)]
+        })
+        start = time.time()
+
+        def enough_tasks_running():
+            return len(scale_task_ids(client)) >= target * FAULT_AT
+        assert wait_until(enough_tasks_running, 1800, events=TASK_EVENTS)
+
+        before = scale_task_ids(client)
+        probe = ApiProbe().start()
+
+    fault_start = time.time()
+    FAULTS[fault]()
+    recovered = time.time()
+    wait_for_service_endpoint(PACKAGE_APP_ID)
+
+    with marathon_on_marathon():
+        wait_for_deployments(timeout=3600)
+        finished = time.time()
+        probe.stop()
+        after = scale_task_ids(client)
+
+    lost = before - after
+    relaunched = max(0, len(after - before) - (target - len(before)))
+    unavailable, longest_outage = probe.unavailable()
+    print('fault: {}, tasks: {}, running at fault: {}, fault time: {}, recovery time: {}, total time: {}, '
+          'lost: {}, relaunched: {}, api unavailable: {}s (longest {}s)'.format(
+              fault, target, len(before),
+              round(recovered - fault_start, 3),
+              round(finished - recovered, 3),
+              round(finished - start, 3),
+              len(lost), relaunched, unavailable, longest_outage))
+    assert len(after) == target
+
+
+def teardown_function(function):
+    with marathon_on_marathon():
+        delete_namespace_wait()
+
+
+def teardown_module(module):
+    leave_namespace()
 
 
 def service_delay(delay=120):
+    """ Holds a fault for `delay` seconds, waits for a condition use `wait_until` """
     time.sleep(delay)
 
 
+def wait_for_task_id(client, app_id, task_id, timeout=120):
+    """ Waits until the api answers with the first task of `app_id`, True if its id is `task_id` """
+
+    def first_task_id():
+        return client.get_tasks(app_id)[0]['id']
+
+    return wait_until(first_task_id, timeout, 'task of {}'.format(app_id), TASK_EVENTS) == task_id
+
+
 def partition_agent(hostname):
     """Partition a node from all network traffic except for SSH and loopback"""
 
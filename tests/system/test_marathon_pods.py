@@ -2,9 +2,7 @@
 
 import pytest
 import uuid
-import retrying
 
-from distutils.version import LooseVersion
 from urllib.parse import urljoin
 
 from common import *
@@ -25,11 +23,11 @@ def _pods_json(file="simple-pods.json"):
 def _clear_pods():
     # clearing doesn't cause
     try:
-        client = marathon.create_client()
+        client = marathon_client()
         pods = client.list_pod()
         for pod in pods:
             client.remove_pod(pod["id"], True)
-        deployment_wait()
+        wait_for_deployments()
     except:
         pass
 
@@ -74,47 +72,40 @@ def test_create_pod():
     """Launch simple pod in DC/OS root marathon.
     """
     print("test")
-    client = marathon.create_client()
+    client = marathon_client()
     pod_id = "/pod-create"
 
     pod_json = _pods_json()
     pod_json["id"] = pod_id
     client.add_pod(pod_json)
-    deployment_wait()
+    wait_for_deployments()
     pod = client.show_pod(pod_id)
     assert pod is not None
 
 
 @dcos_1_9
-@pytest.mark.usefixtures("event_fixture")
-def test_event_channel():
+def test_event_channel(event_fixture):
     """ Tests the Marathon event channnel specific to pod events.
     """
-    client = marathon.create_client()
+    client = marathon_client()
     pod_id = "/pod-create"
 
     pod_json = _pods_json()
     pod_json["id"] = pod_id
     client.add_pod(pod_json)
-    deployment_wait()
+    wait_for_deployments()
 
     # look for created
-    @retrying.retry(stop_max_delay=10000)
-    def check_deployment_message():
-        status, stdout = run_command_on_master('cat test.txt')
-        assert 'event_stream_attached' in stdout
-        assert 'pod_created_event' in stdout
-        assert 'deployment_step_success' in stdout
+    event_fixture.wait_for('event_stream_attached')
+    event_fixture.wait_for('pod_created_event', pod_id)
+    event_fixture.wait_for('deployment_step_success', pod_id)
 
     pod_json["scaling"]["instances"] = 3
     client.update_pod(pod_id, pod_json)
-    deployment_wait()
+    wait_for_deployments()
 
     # look for updated
-    @retrying.retry(stop_max_delay=10000)
-    def check_update_message():
-        status, stdout = run_command_on_master('cat test.txt')
-        assert 'pod_updated_event' in stdout
+    event_fixture.wait_for('pod_updated_event', pod_id)
 
 
 @dcos_1_9
@@ -122,15 +113,15 @@ def test_remove_pod():
     """Launch simple pod in DC/OS root marathon.
     """
     pod_id = "/pod-remove"
-    client = marathon.create_client()
+    client = marathon_client()
 
     pod_json = _pods_json()
     pod_json["id"] = pod_id
     client.add_pod(pod_json)
-    deployment_wait()
+    wait_for_deployments()
 
     client.remove_pod(pod_id)
-    deployment_wait()
+    wait_for_deployments()
     try:
         pod = client.show_pod(pod_id)
         assert False, "We shouldn't be here"
@@ -141,14 +132,14 @@ def test_remove_pod():
 @dcos_1_9
 def test_multi_pods():
     """Launch multiple instances of a pod"""
-    client = marathon.create_client()
+    client = marathon_client()
     pod_id = "/pod-multi"
 
     pod_json = _pods_json()
     pod_json["id"] = pod_id
     pod_json["scaling"]["instances"] = 10
     client.add_pod(pod_json)
-    deployment_wait()
+    wait_for_deployments()
 
     status = _pod_status(client, pod_id)
     assert len(status["instances"]) == 10
@@ -157,21 +148,21 @@ def test_multi_pods():
 @dcos_1_9
 def test_scaleup_pods():
     """Scaling up a pod from 1 to 10"""
-    client = marathon.create_client()
+    client = marathon_client()
     pod_id = "/pod-scaleup"
 
     pod_json = _pods_json()
     pod_json["id"] = pod_id
     pod_json["scaling"]["instances"] = 1
     client.add_pod(pod_json)
-    deployment_wait()
+    wait_for_deployments()
 
     status = _pod_status(client, pod_id)
     assert len(status["instances"]) == 1
 
     pod_json["scaling"]["instances"] = 10
     client.update_pod(pod_id, pod_json)
-    deployment_wait()
+    wait_for_deployments()
     status = _pod_status(client, pod_id)
     assert len(status["instances"]) == 10
 
@@ -179,21 +170,21 @@ def test_scaleup_pods():
 @dcos_1_9
 def test_scaledown_pods():
     """Scaling down a pod from 10 to 1"""
-    client = marathon.create_client()
+    client = marathon_client()
     pod_id = "/pod-scaleup"
 
     pod_json = _pods_json()
     pod_json["id"] = pod_id
     pod_json["scaling"]["instances"] = 10
     client.add_pod(pod_json)
-    deployment_wait()
+    wait_for_deployments()
 
     status = _pod_status(client, pod_id)
     assert len(status["instances"]) == 10
 
     pod_json["scaling"]["instances"] = 1
     client.update_pod(pod_id, pod_json)
-    deployment_wait()
+    wait_for_deployments()
 
     status = _pod_status(client, pod_id)
     assert len(status["instances"]) == 1
@@ -202,7 +193,7 @@ def test_scaledown_pods():
 @dcos_1_9
 def test_head_of_pods():
     """Tests the availability of pods via the API"""
-    client = marathon.create_client()
+    client = marathon_client()
     url = urljoin(DCOS_SERVICE_URL, _pods_url())
     result = http.head(url)
     assert result.status_code == 200
@@ -211,7 +202,7 @@ def test_head_of_pods():
 @dcos_1_9
 def test_version_pods():
     """Versions and reverting with pods"""
-    client = marathon.create_client()
+    client = marathon_client()
 
     pod_id = "/pod-{}".format(uuid.uuid4().hex)
 
@@ -219,11 +210,11 @@ def test_version_pods():
     pod_json["id"] = pod_id
     pod_json["scaling"]["instances"] = 1
     client.add_pod(pod_json)
-    deployment_wait()
+    wait_for_deployments()
 
     pod_json["scaling"]["instances"] = 10
     client.update_pod(pod_id, pod_json)
-    deployment_wait()
+    wait_for_deployments()
 
     versions = _pod_versions(client, pod_id)
 
@@ -241,7 +232,7 @@ def test_pod_comm_via_volume():
         The reading container will die if it can't read the file. So if there are 2 tasks after
         4 secs were are good.
     """
-    client = marathon.create_client()
+    client = marathon_client()
 
     pod_id = "/pod-{}".format(uuid.uuid4().hex)
 
@@ -250,7 +241,7 @@ def test_pod_comm_via_volume():
     pod_json = _pods_json('vol-pods.json')
     pod_json["id"] = pod_id
     client.add_pod(pod_json)
-    deployment_wait()
+    wait_for_deployments()
     tasks = get_pod_tasks(pod_id)
     assert len(tasks) == 2
     time.sleep(4)
@@ -262,7 +253,7 @@ def test_pod_restarts_on_nonzero_exit():
     """ Confirm that pods will relaunch if 1 of the containers exits non-zero.
         2 new tasks with new task_ids will result.
     """
-    client = marathon.create_client()
+    client = marathon_client()
 
     pod_id = "/pod-{}".format(uuid.uuid4().hex)
 
@@ -271,7 +262,7 @@ def test_pod_restarts_on_nonzero_exit():
     pod_json["scaling"]["instances"] = 1
     pod_json['containers'][0]['exec']['command']['shell'] = 'sleep 5; echo -n leaving; exit 2'
     client.add_pod(pod_json)
-    deployment_wait()
+    wait_for_deployments()
     #
     tasks = get_pod_tasks(pod_id)
     initial_id1 = tasks[0]['id']
@@ -288,14 +279,14 @@ def test_pod_restarts_on_nonzero_exit():
 def test_pod_multi_port():
     """ Tests that 2 containers with a port each will properly provision with their unique port assignment.
     """
-    client = marathon.create_client()
+    client = marathon_client()
 
     pod_id = "/pod-{}".format(uuid.uuid4().hex)
 
     pod_json = _pods_json('pod-ports.json')
     pod_json["id"] = pod_id
     client.add_pod(pod_json)
-    deployment_wait()
+    wait_for_deployments()
     #
     time.sleep(1)
     pod = client.list_pod()[0]
@@ -312,7 +303,7 @@ def test_pod_multi_port():
 def test_pod_port_communication():
     """ Test that 1 container can establish a socket connection to the other container in the same pod.
     """
-    client = marathon.create_client()
+    client = marathon_client()
 
     pod_id = "/pod-{}".format(uuid.uuid4().hex)
 
@@ -324,7 +315,7 @@ def test_pod_port_communication():
     # otherwise it is expected that 2 containers are running.
     pod_json['containers'][1]['exec']['command']['shell'] = 'sleep 2; curl -m 2 localhost:$ENDPOINT_HTTPENDPOINT; if [ $? -eq 7 ]; then exit; fi; /opt/mesosphere/bin/python -m http.server $ENDPOINT_HTTPENDPOINT2'  # NOQA
     client.add_pod(pod_json)
-    deployment_wait()
+    wait_for_deployments()
 
     tasks = get_pod_tasks(pod_id)
     assert len(tasks) == 2
@@ -335,7 +326,7 @@ def test_pod_port_communication():
 def test_pin_pod():
     """ Tests that we can pin a pod to a host.
     """
-    client = marathon.create_client()
+    client = marathon_client()
 
     pod_id = "/pod-{}".format(uuid.uuid4().hex)
 
@@ -345,7 +336,7 @@ def test_pin_pod():
     host = ip_other_than_mom()
     pin_pod_to_host(pod_json, host)
     client.add_pod(pod_json)
-    deployment_wait()
+    wait_for_deployments()
 
     tasks = get_pod_tasks(pod_id)
     assert len(tasks) == 2
@@ -358,7 +349,7 @@ def test_pin_pod():
 def test_health_check():
     """ Tests that health checks work in pods.
     """
-    client = marathon.create_client()
+    client = marathon_client()
 
     pod_id = "/pod-{}".format(uuid.uuid4().hex)
 
@@ -366,7 +357,7 @@ def test_health_check():
     pod_json["id"] = pod_id
 
     client.add_pod(pod_json)
-    deployment_wait()
+    wait_for_deployments()
 
     tasks = get_pod_tasks(pod_id)
     c1_health = tasks[0]['statuses'][0]['healthy']
@@ -382,7 +373,7 @@ def test_health_failed_check():
     """ Deploys a pod with good health checks, then partitions the network and verifies
         the tasks return with new task ids.
     """
-    client = marathon.create_client()
+    client = marathon_client()
 
     pod_id = "/pod-ken".format(uuid.uuid4().hex)
 
@@ -391,7 +382,7 @@ def test_health_failed_check():
     host = ip_other_than_mom()
     pin_pod_to_host(pod_json, host)
     client.add_pod(pod_json)
-    deployment_wait()
+    wait_for_deployments()
 
     tasks = get_pod_tasks(pod_id)
     initial_id1 = tasks[0]['id']
@@ -405,7 +396,7 @@ def test_health_failed_check():
     block_port(host, port)
     time.sleep(7)
     restore_iptables(host)
-    deployment_wait()
+    wait_for_deployments()
 
     tasks = get_pod_tasks(pod_id)
     for task in tasks:
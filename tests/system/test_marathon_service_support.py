@@ -15,16 +15,16 @@ def test_framework_unavailable_on_mom():
         This test confirms that the endpoint is not created when launched with MoM.
     """
     if service_available_predicate('pyfw'):
-        client = marathon.create_client()
+        client = marathon_client()
         client.remove_app('python-http', True)
-        deployment_wait()
+        wait_for_deployments()
         wait_for_service_endpoint_removal('pyfw')
 
     with marathon_on_marathon():
         delete_all_apps_wait()
-        client = marathon.create_client()
+        client = marathon_client()
         client.add_app(fake_framework_app())
-        deployment_wait()
+        wait_for_deployments()
 
     try:
         wait_for_service_endpoint('pyfw', 15)
@@ -39,18 +39,18 @@ def test_deploy_custom_framework():
         This test confirms that the endpoint is created from the root marathon.
     """
 
-    client = marathon.create_client()
+    client = marathon_client()
     client.add_app(fake_framework_app())
-    deployment_wait()
+    wait_for_deployments()
 
     assert wait_for_service_endpoint('pyfw')
 
 
 def remove_pyfw():
-    client = marathon.create_client()
+    client = marathon_client()
     try:
         client.remove_app('python-http', True)
-        deployment_wait()
+        wait_for_deployments()
     except:
         pass
 
@@ -58,7 +58,7 @@ def remove_pyfw():
 def test_readiness_time_check():
     """ Test that an app is still in deployment until the readiness check.
     """
-    client = marathon.create_client()
+    client = marathon_client()
     fw = fake_framework_app()
     # testing 30 sec interval
     readiness_time = 30
@@ -76,7 +76,7 @@ def test_readiness_time_check():
 def test_rollback_before_ready():
     """ Tests the rollback of an app that didn't complete readiness.
     """
-    client = marathon.create_client()
+    client = marathon_client()
     fw = fake_framework_app()
     # testing 30 sec interval
     readiness_time = 30
@@ -98,7 +98,7 @@ def test_single_instance():
     """ Tests to see that marathon honors instance instance apps (such as a framework).
         They do not scale past 1.
     """
-    client = marathon.create_client()
+    client = marathon_client()
     fw = fake_framework_app()
     # testing 30 sec interval
     fw['instances'] = 2
@@ -119,7 +119,7 @@ def teardown_function(function):
 def test_readiness_test_timeout():
     """ Tests a poor readiness check.
     """
-    client = marathon.create_client()
+    client = marathon_client()
     fw = fake_framework_app()
     fw['readinessChecks'][0]['path'] = '/bad-path'
     deployment_id = client.add_app(fw)
@@ -31,11 +31,11 @@ def test_install_marathon():
         time.sleep(1)
 
     assert found, 'Service did not register with DCOS'
-    deployment_wait()
+    wait_for_deployments()
 
     # Uninstall
     uninstall('marathon-user')
-    deployment_wait()
+    wait_for_deployments()
 
     # Reinstall
     install_package_and_wait(PACKAGE_NAME)
@@ -59,7 +59,7 @@ def test_custom_service_name():
         'service': {'name': "test-marathon"}
     }
     install_package('marathon', options_json=options)
-    deployment_wait()
+    wait_for_deployments()
 
     assert wait_for_service_endpoint('test-marathon')
 
@@ -83,7 +83,7 @@ def uninstall(service, package=PACKAGE_NAME):
         if task is not None:
             cosmos = packagemanager.PackageManager(get_cosmos_url())
             cosmos.uninstall_app(package, True, service)
-            deployment_wait()
+            wait_for_deployments()
             assert wait_for_service_endpoint_removal('test-marathon')
             delete_zk_node('/universe/{}'.format(service))
 
@@ -22,7 +22,7 @@ def test_default_user():
 
     # launch unique-sleep
     application_json = get_resource("{}/unique-sleep.json".format(fixture_dir()))
-    client = marathon.create_client()
+    client = marathon_client()
     client.add_app(application_json)
     app = client.get_app(application_json['id'])
     assert app['user'] is None
@@ -33,7 +33,7 @@ def test_default_user():
 
     assert run_command_on_agent(host, "ps aux | grep '[s]leep ' | awk '{if ($1 !=\"root\") exit 1;}'")
 
-    client = marathon.create_client()
+    client = marathon_client()
     client.remove_app("/unique-sleep")
 
 
@@ -51,9 +51,9 @@ def test_launch_mesos_root_marathon_default_graceperiod():
     app_def['cmd'] = '/opt/mesosphere/bin/python test.py'
 
     # with marathon_on_marathon():
-    client = marathon.create_client()
+    client = marathon_client()
     client.add_app(app_def)
-    deployment_wait()
+    wait_for_deployments()
 
     # after waiting for deployment it exists
     tasks = get_service_task('marathon', 'grace')
@@ -87,9 +87,9 @@ def test_launch_mesos_root_marathon_graceperiod():
     app_def['fetch'] = fetch
     app_def['cmd'] = '/opt/mesosphere/bin/python test.py'
 
-    client = marathon.create_client()
+    client = marathon_client()
     client.add_app(app_def)
-    deployment_wait()
+    wait_for_deployments()
 
     tasks = get_service_task('marathon', 'grace')
     assert tasks is not None
@@ -127,33 +127,26 @@ def test_declined_offer_due_to_cpu_requirements():
     _test_declined_offer(app_id, app_def, 'InsufficientCpus')
 
 
-@pytest.mark.usefixtures("event_fixture")
-def test_event_channel():
-    """ Tests the event channel.  The way events are verified is by streaming the events
-        to a test.txt file.   The fixture ensures the file is removed before and after the test.
-        events checked are connecting, deploying a good task and killing a task.
+def test_event_channel(event_fixture):
+    """ Tests the event channel.  The events are consumed by the `event_fixture`
+        while the test runs.  Events checked are connecting, deploying a good
+        task and killing a task.
     """
     app_def = app_mesos()
     app_id = app_def['id']
 
-    client = marathon.create_client()
+    client = marathon_client()
     client.add_app(app_def)
-    deployment_wait()
+    wait_for_deployments()
 
-    @retrying.retry(wait_fixed=1000, stop_max_delay=10000)
-    def check_deployment_message():
-        status, stdout = run_command_on_master('cat test.txt')
-        assert 'event_stream_attached' in stdout
-        assert 'deployment_info' in stdout
-        assert 'deployment_step_success' in stdout
+    event_fixture.wait_for('event_stream_attached')
+    event_fixture.wait_for('deployment_info', app_id)
+    event_fixture.wait_for('deployment_step_success', app_id)
 
     client.remove_app(app_id, True)
-    deployment_wait()
+    wait_for_deployments()
 
-    @retrying.retry(wait_fixed=1000, stop_max_delay=10000)
-    def check_kill_message():
-        status, stdout = run_command_on_master('cat test.txt')
-        assert 'Killed' in stdout
+    event_fixture.wait_for('status_update_event', app_id, lambda event: event['taskStatus'] == 'TASK_KILLED')
 
 
 def _test_declined_offer(app_id, app_def, reason):
@@ -162,7 +155,7 @@ def _test_declined_offer(app_id, app_def, reason):
         The retry is the best possible way to "time" the success of the test.
     """
 
-    client = marathon.create_client()
+    client = marathon_client()
     client.add_app(app_def)
 
     @retrying.retry(wait_fixed=1000, stop_max_delay=10000)
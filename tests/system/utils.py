@@ -6,6 +6,8 @@ import subprocess
 from six.moves import urllib
 from dcos import http, util, config
 from dcos.errors import DCOSException
+from clients import *
+from resources import *
 
 
 def fixture_dir():
@@ -14,55 +16,17 @@ def fixture_dir():
     return "{}/fixtures".format(os.path.dirname(os.path.realpath(__file__)))
 
 
-# should be in shakedown
 def get_resource(resource):
     """
     :param resource: optional filename or http(s) url
     for the application or group resource
     :type resource: str
-    :returns: resource
+    :returns: a copy of the resource, parsed once
     :rtype: dict
     """
     if resource is not None:
-        if os.path.isfile(resource):
-            with util.open_file(resource) as resource_file:
-                return util.load_json(resource_file)
-        else:
-            try:
-                http.silence_requests_warnings()
-                req = http.get(resource)
-                if req.status_code == 200:
-                    data = b''
-                    for chunk in req.iter_content(1024):
-                        data += chunk
-                    return util.load_jsons(data.decode('utf-8'))
-                else:
-                    raise Exception
-            except Exception:
-                raise DCOSException(
-                    "Can't read from resource: {0}.\n"
-                    "Please check that it exists.".format(resource))
+        return fixture_registry.copy(resource)
 
 
 def parse_json(response):
     return response.json()
-
-
-@contextlib.contextmanager
-def marathon_on_marathon(name='marathon-user'):
-    """ Context manager for altering the marathon client for MoM
-    :param name: service name of MoM to use
-    :type name: str
-    """
-
-    toml_config_o = config.get_config()
-    dcos_url = config.get_config_val('core.dcos_url', toml_config_o)
-    service_name = 'service/{}/'.format(name)
-    marathon_url = urllib.parse.urljoin(dcos_url, service_name)
-    config.set_val('marathon.url', marathon_url)
-
-    try:
-        yield
-    finally:
-        # return config to previous state
-        config.save(toml_config_o)
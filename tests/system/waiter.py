@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+
+from events import EventConsumer
+from utils import marathon_url
+
+# events which change the state of tasks and deployments
+TASK_EVENTS = ['status_update_event', 'instance_changed_event']
+DEPLOYMENT_EVENTS = ['deployment_success', 'deployment_failed', 'deployment_step_success',
+                     'deployment_step_failure', 'group_change_success']
+STATE_EVENTS = TASK_EVENTS + DEPLOYMENT_EVENTS
+
+# first and largest interval between two checks of a wait in seconds
+WAIT_INITIAL_INTERVAL = float(os.environ.get('WAIT_INITIAL_INTERVAL', 0.02))
+WAIT_MAX_INTERVAL = float(os.environ.get('WAIT_MAX_INTERVAL', 2))
+# seconds before subscribing again to the events of an unreachable marathon
+EVENT_RETRY_INTERVAL = 30
+
+
+class Waiter(object):
+    """ Waits until a predicate holds.  The predicate is checked with an
+    interval growing by `backoff` from `initial_interval` to `max_interval`.
+    The waiter subscribes to the event stream of each marathon it waits on,
+    an event of one of the types a wait is interested in ends the interval
+    early and resets it to `initial_interval`.  Without the event stream the
+    waiter falls back to polling.
+
+    Every wait is recorded as (description, seconds, checks, woken by events,
+    satisfied) and logged.
+    """
+
+    def __init__(self, initial_interval=WAIT_INITIAL_INTERVAL, max_interval=WAIT_MAX_INTERVAL, backoff=2):
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.waits = []
+        self._consumers = {}
+        # url to the time subscribing failed
+        self._failed = {}
+        # event type to the number of events received
+        self._seen = {}
+        self._condition = threading.Condition()
+
+    def _on_event(self, event_type, event, received):
+        with self._condition:
+            self._seen[event_type] = self._seen.get(event_type, 0) + 1
+            self._condition.notify_all()
+
+    def _subscribe(self, url):
+        """ Subscribes to the events of `url` unless already subscribed, False if marathon is unreachable """
+        with self._condition:
+            consumer = self._consumers.get(url)
+            if consumer is not None and not consumer.dropped:
+                return True
+            if time.time() - self._failed.get(url, 0) < EVENT_RETRY_INTERVAL:
+                return False
+        try:
+            consumer = EventConsumer(url, connect_timeout=2, retain=False).add_listener(self._on_event).start()
+        except Exception:
+            with self._condition:
+                self._failed[url] = time.time()
+            return False
+        with self._condition:
+            self._consumers[url] = consumer
+        return True
+
+    def _events_seen(self, event_types):
+        return sum(self._seen.get(event_type, 0) for event_type in event_types)
+
+    def wait(self, predicate, timeout=120, description=None, events=STATE_EVENTS, url=None):
+        """ Checks `predicate` until it returns a true value.  An exception
+        raised by the predicate counts as not satisfied.
+
+        :param events: event types which end an interval early, none if empty
+        :param url: marathon whose events are watched, the one the client points to if None
+        :return: the value of the predicate, None on timeout
+        """
+        description = description or getattr(predicate, '__name__', 'condition')
+        if events:
+            self._subscribe(url or marathon_url())
+        start = time.time()
+        deadline = start + timeout
+        interval = self.initial_interval
+        checks = 0
+        woken = 0
+        result = None
+        while True:
+            with self._condition:
+                seen = self._events_seen(events)
+            checks += 1
+            try:
+                result = predicate()
+            except Exception:
+                result = None
+            remaining = deadline - time.time()
+            if result or remaining <= 0:
+                break
+            with self._condition:
+                if self._events_seen(events) == seen:
+                    self._condition.wait(min(interval, remaining))
+                if self._events_seen(events) != seen:
+                    woken += 1
+                    interval = self.initial_interval
+                else:
+                    interval = min(interval * self.backoff, self.max_interval)
+
+        elapsed = round(time.time() - start, 3)
+        self.waits.append((description, elapsed, checks, woken, bool(result)))
+        print('waited {}s for {}: {} checks, woken by events {} times{}'.format(
+            elapsed, description, checks, woken, '' if result else ', timed out after {}s'.format(timeout)))
+        return result if result else None
+
+    def stop(self):
+        with self._condition:
+            consumers = list(self._consumers.values())
+            self._consumers = {}
+        for consumer in consumers:
+            consumer.stop()
+
+
+waiter = Waiter()
+
+
+def wait_until(predicate, timeout=120, description=None, events=STATE_EVENTS, url=None):
+    """ Waits with the shared waiter, see `Waiter.wait` """
+    return waiter.wait(predicate, timeout, description, events, url)